@@ -0,0 +1,210 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+"""Convert STL files to LDraw parts from the command line, without the GUI.
+
+Usage: python -m src.batch_convert [-j JOBS] [--profile] -o OUTPUT_DIR INPUT [INPUT ...]
+
+Each INPUT is an STL file or a glob pattern. This module must not import wx or OpenGL, so it
+can run on headless machines.
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+from src.settings_manager import SettingsManager
+from src.model_conversion.model_shipper import ModelShipper
+from src.model_conversion.ldraw_model import LDrawModel
+from src.model_conversion.conversion_pipeline import ConversionPipeline
+from src.model_conversion.stage_profiler import StageProfiler
+from src.model_conversion.mesh_cache import MeshCache
+
+
+def find_input_files(patterns: []):
+    """Expand the input files and glob patterns given on the command line.
+
+    :param patterns: List of file paths and glob patterns.
+    :return: List of file paths, in the order given, without duplicates.
+    """
+    file_paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches and os.path.isfile(pattern):
+            matches = [pattern]
+        for match in matches:
+            if os.path.isfile(match) and match not in file_paths:
+                file_paths.append(match)
+    return file_paths
+
+
+def get_output_paths(file_paths: [], output_dir: str):
+    """Find the path to write the part of each STL file to. The folders of the inputs below
+    the folder they all share are kept under the output directory, so files with the same
+    name in different folders do not overwrite each other.
+
+    :param file_paths: List of STL file paths.
+    :param output_dir: The directory for the .dat files.
+    :return: List of the .dat file path of each STL file.
+    """
+    folders = [os.path.dirname(os.path.abspath(file_path)) for file_path in file_paths]
+    shared_folder = os.path.commonpath(folders)
+    return [os.path.normpath(os.path.join(output_dir, os.path.relpath(folder, shared_folder),
+                                          Path(file_path).stem + ".dat"))
+            for file_path, folder in zip(file_paths, folders)]
+
+
+def init_worker(cache_enabled: bool, cache_dir: str):
+    """Give a pool process the MeshCache settings of the parent, which a spawned process
+    would not inherit.
+
+    :param cache_enabled: MeshCache.enabled of the parent.
+    :param cache_dir: MeshCache.cache_dir of the parent.
+    :return: None
+    """
+    MeshCache.enabled = cache_enabled
+    MeshCache.cache_dir = cache_dir
+
+
+def convert_file(task: tuple):
+    """Convert one STL file to an LDraw part in the output directory.
+
+    With profile on, the stages of the conversion are written to a .profile.json file next
+    to the part.
+
+    :param task: Tuple of the STL file path, .dat file path, author, license and profile.
+    :return: Dictionary with the file paths, triangle and line counts, the seconds taken by
+    each step and an error message, which is None when the conversion worked.
+    """
+    file_path, output_path, author, license, profile = task
+    file_name = os.path.basename(output_path)
+    result = {"file_path": file_path,
+              "output_path": output_path,
+              "triangles": 0,
+              "lines": 0,
+              "times": {},
+              "error": None}
+    try:
+        pipeline = ConversionPipeline()
+        if profile:
+            pipeline.profiler = StageProfiler()
+
+        start = time.perf_counter()
+        with pipeline.profile("load") as outputs:
+            mesh, cache_key = ConversionPipeline.load_mesh(file_path)
+            outputs["triangles"] = len(mesh.data)
+        result["triangles"] = len(mesh.data)
+        result["times"]["load"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        model = LDrawModel(pipeline.simplify(mesh, cache_key))
+        result["times"]["simplify"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        output_dir = os.path.dirname(output_path) or "."
+        os.makedirs(output_dir, exist_ok=True)
+        # Written next to the part and renamed over it, so a failed or interrupted conversion
+        # never leaves a partial part behind
+        handle, temp_path = tempfile.mkstemp(suffix=".dat.tmp", dir=output_dir)
+        try:
+            with open(handle, "w") as text_file:
+                text_file.write(ModelShipper.format_metadata(file_name, author, license))
+                result["lines"] = pipeline.write_model(model, text_file)
+            ModelShipper.copy_file_mode(temp_path, output_path)
+            os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        result["times"]["write"] = time.perf_counter() - start
+
+        if profile:
+            StageProfiler.save(result["output_path"] + ".profile.json", pipeline.profiler.stages)
+    except Exception as err:
+        result["error"] = f"{type(err).__name__}: {err}"
+    return result
+
+
+def format_result(result: dict):
+    """Format the timing summary line of one file.
+
+    :param result: A dictionary returned by convert_file.
+    :return: The summary line.
+    """
+    times = result["times"]
+    if result["error"] is not None:
+        return f"  failed  {result['file_path']}: {result['error']}"
+    return (f"{sum(times.values()):7.2f}s  load {times['load']:6.2f}s  "
+            f"simplify {times['simplify']:6.2f}s  write {times['write']:6.2f}s  "
+            f"{result['triangles']:>8} tris -> {result['lines']:>7} lines  {result['file_path']}")
+
+
+def main(arguments=None):
+    """Convert the STL files given on the command line and print a timing summary.
+
+    :param arguments: The command line arguments, sys.argv[1:] when None.
+    :return: The exit code, 0 if every file was converted.
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.batch_convert",
+                                     description="Convert STL files to LDraw parts.")
+    parser.add_argument("inputs", nargs="+", help="STL files or glob patterns")
+    parser.add_argument("-o", "--output-dir", required=True, help="directory for the .dat files")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="files to convert at once, one per process (default: all cores)")
+    parser.add_argument("--author", default=SettingsManager.default_author)
+    parser.add_argument("--license", default=SettingsManager.default_license)
+    parser.add_argument("--profile", action="store_true",
+                        help="write the time, memory and element counts of each stage to a "
+                             ".profile.json file next to each part")
+    args = parser.parse_args(arguments)
+
+    file_paths = find_input_files(args.inputs)
+    if not file_paths:
+        print("No input files found.", file=sys.stderr)
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    results = []
+    tasks = []
+    output_paths = {}
+    for file_path, output_path in zip(file_paths, get_output_paths(file_paths, args.output_dir)):
+        # Only names that differ in the extension, like part.stl and part.STL, are left to clash
+        if os.path.normcase(output_path) in output_paths:
+            results.append({"file_path": file_path, "output_path": output_path, "triangles": 0,
+                            "lines": 0, "times": {},
+                            "error": f"Writes the same part as "
+                                     f"{output_paths[os.path.normcase(output_path)]}"})
+            print(format_result(results[-1]), flush=True)
+            continue
+        output_paths[os.path.normcase(output_path)] = file_path
+        tasks.append((file_path, output_path, args.author, args.license, args.profile))
+
+    jobs = max(1, min(args.jobs, len(tasks)))
+    start = time.perf_counter()
+    if jobs == 1:
+        for task in tasks:
+            results.append(convert_file(task))
+            print(format_result(results[-1]), flush=True)
+    else:
+        with multiprocessing.Pool(jobs, init_worker,
+                                  (MeshCache.enabled, MeshCache.cache_dir)) as pool:
+            for result in pool.imap_unordered(convert_file, tasks):
+                results.append(result)
+                print(format_result(result), flush=True)
+
+    failed = sum(1 for result in results if result["error"] is not None)
+    print(f"Converted {len(results) - failed} of {len(results)} files in "
+          f"{time.perf_counter() - start:.2f}s with {jobs} processes.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,7 +11,6 @@
 # See LICENSE file for the full text.
 import datetime
 from src.log_messages.log_type import LogType
-from src.ui.ui_style import *
 
 
 class LogMessage:
@@ -56,6 +55,9 @@ class LogMessage:
         :return: A tuple in the form of [r, g, b]. Where r, g, b range from 0-255 for the
         intensity of each color value.
         """
+        # Imported here, so log messages can be made where wx is not installed, like the
+        # worker process of the jobs.
+        from src.ui.ui_style import UIStyle
         if self.message_type == LogType.INFORMATION:
             return UIStyle.log_info_text_color
         elif self.message_type == LogType.WARNING:
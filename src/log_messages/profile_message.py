@@ -0,0 +1,35 @@
+# Copyright (C) 2018
+# This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License.
+# See LICENSE file for the full text.
+from src.log_messages.log_message import LogMessage
+from src.log_messages.log_type import LogType
+
+
+class ProfileMessage(LogMessage):
+    """Log message for storing the profile of one stage of a conversion.
+    """
+    def __init__(self, message_type: LogType, message: str, stage: dict):
+        """Constructor for the ProfileMessage class.
+
+        :param message_type: The LogType for the message.
+        :param message: The str message contained in the LogMessage.
+        :param stage: The stage dictionary made by a StageProfiler.
+        """
+        LogMessage.__init__(self, message_type, message)
+        self.stage = stage
+
+    def get_stage(self):
+        """Get the profile of the stage.
+
+        :return: Dictionary with the name, wall time, cpu time, peak memory and the input and
+        output element counts of the stage.
+        """
+        return self.stage
@@ -0,0 +1,309 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import io
+import itertools
+import contextlib
+import multiprocessing
+import numpy
+from stl import Mesh
+import src.model_conversion.mesh_triangulation as MeshTriangulation
+from src.model_conversion.indexed_mesh import IndexedMesh
+from src.model_conversion.ldraw_model import LDrawModel
+from src.model_conversion.ldraw_writer import LDrawWriter
+from src.model_conversion.mesh_cache import MeshCache
+from src.model_conversion.stl_reader import StlReader
+
+
+class ConversionPipeline:
+    """Loads, simplifies and converts meshes to LDraw. Everything a conversion needs is kept on
+    the instance or passed in, so any number of conversions can run at once in one process.
+
+    A step callback lets the caller follow and control a conversion: it is called with a
+    status str before each step (or None between smaller units of work) and returns False to
+    stop the conversion early.
+    """
+
+    def __init__(self, step_callback=None):
+        """Constructor for the ConversionPipeline class.
+
+        :param step_callback: Optional function called between steps, see the class docstring.
+        """
+        self.step_callback = step_callback
+        self.use_indexed_mesh = True  # Find the face boundaries from an IndexedMesh, not Triangle objects
+        self.triangulation_processes = 0  # Worker processes to triangulate faces with, 0 or 1 for none
+        self.merge_quads = True  # Write coplanar triangle pairs that make a convex quad as line type 4
+        self.use_cache = True  # Look up and store simplified meshes in the MeshCache
+        self.profiler = None  # StageProfiler to record the time, memory and element counts of each stage with
+        self.is_stopped = False
+
+    def step(self, status: str = None):
+        """Report a step to the step callback.
+
+        :param status: The status of the step starting, or None.
+        :return: False if the conversion was stopped, True otherwise.
+        """
+        if not self.is_stopped and self.step_callback is not None:
+            self.is_stopped = not self.step_callback(status)
+        return not self.is_stopped
+
+    def profile(self, name: str, **inputs):
+        """Profile a stage with the profiler, if there is one.
+
+        :param name: The name of the stage.
+        :param inputs: The number of each kind of element going into the stage.
+        :return: A context manager giving the dictionary to put the output element counts in.
+        """
+        if self.profiler is None:
+            return self.skip_profile()
+        return self.profiler.stage(name, **inputs)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def skip_profile():
+        """Stand in for a stage of the profiler when there is none.
+
+        :return: A context manager giving a dictionary for output element counts that is not kept.
+        """
+        yield {}
+
+    @staticmethod
+    def load_mesh(file_path: str, recalculate_normals: bool = True, progress=None, key: str = None):
+        """Load an STL file, through the MeshCache when it is enabled. Binary files that
+        StlReader memory maps are not stored, a copy in the cache would load no faster.
+        Numpy floating point errors are raised, so invalid STL files fail to load. The numpy
+        error state is kept per thread, unlike the warnings filters, so other loads and
+        conversions running at the same time are not affected.
+
+        :param file_path: The path to the stl file.
+        :param recalculate_normals: Recalculate the normals from the vertices.
+        :param progress: Optional function called with the fraction of an ASCII file read so far.
+        :param key: The MeshCache key of the file if it is known already, so it is not hashed again.
+        :return: The Mesh and its MeshCache key, which is None when the cache is disabled.
+        """
+        with numpy.errstate(all='raise'):
+            if not MeshCache.enabled:
+                key = None
+            elif key is None:
+                key = MeshCache.make_key(MeshCache.hash_file(file_path), recalculate_normals)
+            mesh = MeshCache.load(key)
+            if mesh is None:
+                mesh = StlReader.load(file_path, recalculate_normals, progress)
+                if not isinstance(mesh.data.base, numpy.memmap):
+                    MeshCache.store(key, mesh)
+        return mesh, key
+
+    def simplify(self, mesh: Mesh, cache_key: str = None):
+        """Simplify a mesh by merging the triangles of each flat face and triangulating the
+        outline of the face again.
+
+        :param mesh: The Mesh to simplify.
+        :param cache_key: The MeshCache key of the mesh, to look up an earlier result with.
+        :return: The simplified Mesh, or None if the conversion was stopped.
+        """
+        if cache_key is not None and self.use_cache:
+            cache_key = MeshCache.make_key(cache_key, "simplify")
+            simple_mesh = MeshCache.load(cache_key)
+            if simple_mesh is not None:
+                self.step("Loaded simplified mesh from cache.")
+                return simple_mesh
+        else:
+            cache_key = None
+
+        # Step 1: Create list of triangle objects from mesh
+        if not self.step("Separating faces..."):
+            return None
+        if self.use_indexed_mesh:
+            with self.profile("indexed mesh", triangles=len(mesh.data)) as outputs:
+                indexed_mesh = IndexedMesh.from_mesh(mesh)
+                outputs["vertices"] = len(indexed_mesh.vertices)
+        else:
+            with self.profile("mesh triangles", triangles=len(mesh.data)) as outputs:
+                triangles = MeshTriangulation.get_mesh_triangles(mesh)
+                outputs["triangles"] = len(triangles)
+
+            # Step 2: Group triangles by their normals
+            if not self.step():
+                return None
+            with self.profile("normal groups", triangles=len(triangles)) as outputs:
+                normal_groups = MeshTriangulation.make_normal_groups(triangles)
+                outputs["normal groups"] = len(normal_groups)
+
+        # Group normal groups into faces (by connected parts)
+        if not self.step():
+            return None
+        with self.profile("faces", triangles=len(mesh.data)) as outputs:
+            if self.use_indexed_mesh:
+                faces = MeshTriangulation.make_indexed_faces(indexed_mesh)
+            else:
+                faces = MeshTriangulation.make_face_groups_loop(normal_groups)
+            outputs["faces"] = len(faces)
+
+        # Step 3: Get only outline edges for each face
+        if not self.step("Simplifying faces..."):
+            return None
+        with self.profile("face boundaries", faces=len(faces)) as outputs:
+            if self.use_indexed_mesh:
+                face_boundaries, face_normals = MeshTriangulation.make_indexed_face_boundaries(
+                    indexed_mesh, faces)
+            else:
+                face_boundaries, face_normals = MeshTriangulation.make_face_boundaries(faces)
+            outputs["edges"] = self.count_edges(face_boundaries)
+
+        # Simplify outline edges for each face (remove redundant vertices)
+        if not self.step():
+            return None
+        with self.profile("simple boundaries", edges=self.count_edges(face_boundaries)) as outputs:
+            simple_boundaries = MeshTriangulation.make_simple_boundaries(face_boundaries)
+            outputs["edges"] = self.count_edges(simple_boundaries)
+
+        # Split each outline by connected parts
+        if not self.step():
+            return None
+        with self.profile("split boundaries", edges=self.count_edges(simple_boundaries)) as outputs:
+            separate_boundaries = MeshTriangulation.split_boundaries(simple_boundaries)
+            outputs["boundaries"] = sum(len(bucket) for bucket in separate_boundaries)
+
+        # Rearranges edges in each face so that outer edge at index 0
+        if not self.step():
+            return None
+        boundary_count = sum(len(bucket) for bucket in separate_boundaries)
+        with self.profile("outside boundaries", boundaries=boundary_count):
+            ordered_separate_boundaries = MeshTriangulation.find_outside_boundary(
+                separate_boundaries)
+
+        if not self.step("Triangulating..."):
+            return None
+        with self.profile("triangulation", faces=len(ordered_separate_boundaries),
+                          boundaries=boundary_count) as outputs:
+            if self.triangulation_processes > 1:
+                # Convert and triangulate each face in worker processes
+                triangulations = self.triangulate_in_pool(ordered_separate_boundaries)
+            else:
+                # Convert output data to different format
+                triangulated_faces = MeshTriangulation.buckets_to_dicts(
+                    ordered_separate_boundaries)
+
+                # Triangulate each face
+                triangulations = []
+                for face in triangulated_faces:
+                    if not self.step():
+                        break
+                    triangulations.append(MeshTriangulation.triangulate(face))
+            outputs["faces"] = len(triangulations)
+
+        # Convert to a mesh
+        if not self.step("Recombining into mesh..."):
+            return None
+        with self.profile("recombine", faces=len(triangulations)) as outputs:
+            simple_mesh = MeshTriangulation.triangulation_to_mesh(triangulations, face_normals)
+            outputs["triangles"] = len(simple_mesh.data)
+        MeshCache.store(cache_key, simple_mesh)
+        return simple_mesh
+
+    def triangulate_in_pool(self, buckets):
+        """Triangulate each face, and find the inner points of its holes, in a pool of
+        worker processes. Stops early if the conversion is stopped.
+
+        :param buckets: The ordered boundaries of each face.
+        :return: List of triangulations, in the same order as buckets.
+        """
+        triangulations = []
+        chunk_size = max(1, len(buckets) // (self.triangulation_processes * 4))
+
+        # Leaving the with block terminates any worker that is still busy.
+        with multiprocessing.Pool(self.triangulation_processes) as pool:
+            results = pool.imap(MeshTriangulation.triangulate_bucket, buckets, chunk_size)
+            while len(triangulations) < len(buckets):
+                if not self.step():
+                    break
+                try:
+                    triangulations.append(results.next(timeout=0.1))
+                except multiprocessing.TimeoutError:
+                    pass
+
+        return triangulations
+
+    @staticmethod
+    def count_edges(boundaries):
+        """Count the edges in the boundaries of every face.
+
+        :param boundaries: List of a UniqueEdgeList for each face.
+        :return: The total number of edges.
+        """
+        return sum(boundary.count() for boundary in boundaries)
+
+    def write_model(self, model: LDrawModel, output):
+        """Write the mesh of a model and of its children as LDraw lines.
+
+        :param model: The LDrawModel to write.
+        :param output: The text file or buffer to write the lines to.
+        :return: The number of lines written, or None if the conversion was stopped.
+        """
+        if not self.step("Converting main mesh..."):
+            return None
+        line_count = self.write_mesh(model.get_mesh(), output)
+
+        if model.get_children() and line_count is not None:
+            self.step("Converting children meshes...")
+            for child in model.get_children():
+                # For each child mesh
+                child_count = self.write_mesh(child.get_mesh(), output)
+                if child_count is None:
+                    return None
+                line_count += child_count
+
+        return None if self.is_stopped else line_count
+
+    def write_mesh(self, mesh: Mesh, output):
+        """Write the triangles of a mesh as LDraw lines, a chunk at a time.
+        With merge_quads on, triangle pairs that make a convex planar quad are written as quads.
+
+        :param mesh: The Mesh to write.
+        :param output: The text file or buffer to write the lines to.
+        :return: The number of lines written, or None if the conversion was stopped.
+        """
+        if self.merge_quads:
+            with self.profile("merge quads", triangles=len(mesh.data)) as outputs:
+                quads, mesh = MeshTriangulation.merge_coplanar_quads(mesh)
+                outputs["quads"] = len(quads)
+                outputs["triangles"] = len(mesh.data)
+            line_count = len(quads) + len(mesh.data)
+            chunks = itertools.chain(LDrawWriter.quad_lines(quads),
+                                     LDrawWriter.triangle_lines(mesh))
+        else:
+            line_count = len(mesh.data)
+            chunks = LDrawWriter.triangle_lines(mesh)
+
+        with self.profile("write lines", lines=line_count) as outputs:
+            outputs["characters"] = 0
+            for chunk in chunks:
+                if not self.step():
+                    return None
+                output.write(chunk)
+                outputs["characters"] += len(chunk)
+        return line_count
+
+    def convert(self, mesh: Mesh, cache_key: str = None):
+        """Simplify a mesh and convert it to LDraw text.
+
+        :param mesh: The Mesh to convert.
+        :param cache_key: The MeshCache key of the mesh, to look up an earlier result with.
+        :return: The simplified LDrawModel and its LDraw lines, or None if the conversion was
+        stopped.
+        """
+        simple_mesh = self.simplify(mesh, cache_key)
+        if simple_mesh is None:
+            return None
+
+        model = LDrawModel(simple_mesh)
+        output = io.StringIO()
+        if self.write_model(model, output) is None:
+            return None
+        return model, output.getvalue()
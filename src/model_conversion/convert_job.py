@@ -8,16 +8,24 @@
 # “Theron Anderson” <atheron@pdx.edu>
 # This software is licensed under the MIT License. See LICENSE file for the full text.
 
+import io
 from src.threading.base_job import BaseJob
 from src.log_messages.log_type import LogType
 from src.log_messages.output_model_message import OutputModelMessage
 from src.model_conversion.model_shipper import ModelShipper
+from src.model_conversion.conversion_pipeline import ConversionPipeline
+from src.model_conversion.stage_profiler import StageProfiler
+from src.log_messages.profile_message import ProfileMessage
 
 
 class ConvertJob(BaseJob):
-    """This job converts the input mesh into LDraw text and stores it in
-    ModelShipper.output_data_text and ModelShipper.output_metadata_text so it can be saved later.
+    """This job converts the input mesh into LDraw text and streams it to the temporary file at
+    ModelShipper.output_data_path, or stores it in ModelShipper.output_data_text when
+    ModelShipper.stream_output is off, so it can be saved later.
     """
+    merge_quads = True  # Write coplanar triangle pairs that make a convex quad as line type 4
+    job_settings = ("merge_quads",)
+
     def __init__(self, feedback_log):
         super().__init__(feedback_log)
         self.name = "mesh to LDraw conversion"
@@ -26,60 +34,29 @@ class ConvertJob(BaseJob):
     def do_job(self):
         self.update_status("Starting " + self.name + ".")
         self.is_running.wait()
-        # Setting output model as input LDraw object
-        model = None # LDraw model
-        mesh = None # mesh in LDraw model
-        children = None
         if not self.is_killed:
-            model = ModelShipper.output_model
-            mesh = model.get_mesh()
-            children = model.get_children()
+            # Write out line 3 and 4 types for the output model, a chunk of lines at a time
+            if ModelShipper.stream_output:
+                output = ModelShipper.open_output_data()
+            else:
+                ModelShipper.discard_output_data()
+                output = io.StringIO()
 
-        # Write out output file data section
-        self.update_status("Converting main mesh...")
+            pipeline = ConversionPipeline(self.continue_job)
+            pipeline.merge_quads = self.merge_quads
+            if StageProfiler.enabled:
+                pipeline.profiler = StageProfiler(self.put_stage)
+            pipeline.write_model(ModelShipper.output_model, output)
 
-        ModelShipper.output_data_text = ""
-        for i in range(len(mesh.normals)):
-            # Write out line 3 types for main mesh
-            self.is_running.wait()
-            if self.is_killed:
-                break
-            # Export vertices information in ldraw format
-            ModelShipper.output_data_text += ("3 4 " + str(mesh.v2[i][0])
-                                              + " " + str(mesh.v2[i][1])
-                                              + " " + str(mesh.v2[i][2])
-                                              + " " + str(mesh.v1[i][0])
-                                              + " " + str(mesh.v1[i][1])
-                                              + " " + str(mesh.v1[i][2])
-                                              + " " + str(mesh.v0[i][0])
-                                              + " " + str(mesh.v0[i][1])
-                                              + " " + str(mesh.v0[i][2])
-                                              + "\n")
+            if pipeline.profiler is not None:
+                # Add to the profile of the simplify job, it is written next to the part on save
+                ModelShipper.output_profile = ((ModelShipper.output_profile or []) +
+                                               pipeline.profiler.stages)
 
-        if children:
-            self.update_status("Converting children meshes...")
-            for i in range(len(model.get_children())):
-                # For each child mesh
-                self.is_running.wait()
-                if self.is_killed:
-                    break
+            if not ModelShipper.stream_output:
+                ModelShipper.output_data_text = output.getvalue()
+            output.close()
 
-                for j in range(len(children[i].normals)):
-                    # For each normal in this child mesh
-                    self.is_running.wait()
-                    if self.is_killed:
-                        break
-                    # Export vertices information in ldraw format
-                    ModelShipper.output_data_text += ("3 4 " + str(mesh.v2[j][0])
-                                                      + " " + str(mesh.v2[j][1])
-                                                      + " " + str(mesh.v2[j][2])
-                                                      + " " + str(mesh.v1[j][0])
-                                                      + " " + str(mesh.v1[j][1])
-                                                      + " " + str(mesh.v1[j][2])
-                                                      + " " + str(mesh.v0[j][0])
-                                                      + " " + str(mesh.v0[j][1])
-                                                      + " " + str(mesh.v0[j][2])
-                                                      + "\n")
         self.is_running.wait()
         if not self.is_killed: # Job completed (not killed)
             self.update_status("Finished " + self.name + ".")
@@ -88,7 +65,15 @@ class ConvertJob(BaseJob):
                                                  ModelShipper.output_model))
         else:  # Job was killed
             #  do any cleanup before exiting
+            ModelShipper.discard_output_data()
             self.update_status("Cancelled during " + self.name + ".")
 
         self.is_done.set()  # Set this so thread manager knows job is done
 
+    def put_stage(self, stage: dict):
+        """Report a stage of the conversion as soon as it ends.
+
+        :param stage: The stage dictionary made by the StageProfiler.
+        :return: None
+        """
+        self.put_feedback(ProfileMessage(LogType.DEBUG, StageProfiler.format_stage(stage), stage))
@@ -56,6 +56,18 @@ class Edge:
         list_vertices.append([self.x2, self.y2, self.z2])
         return list_vertices
 
+    def get_key(self):
+        """Get a key for this edge that does not depend on its direction, so overlapping
+        edges can be found with a dict lookup instead of comparing every pair of edges.
+
+        :return: A tuple of the two vertex tuples, smallest vertex first.
+        """
+        start = (self.x1, self.y1, self.z1)
+        end = (self.x2, self.y2, self.z2)
+        if end < start:
+            return end, start
+        return start, end
+
     @staticmethod
     def shortest_distance(edge_1, edge_2):
         """
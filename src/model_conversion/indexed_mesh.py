@@ -0,0 +1,113 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import numpy as np
+from stl import Mesh
+
+
+class IndexedMesh:
+    """A compact mesh made of a table of unique vertices and an array of triangles that index
+    into it, instead of a Triangle object with three Edge objects for every facet.
+    """
+
+    def __init__(self, vertices, faces, normals):
+        """Constructor for the IndexedMesh class.
+
+        :param vertices: Float array of shape (m, 3) with each unique vertex.
+        :param faces: Int32 array of shape (n, 3) with the vertex indices of each triangle.
+        :param normals: Float array of shape (n, 3) with the unit normal of each triangle.
+        """
+        self.vertices = vertices
+        self.faces = faces
+        self.normals = normals
+        self.edges = None
+        self.edge_keys = None
+
+    @staticmethod
+    def from_mesh(mesh: Mesh):
+        """Build an IndexedMesh from the triangles of a numpy-stl Mesh.
+
+        :param mesh: The Mesh to convert.
+        :return: The IndexedMesh.
+        """
+        vectors = np.asarray(mesh.vectors).reshape(-1, 3)
+        vertices, inverse = np.unique(vectors, axis=0, return_inverse=True)
+        faces = inverse.reshape(-1, 3).astype(np.int32)
+
+        normals = np.asarray(mesh.normals, dtype=np.float64)
+        lengths = np.linalg.norm(normals, axis=1)
+
+        # Fall back to the winding of the triangle where the file has no normal.
+        missing = lengths == 0.0
+        if np.any(missing):
+            triangles = np.asarray(mesh.vectors, dtype=np.float64)[missing]
+            normals[missing] = np.cross(triangles[:, 1] - triangles[:, 0],
+                                        triangles[:, 2] - triangles[:, 0])
+            lengths[missing] = np.linalg.norm(normals[missing], axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            normals = normals / lengths[:, np.newaxis]
+
+        return IndexedMesh(vertices, faces, normals)
+
+    def count(self):
+        """Counts the number of triangles in the mesh.
+
+        :return: Int value
+        """
+        return len(self.faces)
+
+    def get_vertices(self):
+        """Get the unique vertex table.
+
+        :return: Float array of shape (m, 3).
+        """
+        return self.vertices
+
+    def get_faces(self):
+        """Get the vertex indices of every triangle.
+
+        :return: Int32 array of shape (n, 3).
+        """
+        return self.faces
+
+    def get_normals(self):
+        """Get the unit normal of every triangle.
+
+        :return: Float array of shape (n, 3).
+        """
+        return self.normals
+
+    def get_edges(self):
+        """Get the directed edges of every triangle, built the first time they are asked for.
+        Triangle i owns rows 3i, 3i + 1 and 3i + 2, in the same order as Triangle.edges.
+
+        :return: Int32 array of shape (3n, 2) of (start, end) vertex indices.
+        """
+        if self.edges is None:
+            self.edges = np.stack((self.faces, np.roll(self.faces, -1, axis=1)),
+                                  axis=2).reshape(-1, 2)
+        return self.edges
+
+    def get_edge_keys(self):
+        """Get a direction insensitive key for every edge, like Edge.get_key().
+
+        :return: Int32 array of shape (3n, 2) of (smallest, largest) vertex indices.
+        """
+        if self.edge_keys is None:
+            self.edge_keys = np.sort(self.get_edges(), axis=1)
+        return self.edge_keys
+
+    def get_edge_coordinates(self, edge_ids):
+        """Get the start and end coordinates of some edges.
+
+        :param edge_ids: Indices into get_edges().
+        :return: Float array of shape (k, 2, 3).
+        """
+        return self.vertices[self.get_edges()[edge_ids]]
@@ -0,0 +1,76 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import numpy
+from stl import Mesh
+
+
+class LDrawWriter:
+    """The static class responsible for formatting mesh data as LDraw (.dat) lines.
+    """
+    chunk_size = 10000  # Lines formatted per chunk of text
+
+    @staticmethod
+    def triangle_lines(mesh: Mesh, color: int = 4):
+        """Format every triangle of a mesh as an LDraw line type 3, in chunks of text.
+
+        :param mesh: The Mesh to format.
+        :param color: The LDraw color code of the triangles.
+        :return: A generator of str chunks, each holding up to chunk_size lines.
+        """
+        # LDraw wants the vertices in the opposite winding to the STL.
+        return LDrawWriter.format_lines(3, color, mesh.vectors[:, ::-1])
+
+    @staticmethod
+    def quad_lines(quads, color: int = 4):
+        """Format quads as LDraw line type 4, in chunks of text.
+
+        :param quads: Float array of shape (k, 4, 3) with the corners of each quad, wound like
+        the triangles of the mesh.
+        :param color: The LDraw color code of the quads.
+        :return: A generator of str chunks, each holding up to chunk_size lines.
+        """
+        # Reversed, like the vertices of the triangles.
+        return LDrawWriter.format_lines(4, color, numpy.asarray(quads)[:, ::-1])
+
+    @staticmethod
+    def format_lines(line_type: int, color: int, coordinates):
+        """Format rows of coordinates as LDraw lines, in chunks of text. Each chunk is copied and
+        formatted on its own, so the memory used at once depends on chunk_size and not on the mesh.
+
+        :param line_type: The LDraw line type.
+        :param color: The LDraw color code.
+        :param coordinates: Array of shape (n, ...) with the coordinates of each line, which are
+        written as float32.
+        :return: A generator of str chunks, each holding up to chunk_size lines.
+        """
+        line_count = len(coordinates)
+        column_count = int(numpy.prod(coordinates.shape[1:]))
+        line_template = str(line_type) + " " + str(color) + " {}" * column_count + "\n"
+
+        for start in range(0, line_count, LDrawWriter.chunk_size):
+            end = min(start + LDrawWriter.chunk_size, line_count)
+            values = numpy.asarray(coordinates[start:end], dtype=numpy.float32).reshape(-1)
+            yield (line_template * (end - start)).format(
+                *LDrawWriter.format_coordinates(values).tolist())
+
+    @staticmethod
+    def format_coordinates(values):
+        """Format each value the same way str() formats a numpy scalar of its type.
+        Every distinct value is only formatted once, which matters because the vertices of a
+        mesh repeat many times.
+
+        :param values: 1D numpy float array.
+        :return: Numpy str array with the text of each value.
+        """
+        # Compare the bits, so -0.0 keeps its sign.
+        bits = values.view(numpy.dtype("u" + str(values.itemsize)))
+        unique_bits, inverse = numpy.unique(bits, return_inverse=True)
+        unique_text = unique_bits.view(values.dtype).astype(str)
+        return unique_text[inverse.reshape(-1)]
@@ -0,0 +1,138 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import os
+import hashlib
+import logging
+import tempfile
+import numpy
+from pathlib import Path
+from stl import Mesh
+from src.util import Util
+
+
+class MeshCache:
+    """The static class responsible for keeping loaded and simplified meshes on disk, so the
+    same input file does not have to be parsed or simplified again.
+
+    Entries are .npy files of Mesh.data named by a key made from a hash of the input file
+    content and the settings used. The least recently used entries are removed once the cache
+    grows past max_size.
+    """
+    enabled = True  # Look up and store meshes in the cache
+    cache_dir = Util.path_conversion(str(Path.home()) + "/.cache/lscan")  # Where entries are kept
+    max_size = 512 * 1024 * 1024  # Bytes the entries may take up before the oldest are removed
+    version = 1  # Part of every key, raise it when a change to the pipeline changes its output
+    block_size = 1 << 20  # Bytes of the input file hashed at a time
+
+    @staticmethod
+    def hash_file(file_path: str):
+        """Hash the content of a file.
+
+        :param file_path: The path to the file.
+        :return: The hex digest of the file content.
+        """
+        file_hash = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(MeshCache.block_size), b""):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+
+    @staticmethod
+    def make_key(*parts):
+        """Combine a file hash and the settings that affect a mesh into a cache key.
+
+        :param parts: The file hash or key the mesh was made from, then any settings.
+        :return: The key as a hex str.
+        """
+        key_hash = hashlib.blake2b(digest_size=16)
+        key_hash.update(repr((MeshCache.version,) + parts).encode())
+        return key_hash.hexdigest()
+
+    @staticmethod
+    def get_path(key: str):
+        """Get the path of the entry for a key.
+
+        :param key: The cache key.
+        :return: The path of the .npy file.
+        """
+        return os.path.join(MeshCache.cache_dir, key + ".npy")
+
+    @staticmethod
+    def load(key: str):
+        """Load the mesh stored under a key and mark it as recently used.
+
+        :param key: The cache key.
+        :return: The Mesh, or None if it is not in the cache.
+        """
+        if not MeshCache.enabled or key is None:
+            return None
+
+        path = MeshCache.get_path(key)
+        try:
+            data = numpy.load(path, mmap_mode="c", allow_pickle=False)
+            os.utime(path)
+        except (OSError, ValueError) as err:
+            if Util.is_file(path):
+                logging.error(f"Failed to load the cached mesh : {err}")
+            return None
+
+        if data.dtype != Mesh.dtype or data.ndim != 1:
+            return None
+        return Mesh(data.view(numpy.ndarray), calculate_normals=False)
+
+    @staticmethod
+    def store(key: str, mesh: Mesh):
+        """Store a mesh under a key, then remove the least recently used entries if the cache
+        is too big.
+
+        :param key: The cache key.
+        :param mesh: The Mesh to store.
+        :return: None
+        """
+        if not MeshCache.enabled or key is None:
+            return
+
+        try:
+            if not Util.is_dir(MeshCache.cache_dir):
+                Util.mkdir(MeshCache.cache_dir)
+
+            # Written next to the entry and renamed, so no one reads a partial entry.
+            handle, temp_path = tempfile.mkstemp(suffix=".npy.tmp", dir=MeshCache.cache_dir)
+            with open(handle, "wb") as file:
+                numpy.save(file, numpy.asarray(mesh.data), allow_pickle=False)
+            os.replace(temp_path, MeshCache.get_path(key))
+        except OSError as err:
+            logging.error(f"Failed to store the mesh in the cache : {err}")
+            return
+
+        MeshCache.evict(MeshCache.max_size)
+
+    @staticmethod
+    def evict(max_size: int):
+        """Remove the least recently used entries until the rest fit in max_size bytes.
+
+        :param max_size: The number of bytes the remaining entries may take up.
+        :return: None
+        """
+        entries = []
+        for entry in os.scandir(MeshCache.cache_dir):
+            if entry.name.endswith(".npy") and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= max_size:
+                break
+            try:
+                os.remove(path)
+                total_size -= size
+            except OSError as err:
+                logging.error(f"Failed to remove a cached mesh : {err}")
@@ -15,6 +15,7 @@ from src.model_conversion.edge import Edge
 from src.model_conversion.unique_edge_list import UniqueEdgeList
 from src.model_conversion.triangle import Triangle
 from src.model_conversion.face import Face
+from src.model_conversion.indexed_mesh import IndexedMesh
 
 
 def get_mesh_triangles(mesh: Mesh):
@@ -56,56 +57,142 @@ def make_normal_groups(triangles: []):
     :param triangles: List of Triangles
     :return: List of List of Triangles
     """
-    triangles_groups = []
-    origin = (0.0, 0.0, 0.0)
-    group_match = False
-    for triangle in triangles:
-        for group in triangles_groups:
-            group_normal = group[0].normal  # Normal of first triangle in the group
-            triangle_normal = triangle.normal
-            origin_group_normal_edge = Edge(origin[0], origin[1], origin[2], group_normal[0], group_normal[1], group_normal[2])
-            origin_triangle_normal_edge = Edge(origin[0], origin[1], origin[2], triangle_normal[0], triangle_normal[1], triangle_normal[2])
-            if Edge.are_parallel(origin_group_normal_edge, origin_triangle_normal_edge, tolerance=0.01):
-                group_match = True
-                group.append(triangle)
-                break
-        if not group_match:
-            triangles_groups.append([triangle])
-        group_match = False
-    return triangles_groups
+    normals = [triangle.normal for triangle in triangles]
+    return [[triangles[i] for i in group] for group in group_normal_indices(normals)]
+
+
+def group_normal_indices(normals, tolerance=0.01):
+    """
+    Group normals that are parallel to the first normal of a group, within a tolerance angle.
+    Unit normals are quantized into a hash grid, so each distinct normal is only compared
+    against the group leaders in its own and neighboring grid cells.
+    :param normals: Array like of shape (n, 3) with the normal of each triangle.
+    :param tolerance: Tolerance angle in degrees, the same as Edge.are_parallel.
+    :return: List of index arrays, one per group, in order of first appearance.
+    """
+    normals = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+    if len(normals) == 0:
+        return []
+
+    lengths = np.sqrt(np.einsum("ij,ij->i", normals, normals))
+    valid = np.all(np.isfinite(normals), axis=1) & (lengths > 0.0)
+    unit_normals = np.zeros_like(normals)
+    unit_normals[valid] = normals[valid] / lengths[valid, np.newaxis]
+
+    # Edge.are_parallel rounds the cosine to 5 decimals, so the largest angle it accepts
+    # is a little wider than the tolerance. Grid cells are sized to hold that angle's chord.
+    min_cos = math.cos(math.radians(tolerance)) - 5e-6
+    cell_size = math.sqrt(max(2.0 - 2.0 * min_cos, 0.0)) * 1.01 + 1e-12
+    cells = np.floor(unit_normals / cell_size).astype(np.int64)
+
+    # Every distinct normal is handled once, in the order it first appears.
+    # Normals that can never be parallel to anything get a group of their own.
+    unique_normals, first_index, inverse = np.unique(
+        np.where(valid[:, np.newaxis], normals, 0.0), axis=0,
+        return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    first_index = first_index[valid[first_index]]
+    order = np.sort(np.concatenate((first_index, np.flatnonzero(~valid))))
+
+    neighbor_offsets = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+    grid = {}  # cell -> list of group ids whose leader is in that cell
+    leader_normals = []
+    unique_group = np.full(len(unique_normals), -1, dtype=np.int64)
+    group_ids = np.empty(len(normals), dtype=np.int64)
+    cell_list = cells.tolist()
+    unit_list = unit_normals.tolist()
+
+    for index in order.tolist():
+        if not valid[index]:
+            group_ids[index] = len(leader_normals)
+            leader_normals.append(None)
+            continue
+
+        x, y, z = unit_list[index]
+        cx, cy, cz = cell_list[index]
+        match = -1
+        for dx, dy, dz in neighbor_offsets:
+            for group_id in grid.get((cx + dx, cy + dy, cz + dz), ()):
+                if match != -1 and group_id > match:
+                    continue
+                lx, ly, lz = leader_normals[group_id]
+                ratio = min(max(round(x * lx + y * ly + z * lz, 5), -1.0), 1.0)
+                if math.degrees(math.acos(ratio)) <= tolerance:
+                    match = group_id
+
+        if match == -1:
+            match = len(leader_normals)
+            leader_normals.append((x, y, z))
+            grid.setdefault((cx, cy, cz), []).append(match)
+        unique_group[inverse[index]] = match
+
+    group_ids[valid] = unique_group[inverse[valid]]
+
+    sorted_indices = np.argsort(group_ids, kind="stable")
+    splits = np.flatnonzero(np.diff(group_ids[sorted_indices])) + 1
+    return np.split(sorted_indices, splits)
 
 
 def make_face_groups_loop(normal_groups):
     """
     Take the list of normal groups as input. Return a list of faces.
+    Triangles of the same normal group that share an edge are joined with a union-find over
+    an edge index, so every triangle is visited a constant number of times.
     :param normal_groups:
     :return: a list of faces
     """
+    triangles = []
+    group_of = []
+    for group_id, n_g in enumerate(normal_groups):
+        triangles += n_g
+        group_of += [group_id] * len(n_g)
+
+    parent = list(range(len(triangles)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for triangle_ids in build_edge_index(triangles).values():
+        first_in_group = {}
+        for triangle_id in triangle_ids:
+            group_id = group_of[triangle_id]
+            if group_id in first_in_group:
+                root_a = find(first_in_group[group_id])
+                root_b = find(triangle_id)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+            else:
+                first_in_group[group_id] = triangle_id
+
+    components = {}
+    for triangle_id in range(len(triangles)):
+        components.setdefault(find(triangle_id), []).append(triangle_id)
+
+    # Keep the previous face order: normal groups from last to first, and within a group
+    # the face seeded by the last remaining triangle first. That seed also gives the
+    # face its normal.
     list_faces = []
-    while normal_groups:
-        n_g = normal_groups.pop()
-        while n_g:
-            triangle = n_g.pop()
-            f = Face([triangle])
-            # Get all neighbor:
-            flag = True
-            while flag:
-                flag = False
-                for e_triangle in n_g:
-                    if f.has_neighbor_improved(e_triangle):
-                        f.add_triangle(e_triangle)
-                        n_g.remove(e_triangle)
-                        flag = True
-            """
-            triangle_list = f.get_triangles()
-            for e_triangle in triangle_list:
-                if e_triangle in n_g:
-                    n_g.remove(e_triangle)
-            """
-            list_faces.append(f)
+    for triangle_ids in sorted(components.values(), key=lambda ids: ids[-1], reverse=True):
+        list_faces.append(Face([triangles[i] for i in reversed(triangle_ids)]))
     return list_faces
 
 
+def build_edge_index(triangles: []):
+    """
+    Build an index from each undirected edge to the triangles that contain it.
+    :param triangles: List of Triangles
+    :return: Dictionary of Edge.get_key() to a list of triangle indices.
+    """
+    edge_index = {}
+    for triangle_id, triangle in enumerate(triangles):
+        for edge in triangle.edges:
+            edge_index.setdefault(edge.get_key(), []).append(triangle_id)
+    return edge_index
+
+
 def make_face_boundaries(faces: []):
     """Step 2. Remove shared edges.
     :param faces: List of faces.
@@ -115,37 +202,162 @@ def make_face_boundaries(faces: []):
     # Faces is a list of faces, where faces are composed of triangles on the same plane and
     # have some edge connecting them.
     # faces.count() should return the number of planes on an object IE: A cube has 6 faces.
-    output = []
+    edges = []
+    face_ids = []
     normals = []
-    k = -1
-    for face in faces:
-        shared_edges = UniqueEdgeList()
-        all_edges_in_face = face.get_edges()
-
-        # len(face.triangles) should return the # of triangles in the face.
-        while len(face.triangles) > 0:
-            for m in range(len(face.triangles)):
-                for n in range(len(face.triangles)):
-                    if m is not n:
-                        for i in range(3):
-                            for j in range(3):
-                                # Compare an edge in triangle "m" vs the 3 other edges in
-                                # triangle "n"
-                                if Edge.are_overlapping_edges(face.triangles[m].edges[i],
-                                                              face.triangles[n].edges[j]):
-                                    shared_edges.add(face.triangles[m].edges[i])
-
-                face.triangles.pop(m)
-                break
-
-        k += 1
+    for face_id, face in enumerate(faces):
+        for triangle in face.triangles:
+            edges += triangle.edges
+            face_ids += [face_id] * len(triangle.edges)
         normals.append(face.get_normal())
-        output.append(UniqueEdgeList())
-        output[k] = UniqueEdgeList.set_difference(all_edges_in_face, shared_edges)
+
+    output = [UniqueEdgeList() for _ in faces]
+    is_boundary = find_boundary_edges(edges, face_ids)
+    for edge, face_id, boundary in zip(edges, face_ids, is_boundary.tolist()):
+        if boundary:
+            output[face_id].add(edge)
 
     return output, normals
 
 
+def find_boundary_edges(edges: [], face_ids: []):
+    """Find the edges that appear exactly once in their face, in either direction.
+    :param edges: List of edges from every triangle of every face.
+    :param face_ids: The face each edge belongs to.
+    :return: Boolean array, True where the edge is on the boundary of its face.
+    """
+    if len(edges) == 0:
+        return np.zeros(0, dtype=bool)
+
+    coords = np.array([[edge.x1, edge.y1, edge.z1, edge.x2, edge.y2, edge.z2] for edge in edges],
+                      dtype=np.float64)
+    _, vertex_ids = np.unique(coords.reshape(-1, 3), axis=0, return_inverse=True)
+    vertex_ids = vertex_ids.reshape(-1, 2)
+
+    # Same face and same two vertices means the same edge, whatever its direction.
+    keys = np.column_stack((np.asarray(face_ids, dtype=np.int64),
+                            vertex_ids.min(axis=1),
+                            vertex_ids.max(axis=1)))
+    return find_single_keys(keys)
+
+
+def find_single_keys(keys):
+    """Find the rows of a key array that appear exactly once.
+    :param keys: Int array of shape (n, k).
+    :return: Boolean array, True where the row is not repeated.
+    """
+    if len(keys) == 0:
+        return np.zeros(0, dtype=bool)
+
+    # Sort the rows so equal keys are next to each other, then a row is single when it
+    # differs from both the row before and the row after it.
+    order = np.lexsort(keys.T[::-1])
+    sorted_keys = keys[order]
+    changes = np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)
+    single = np.empty(len(keys), dtype=bool)
+    single[order] = (np.concatenate(([True], changes)) &
+                     np.concatenate((changes, [True])))
+    return single
+
+
+def make_indexed_faces(indexed_mesh: IndexedMesh):
+    """
+    Group the triangles of an IndexedMesh by normal, then into faces by connected parts.
+    Does the same as make_normal_groups and make_face_groups_loop, without Triangle objects.
+    :param indexed_mesh: The IndexedMesh.
+    :return: List of arrays of triangle indices, one per face, in the same order as
+    make_face_groups_loop.
+    """
+    count = indexed_mesh.count()
+    if count == 0:
+        return []
+
+    groups = group_normal_indices(indexed_mesh.get_normals())
+    group_of = np.empty(count, dtype=np.int64)
+    for group_id, group in enumerate(groups):
+        group_of[group] = group_id
+
+    # Where each triangle would be if the normal groups were laid out one after another.
+    position = np.empty(count, dtype=np.int64)
+    position[np.concatenate(groups)] = np.arange(count)
+
+    # Triangles of the same normal group that share an edge key are neighbors.
+    keys = indexed_mesh.get_edge_keys()
+    edge_triangles = np.repeat(np.arange(count), 3)
+    edge_groups = group_of[edge_triangles]
+    order = np.lexsort((keys[:, 1], keys[:, 0], edge_groups))
+    sorted_keys = keys[order]
+    sorted_groups = edge_groups[order]
+    same = ((sorted_groups[1:] == sorted_groups[:-1]) &
+            np.all(sorted_keys[1:] == sorted_keys[:-1], axis=1))
+    labels = label_components(count,
+                              edge_triangles[order][:-1][same],
+                              edge_triangles[order][1:][same])
+
+    # Each face lists its triangles from the last position to the first, and faces are
+    # ordered by their last triangle, like make_face_groups_loop.
+    triangle_order = np.lexsort((-position, labels))
+    splits = np.flatnonzero(np.diff(labels[triangle_order])) + 1
+    faces = np.split(triangle_order, splits)
+    faces.sort(key=lambda face: position[face[0]], reverse=True)
+    return faces
+
+
+def label_components(count: int, first, second):
+    """
+    Label the connected components of a graph, by hooking roots onto the smallest
+    neighboring root and pointer jumping until nothing changes.
+    :param count: The number of nodes.
+    :param first: Int array with the first node of every link.
+    :param second: Int array with the second node of every link.
+    :return: Int array with the smallest node index of each node's component.
+    """
+    labels = np.arange(count)
+    while True:
+        low = np.minimum(labels[first], labels[second])
+        new_labels = labels.copy()
+        np.minimum.at(new_labels, labels[first], low)
+        np.minimum.at(new_labels, labels[second], low)
+
+        while True:
+            jumped = new_labels[new_labels]
+            if np.array_equal(jumped, new_labels):
+                break
+            new_labels = jumped
+
+        if np.array_equal(new_labels, labels):
+            return labels
+        labels = new_labels
+
+
+def make_indexed_face_boundaries(indexed_mesh: IndexedMesh, faces: []):
+    """Step 2 for an IndexedMesh. Remove shared edges.
+    Only the boundary edges are turned into Edge objects.
+    :param indexed_mesh: The IndexedMesh.
+    :param faces: List of arrays of triangle indices, from make_indexed_faces.
+    :return: The same as make_face_boundaries.
+    """
+    if len(faces) == 0:
+        return [], []
+
+    triangle_ids = np.concatenate(faces)
+    face_ids = np.repeat(np.arange(len(faces)), [len(face) for face in faces])
+    edge_ids = (triangle_ids[:, np.newaxis] * 3 + np.arange(3)).reshape(-1)
+    edge_faces = np.repeat(face_ids, 3)
+
+    keys = np.column_stack((edge_faces, indexed_mesh.get_edge_keys()[edge_ids]))
+    is_boundary = find_single_keys(keys)
+    boundary_faces = edge_faces[is_boundary].tolist()
+    coordinates = indexed_mesh.get_edge_coordinates(edge_ids[is_boundary]).reshape(-1, 6).tolist()
+
+    output = [UniqueEdgeList() for _ in faces]
+    for face_id, (x1, y1, z1, x2, y2, z2) in zip(boundary_faces, coordinates):
+        output[face_id].add(Edge(x1, y1, z1, x2, y2, z2))
+
+    normals = indexed_mesh.get_normals()
+    return output, [normals[face[0]].tolist() for face in faces]
+
+
 def make_simple_boundaries(grouped_edges):
     """
     #Step 3
@@ -168,16 +380,14 @@ def make_simple_boundary(outline_edge_group: UniqueEdgeList, all_edges: UniqueEd
     :param all_edges:
     :return: ???
     """
-    while len(all_edges.edge_list) > 0:
-        current_edge = all_edges.edge_list[0]
+    while all_edges.count() > 0:
+        current_edge = all_edges.get_first_edge()
 
         work = False
-        neighbors = all_edges.get_neighbor_indices_for_edge(current_edge)
+        neighbors = all_edges.get_neighbors_for_edge(current_edge)
 
         # Loop against all neighboring edges, gobble up the neighbors.
-        for neighbor in neighbors:
-            neighbor_edge = all_edges.edge_list[neighbor]
-
+        for neighbor_edge in neighbors:
             if not Edge.same_edge(current_edge, neighbor_edge):
                 shared_vertex = Edge.has_shared_vertex(current_edge, neighbor_edge)
                 parallel = Edge.are_parallel_or_anti_parallel(current_edge, neighbor_edge)
@@ -212,7 +422,7 @@ def make_simple_boundary(outline_edge_group: UniqueEdgeList, all_edges: UniqueEd
                     work = True
                     break
 
-        if not work and len(all_edges.edge_list) > 0:
+        if not work and all_edges.count() > 0:
             outline_edge_group.add(current_edge)
             all_edges.remove(current_edge)
 
@@ -230,9 +440,9 @@ def split_boundaries(grouped_edges):
     buckets = []
 
     for group in grouped_edges:
-        if len(group.edge_list) > 0:
+        if group.count() > 0:
             current_edge_list = UniqueEdgeList()
-            current_edge_list.add(group.edge_list[0])
+            current_edge_list.add(group.get_first_edge())
 
             unique_edge_lists = split_boundary([current_edge_list], group, 0)
 
@@ -251,27 +461,33 @@ def split_boundary(unique_edge_lists: [], all_edges: UniqueEdgeList, i: int):
     """
     i = 0
     j = 0
+    # Buckets only ever grow, so keep their edges in a list for indexing by j.
+    bucket_edges = [list(unique_edge_lists[i].edge_list)]
 
-    while len(all_edges.edge_list) > 0:
-        current_edge_in_bucket = unique_edge_lists[i].edge_list[j]
+    while all_edges.count() > 0:
+        current_edge_in_bucket = bucket_edges[i][j]
         work = False
+        added_edges = [current_edge_in_bucket]
 
-        for e in all_edges.edge_list:
-            if (not Edge.same_edge(e, current_edge_in_bucket)) and \
-                    (Edge.has_shared_vertex(e, current_edge_in_bucket) is not None):
+        for e in all_edges.get_neighbors_for_edge(current_edge_in_bucket):
+            if not Edge.same_edge(e, current_edge_in_bucket):
                 if unique_edge_lists[i].add(e):
+                    bucket_edges[i].append(e)
+                    added_edges.append(e)
                     work = True
 
         # Remove all_edges from list that exist in bucket.
-        for e in unique_edge_lists[i].edge_list:
+        for e in added_edges:
             all_edges.remove(e)
 
         if work is False:
-            if len(all_edges.edge_list) > 0:
+            if all_edges.count() > 0:
                 new_edge_list = UniqueEdgeList()
-                new_edge_list.add(all_edges.edge_list[0])
-                all_edges.edge_list.pop(0)
+                new_edge = all_edges.get_first_edge()
+                new_edge_list.add(new_edge)
+                all_edges.remove(new_edge)
                 unique_edge_lists.append(new_edge_list)
+                bucket_edges.append([new_edge])
                 i += 1
                 j = 0
         else:
@@ -327,51 +543,73 @@ def buckets_to_dicts(buckets):
     faces = []
 
     for face in buckets:
-        # Dictionary where keys are unique vertices, values = index of vert list
-        vert_dict = {}
-
-        new_face = {}  # dict with edge, vert, and hole lists
-        vert_list = []  # all unique verts in this face
-        edge_list = []  # all edges in this face.
-        # Each edge is of form [a,b] where a and b are index of vert_list
-        hole_list = []  # 1 interior point for every hole on this face
-
-        for b in range(len(face)):  # each boundary
-            boundary_edges = []  # edges for current boundary
-
-            for edge in face[b].edge_list:
-                v1 = (edge.x1, edge.y1, edge.z1)
-                v2 = (edge.x2, edge.y2, edge.z2)
-                # if verts aren't in dictionary, add them to both vert list and dict
-                # key value will be index of that vert in the vert list
-                if v1 not in vert_dict:
-                    vert_dict[v1] = len(vert_list)
-                    vert_list.append(v1)
-                if v2 not in vert_dict:
-                    vert_dict[v2] = len(vert_list)
-                    vert_list.append(v2)
-
-                boundary_edges.append([vert_dict[v1], vert_dict[v2]])
-
-            if b > 0:  # This boundary is a hole
-                # Get an interior point by triangulating and finding centroid
-                hole = {"vertices": np.asarray(vert_list),
-                        "segments": np.asarray(boundary_edges)}
-
-                tri_hole = triangulate(hole)
-                hole_coord = find_inner_point(tri_hole)
-                hole_list.append(hole_coord)
-
-            edge_list += boundary_edges  # add boundary edges to all face edges
-
-        new_face["segments"] = np.asarray(edge_list)
-        new_face["holes"] = np.asarray(hole_list)
-        new_face["vertices"] = np.asarray(vert_list)
-        faces.append(new_face)
+        faces.append(bucket_to_dict(face))
 
     return faces
 
 
+def bucket_to_dict(face):
+    """
+    Convert the boundaries of one face into a form that can be used by
+    triangulation library.
+
+    :param face: List of UniqueEdgeLists, the outside boundary first and then its holes.
+    :return: Face dictionary with 'segments' (edges), 'vertices', and 'holes' keys.
+    """
+    # Dictionary where keys are unique vertices, values = index of vert list
+    vert_dict = {}
+
+    new_face = {}  # dict with edge, vert, and hole lists
+    vert_list = []  # all unique verts in this face
+    edge_list = []  # all edges in this face.
+    # Each edge is of form [a,b] where a and b are index of vert_list
+    hole_list = []  # 1 interior point for every hole on this face
+
+    for b in range(len(face)):  # each boundary
+        boundary_edges = []  # edges for current boundary
+
+        for edge in face[b].edge_list:
+            v1 = (edge.x1, edge.y1, edge.z1)
+            v2 = (edge.x2, edge.y2, edge.z2)
+            # if verts aren't in dictionary, add them to both vert list and dict
+            # key value will be index of that vert in the vert list
+            if v1 not in vert_dict:
+                vert_dict[v1] = len(vert_list)
+                vert_list.append(v1)
+            if v2 not in vert_dict:
+                vert_dict[v2] = len(vert_list)
+                vert_list.append(v2)
+
+            boundary_edges.append([vert_dict[v1], vert_dict[v2]])
+
+        if b > 0:  # This boundary is a hole
+            # Get an interior point by triangulating and finding centroid
+            hole = {"vertices": np.asarray(vert_list),
+                    "segments": np.asarray(boundary_edges)}
+
+            tri_hole = triangulate(hole)
+            hole_coord = find_inner_point(tri_hole)
+            hole_list.append(hole_coord)
+
+        edge_list += boundary_edges  # add boundary edges to all face edges
+
+    new_face["segments"] = np.asarray(edge_list)
+    new_face["holes"] = np.asarray(hole_list)
+    new_face["vertices"] = np.asarray(vert_list)
+    return new_face
+
+
+def triangulate_bucket(face):
+    """
+    Convert the boundaries of one face and triangulate it. Faces are independent of each
+    other, so this can be handed to a process pool.
+
+    :param face: List of UniqueEdgeLists, the outside boundary first and then its holes.
+    :return: The same as triangulate.
+    """
+    return triangulate(bucket_to_dict(face))
+
+
 def triangulate(face):
     """
     Does triangulation of face in 3D. Does 2D projection, triangulates, and
@@ -467,43 +705,110 @@ def find_inner_point(triangulation):
 
 def triangulation_to_mesh(triangulations, normals):
     """
-
-    :param triangulations:
-    :param normals:
-    :return:
+    Combine the triangulations of every face into one mesh, with each triangle wound so its
+    normal agrees with the normal of its face.
+    :param triangulations: List of triangulations, as returned by triangulate.
+    :param normals: The normal of each face.
+    :return: The Mesh.
     """
-    meshes = []
-    for i in range(len(triangulations)):
-        tri_count = len(triangulations[i]['triangles'])  # Number of triangles
+    tri_counts = [len(triangulation['triangles']) for triangulation in triangulations]
+    tri_total = sum(tri_counts)
 
-        # load triangulation data into a mesh format (list of triangles)
-        out_data = np.zeros(tri_count, dtype=Mesh.dtype)
-        for tri_num in range(tri_count):
+    out_data = np.zeros(tri_total, dtype=Mesh.dtype)
+    if tri_total == 0:
+        return Mesh(out_data)
 
-            # Make new tri and load in the 3 vertices
-            new_tri = []
-            for vert in triangulations[i]['triangles'][tri_num]:
-                new_tri.append(triangulations[i]['vertices'][vert])
+    # Look up the 3 vertices of every triangle of every face
+    new_tris = np.concatenate(
+        [np.asarray(triangulation['vertices'], dtype=np.float64)[triangulation['triangles']]
+         for triangulation, tri_count in zip(triangulations, tri_counts) if tri_count > 0])
+    face_normals = np.repeat(np.asarray(normals, dtype=np.float64), tri_counts, axis=0)
 
-            # Calculate normal of new tri
-            new_normal = np.cross(new_tri[1] - new_tri[0], new_tri[2] - new_tri[0])
-            new_normal = new_normal / np.sqrt(new_normal.dot(new_normal))
-            flipped_normal = -1*new_normal
+    # Calculate normal of each new tri
+    with np.errstate(divide='ignore', invalid='ignore'):
+        new_normals = np.cross(new_tris[:, 1] - new_tris[:, 0], new_tris[:, 2] - new_tris[:, 0])
+        new_normals /= np.sqrt(np.einsum('ij,ij->i', new_normals, new_normals))[:, np.newaxis]
 
-            # Check if the normal is different than original face normal
-            new_dif = np.sum(abs(normals[i] - new_normal))
-            flipped_dif = np.sum(abs(normals[i] - flipped_normal))
+    # Check if the normal is closer to the original face normal when flipped
+    new_dif = np.sum(np.abs(face_normals - new_normals), axis=1)
+    flipped_dif = np.sum(np.abs(face_normals + new_normals), axis=1)
+    flip = flipped_dif < new_dif
 
-            new_tri = np.asarray(new_tri)
+    # Reverse order of vertices to flip tri normal
+    new_tris[flip] = new_tris[flip, ::-1]
 
-            if flipped_dif < new_dif:
-                # Reverse order of vertices to flip tri normal
-                new_tri = np.flip(new_tri, axis=0)
+    out_data['vectors'] = new_tris
+    return Mesh(out_data)  # create mesh object from triangle data
 
-            out_data['vectors'][tri_num] = new_tri
 
-        meshes.append(out_data)
-
-    meshes = np.concatenate(meshes)  # combine all mesh vertices to one object
-    new_mesh = Mesh(meshes.copy())   # create mesh object from triangle data
-    return new_mesh
+def merge_coplanar_quads(mesh: Mesh, tolerance=0.0004):
+    """
+    Pair up triangles that share an edge, lie in the same plane and together make a convex
+    quad, so they can be written out as one LDraw quad instead of two triangles.
+    :param mesh: The Mesh to pair the triangles of.
+    :param tolerance: The largest angle in radians between the normals of a pair.
+    :return: Float array of shape (k, 4, 3) with the corners of each quad, wound like the mesh,
+    and a Mesh of the triangles that were not paired.
+    """
+    vectors = np.asarray(mesh.vectors, dtype=np.float64)
+    tri_count = len(vectors)
+    if tri_count < 2:
+        return np.zeros((0, 4, 3)), mesh
+
+    _, inverse = np.unique(vectors.reshape(-1, 3), axis=0, return_inverse=True)
+    faces = inverse.reshape(-1, 3)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normals = np.cross(vectors[:, 1] - vectors[:, 0], vectors[:, 2] - vectors[:, 0])
+        normals /= np.sqrt(np.einsum('ij,ij->i', normals, normals))[:, np.newaxis]
+
+    # Edge k of a triangle runs from corner k to corner k + 1, opposite corner k + 2
+    starts = faces.reshape(-1)
+    ends = np.roll(faces, -1, axis=1).reshape(-1)
+    keys = np.stack((np.minimum(starts, ends), np.maximum(starts, ends)), axis=1)
+    order = np.lexsort((keys[:, 1], keys[:, 0]))
+    sorted_keys = keys[order]
+    same_as_next = np.all(sorted_keys[1:] == sorted_keys[:-1], axis=1)
+
+    # Only edges shared by exactly two triangles, which run in opposite directions
+    is_pair = same_as_next.copy()
+    is_pair[1:] &= ~same_as_next[:-1]
+    is_pair[:-1] &= ~same_as_next[1:]
+    first = order[:-1][is_pair]
+    second = order[1:][is_pair]
+    opposite = (starts[first] == ends[second]) & (ends[first] == starts[second])
+    first = first[opposite]
+    second = second[opposite]
+
+    tri_a, corner_a = np.divmod(first, 3)
+    tri_b, corner_b = np.divmod(second, 3)
+    with np.errstate(invalid='ignore'):
+        coplanar = np.einsum('ij,ij->i', normals[tri_a], normals[tri_b]) >= math.cos(tolerance)
+    tri_a, corner_a = tri_a[coplanar], corner_a[coplanar]
+    tri_b, corner_b = tri_b[coplanar], corner_b[coplanar]
+
+    # Triangle a is (s, e, c) and triangle b is (e, s, d), so the quad is (s, d, e, c)
+    quads = np.stack((vectors[tri_a, corner_a],
+                      vectors[tri_b, (corner_b + 2) % 3],
+                      vectors[tri_a, (corner_a + 1) % 3],
+                      vectors[tri_a, (corner_a + 2) % 3]), axis=1)
+
+    # Convex when every corner turns the same way as the triangles
+    sides = np.roll(quads, -1, axis=1) - quads
+    turns = np.einsum('ijk,ik->ij', np.cross(sides, np.roll(sides, -1, axis=1)), normals[tri_a])
+    scale = np.einsum('ijk,ijk->ij', sides, sides).max(axis=1)
+    convex = np.all(turns > scale[:, np.newaxis] * 1e-9, axis=1)
+    tri_a, tri_b, quads = tri_a[convex], tri_b[convex], quads[convex]
+
+    # Greedily take the pairs across their longest shared edge, each triangle at most once
+    shared = quads[:, 2] - quads[:, 0]
+    candidates = np.argsort(-np.einsum('ij,ij->i', shared, shared), kind='stable')
+    paired = np.zeros(tri_count, dtype=bool)
+    chosen = []
+    for i, a, b in zip(candidates.tolist(), tri_a[candidates].tolist(), tri_b[candidates].tolist()):
+        if not paired[a] and not paired[b]:
+            paired[a] = paired[b] = True
+            chosen.append(i)
+    chosen.sort()
+
+    return quads[chosen], Mesh(mesh.data[~paired].copy())
@@ -11,10 +11,19 @@
 # See LICENSE file for the full text.
 import json
 import numpy
-import warnings
+import os
+import shutil
+import atexit
+import tempfile
 import logging
-from stl import Mesh
 from src.settings_manager import SettingsManager
+from src.util import Util
+from src.model_conversion.conversion_pipeline import ConversionPipeline
+from src.model_conversion.stage_profiler import StageProfiler
+
+# The umask can only be read by setting it, which is done once before any thread starts.
+file_creation_mask = os.umask(0o022)
+os.umask(file_creation_mask)
 
 
 class ModelShipper:
@@ -24,22 +33,36 @@ class ModelShipper:
     LDraw (.dat) files.
     """
     input_model = None # Mesh loaded in from input file
+    input_cache_key = None # MeshCache key of the file last loaded, None when not cached
+    input_path = None # The file last loaded, when its mesh is memory mapped and cheap to load again
     output_model = None # LDraw file
     output_data_text = None # The text to write out to output path when save pressed
+    output_data_path = None # Temporary file the LDraw lines were streamed to, when stream_output is on
+    stream_output = True # Stream the LDraw lines to a temporary file instead of output_data_text
+    recalculate_normals = True # Recalculate normals on load, off keeps a binary STL memory mapped untouched
+    output_profile = None # Stage records of the last conversion, when StageProfiler is enabled
 
     @staticmethod
-    def load_stl_model(file_path: str):
+    def load_stl_model(file_path: str, progress=None):
         """Load an STL model into ModelShipper.input_model.
+        The parsed mesh is kept in the MeshCache, so loading the same file again is fast.
 
         :param file_path: The path to the stl file.
+        :param progress: Optional function called with the fraction of an ASCII file read so far,
+        so it can be shown in the log.
         :return: The BaseStl model (numpy-stl) loaded from the file_path or None.
         """
-        # turn numpy RuntimeWarning to actual error to avoid invalid STL files
-        numpy.seterr(all='warn')
-        warnings.filterwarnings('error')
+        # numpy floating point errors are raised while loading, to avoid invalid STL files
+        ModelShipper.input_cache_key = None
+        ModelShipper.input_path = None
         try:
-            return Mesh.from_file(file_path)
-        except (Exception, RuntimeWarning) as err:
+            mesh, ModelShipper.input_cache_key = ConversionPipeline.load_mesh(
+                file_path, ModelShipper.recalculate_normals, progress)
+            # A binary file or a cached mesh, which a worker process can map again
+            if isinstance(mesh.data.base, numpy.memmap):
+                ModelShipper.input_path = file_path
+            return mesh
+        except Exception as err:
             logging.error(f"Failed to open the STL file : {err}")
             return False
 
@@ -60,15 +83,111 @@ class ModelShipper:
         with open(SettingsManager.file_path, "r") as file:
             file_settings = json.load(file)
             file_name = file_settings["part_name"]
-            part_name = file_name
-            if part_name.endswith(".dat"):
-                part_name = part_name[:-4]
             author = file_settings["author"]
             license = file_settings["license"]
 
+        return ModelShipper.format_metadata(file_name, author, license)
+
+    @staticmethod
+    def format_metadata(file_name: str, author: str, license: str):
+        """Build a string of metadata lines
+        :param file_name: The file name of the part.
+        :param author: The author of the part.
+        :param license: The license of the part.
+        :return: String containing all metadata lines
+        """
+        part_name = file_name
+        if part_name.endswith(".dat"):
+            part_name = part_name[:-4]
+
         metadata_text = "0 " + "LScan auto generated part " + part_name + ".dat\n"
         metadata_text += "0 " + "Name: " + file_name + "\n"
         metadata_text += "0 " + "Author: " + author + "\n"
         metadata_text += "0 " + "!LICENSE " + license + "\n"
         return metadata_text
 
+    @staticmethod
+    def get_output_path():
+        """Build the path the part will be saved to from the part_dir and part_name settings.
+
+        :return: The absolute path of the output file.
+        """
+        with open(SettingsManager.file_path, "r") as file:
+            file_settings = json.load(file)
+            part_dir = file_settings["part_dir"]
+            part_name = file_settings["part_name"]
+
+        return Util.path_conversion(part_dir + "/" + part_name)
+
+    @staticmethod
+    def open_output_data():
+        """Start a new temporary file in the system temporary directory to stream the LDraw
+        lines into, so one left behind by a crash is not in the parts folder. Any earlier
+        temporary file is removed first.
+
+        :return: The temporary file, opened for writing text.
+        """
+        ModelShipper.discard_output_data()
+        handle, ModelShipper.output_data_path = tempfile.mkstemp(suffix=".dat.tmp")
+        ModelShipper.output_data_text = None
+        return open(handle, "w")
+
+    @staticmethod
+    def discard_output_data():
+        """Remove the temporary file holding the streamed LDraw lines, if there is one.
+
+        :return: None
+        """
+        if ModelShipper.output_data_path is not None:
+            try:
+                os.remove(ModelShipper.output_data_path)
+            except OSError as err:
+                logging.error(f"Failed to remove the temporary output file : {err}")
+            ModelShipper.output_data_path = None
+
+    @staticmethod
+    def save_output(file_path: str):
+        """Write the metadata and the converted LDraw lines to file_path.
+        The file is built next to file_path and renamed over it, so a failed save never leaves
+        a partial part behind. The part keeps the mode of the file it replaces, or gets the
+        mode a new file would get from the umask. Streamed lines are copied from their temporary file in blocks,
+        and it is kept so the part can be saved again with different metadata. The stage profile
+        of the conversion, if there is one, is written next to the part.
+
+        :param file_path: The path to save the part to.
+        :return: None
+        """
+        handle, temp_path = tempfile.mkstemp(suffix=".dat.tmp", dir=Util.get_parent(file_path))
+        try:
+            with open(handle, "w") as text_file:
+                text_file.write(ModelShipper.get_metadata())
+                if ModelShipper.output_data_path is not None:
+                    with open(ModelShipper.output_data_path, "r") as data_file:
+                        shutil.copyfileobj(data_file, text_file)
+                elif ModelShipper.output_data_text is not None:
+                    text_file.write(ModelShipper.output_data_text)
+            ModelShipper.copy_file_mode(temp_path, file_path)
+            os.replace(temp_path, file_path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+        if ModelShipper.output_profile and StageProfiler.dump_json:
+            StageProfiler.save(file_path + ".profile.json", ModelShipper.output_profile)
+
+    @staticmethod
+    def copy_file_mode(temp_path: str, file_path: str):
+        """Give a temporary file the mode of the file it is about to replace, or the mode a new
+        file would get from the umask. mkstemp makes files readable by the owner only.
+
+        :param temp_path: The temporary file.
+        :param file_path: The path it will be renamed to.
+        :return: None
+        """
+        if Util.is_file(file_path):
+            os.chmod(temp_path, os.stat(file_path).st_mode & 0o7777)
+        else:
+            os.chmod(temp_path, 0o666 & ~file_creation_mask)
+
+
+atexit.register(ModelShipper.discard_output_data)
@@ -10,90 +10,43 @@
 
 from src.threading.base_job import BaseJob
 from src.model_conversion.model_shipper import ModelShipper
-import src.model_conversion.mesh_triangulation as MeshTriangulation
 from src.model_conversion.ldraw_model import LDrawModel
+from src.model_conversion.conversion_pipeline import ConversionPipeline
+from src.model_conversion.stage_profiler import StageProfiler
+from src.log_messages.log_type import LogType
+from src.log_messages.profile_message import ProfileMessage
 
 
 class SimplifyJob(BaseJob):
     """This job simplifies the mesh
     """
+    use_indexed_mesh = True  # Find the face boundaries from an IndexedMesh, not Triangle objects
+    triangulation_processes = 0  # Worker processes to triangulate faces with, 0 or 1 for none
+    job_settings = ("use_indexed_mesh", "triangulation_processes")
+
     def __init__(self, feedback_log):
         super().__init__(feedback_log)
         self.name = "mesh simplification"
 
     def do_job(self):
         self.update_status("Starting " + self.name + ".")
-        self.is_running.wait()
-        # Setting output model as input LDraw object
-        mesh = None # The mesh to be converted
-        if not self.is_killed:
-            model = ModelShipper.input_model
-            mesh = model.get_mesh()
-
-        self.is_running.wait()
-        if not self.is_killed:
-            # Step 1: Create list of triangle objects from mesh
-            self.update_status("Separating faces...")
-            triangles = MeshTriangulation.get_mesh_triangles(mesh)
-
-        self.is_running.wait()
-        if not self.is_killed:
-            # Step 2: Group triangles by their normals
-            normal_groups = MeshTriangulation.make_normal_groups(triangles)
-
-        self.is_running.wait()
-        if not self.is_killed:
-            # Group normal groups into faces (by connected parts)
-            faces = MeshTriangulation.make_face_groups_loop(normal_groups)
-
-        self.is_running.wait()
-        if not self.is_killed:
-            # Step 3: Get only outline edges for each face
-            self.update_status("Simplifying faces...")
-            face_boundaries, face_normals = MeshTriangulation.make_face_boundaries(
-                faces)
-
         self.is_running.wait()
         if not self.is_killed:
-            # Simplify outline edges for each face (remove redundant vertices)
-            simple_boundaries = MeshTriangulation.make_simple_boundaries(
-            face_boundaries)
-
-        self.is_running.wait()
-        if not self.is_killed:
-            # Split each outline by connected parts
-            separate_boundaries = MeshTriangulation.split_boundaries(
-                simple_boundaries)
-
-        self.is_running.wait()
-        if not self.is_killed:
-            # Rearranges edges in each face so that outer edge at index 0
-            ordered_separate_boundaries = MeshTriangulation.find_outside_boundary(
-                separate_boundaries)
-
-        self.is_running.wait()
-        if not self.is_killed:
-            self.update_status("Triangulating...")
-            # Convert output data to different format
-            triangulated_faces = MeshTriangulation.buckets_to_dicts(
-                ordered_separate_boundaries)
-
-        # Triangulate each face
-        triangulations = []
-        for face in triangulated_faces:
-            self.is_running.wait()
-            if not self.is_killed:
-                triangulations.append(MeshTriangulation.triangulate(face))
-            else:
-                break
-
-        self.is_running.wait()
-        if not self.is_killed:
-            self.update_status("Recombining into mesh...")
-            # Convert to a mesh
-            simple_model = MeshTriangulation.triangulation_to_mesh(triangulations,
-                                                                   face_normals)
-            ModelShipper.output_model = LDrawModel(mesh=simple_model)
+            # Simplify the input mesh, pausing or stopping between steps
+            pipeline = ConversionPipeline(self.continue_job)
+            pipeline.use_indexed_mesh = self.use_indexed_mesh
+            pipeline.triangulation_processes = self.triangulation_processes
+            ModelShipper.output_profile = None
+            if StageProfiler.enabled:
+                pipeline.profiler = StageProfiler(self.put_stage)
+            simple_model = pipeline.simplify(ModelShipper.input_model.get_mesh(),
+                                             ModelShipper.input_cache_key)
+            if simple_model is not None:
+                ModelShipper.output_model = LDrawModel(mesh=simple_model)
+
+            if pipeline.profiler is not None:
+                # The convert job adds its own stages to the same profile
+                ModelShipper.output_profile = pipeline.profiler.stages
 
         self.is_running.wait()
         if not self.is_killed: # Job completed (not killed)
@@ -104,3 +57,11 @@ class SimplifyJob(BaseJob):
             self.update_status("Cancelled during " + self.name + ".")
 
         self.is_done.set()  # Set this so thread manager knows job is done
+
+    def put_stage(self, stage: dict):
+        """Report a stage of the conversion as soon as it ends.
+
+        :param stage: The stage dictionary made by the StageProfiler.
+        :return: None
+        """
+        self.put_feedback(ProfileMessage(LogType.DEBUG, StageProfiler.format_stage(stage), stage))
@@ -0,0 +1,106 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import json
+import time
+import logging
+import tracemalloc
+import contextlib
+
+
+class StageProfiler:
+    """Records the wall time, CPU time, peak allocated memory and element counts of each stage
+    of a conversion. Each stage is kept as a dictionary, so the records can be sent between
+    processes and written out as JSON.
+    """
+    enabled = False  # Profile the stages of the conversion jobs
+    trace_memory = True  # Measure the peak memory of each stage with tracemalloc, makes the stages slower
+    dump_json = True  # Write the stages of a conversion next to the output file when it is saved
+
+    def __init__(self, stage_callback=None):
+        """Constructor for the StageProfiler class.
+
+        :param stage_callback: Optional function called with the dictionary of each stage as
+        soon as the stage ends.
+        """
+        self.stages = []
+        self.stage_callback = stage_callback
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **inputs):
+        """Profile the code run in a with block as one stage.
+
+        :param name: The name of the stage.
+        :param inputs: The number of each kind of element going into the stage.
+        :return: A context manager giving the dictionary to put the output element counts in.
+        """
+        record = {"stage": name,
+                  "wall_time": 0.0,
+                  "cpu_time": 0.0,
+                  "peak_memory": None,
+                  "inputs": inputs,
+                  "outputs": {}}
+
+        # The peak is measured from the start of the stage, either by starting to trace here or
+        # by resetting the peak of a trace that is running, which needs Python 3.9.
+        started_tracing = StageProfiler.trace_memory and not tracemalloc.is_tracing()
+        measure_peak = started_tracing or (tracemalloc.is_tracing() and
+                                           hasattr(tracemalloc, "reset_peak"))
+        if started_tracing:
+            tracemalloc.start()
+        elif measure_peak:
+            tracemalloc.reset_peak()
+        if measure_peak:
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield record["outputs"]
+        finally:
+            record["wall_time"] = time.perf_counter() - start_wall
+            record["cpu_time"] = time.process_time() - start_cpu
+            if measure_peak:
+                record["peak_memory"] = tracemalloc.get_traced_memory()[1] - start_memory
+            if started_tracing:
+                tracemalloc.stop()
+            self.stages.append(record)
+            if self.stage_callback is not None:
+                self.stage_callback(record)
+
+    @staticmethod
+    def format_stage(record: dict):
+        """Format a stage record as one line of text.
+
+        :param record: A stage dictionary made by stage().
+        :return: The line of text.
+        """
+        text = f"{record['stage']}: {record['wall_time']:.3f}s wall, {record['cpu_time']:.3f}s cpu"
+        if record["peak_memory"] is not None:
+            text += f", {record['peak_memory'] / (1024 * 1024):.1f} MiB peak"
+        inputs = ", ".join(f"{count} {name}" for name, count in record["inputs"].items())
+        outputs = ", ".join(f"{count} {name}" for name, count in record["outputs"].items())
+        if inputs or outputs:
+            text += f", {inputs or '-'} -> {outputs or '-'}"
+        return text
+
+    @staticmethod
+    def save(file_path: str, stages: []):
+        """Write stage records to a JSON file.
+
+        :param file_path: The path of the JSON file.
+        :param stages: List of stage dictionaries made by stage().
+        :return: True if the file was written.
+        """
+        try:
+            with open(file_path, "w") as file:
+                json.dump({"stages": stages}, file, indent=4)
+        except OSError as err:
+            logging.error(f"Failed to write the stage profile : {err}")
+            return False
+        return True
@@ -0,0 +1,168 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import os
+import re
+import numpy
+from stl import Mesh
+
+
+class StlReader:
+    """The static class responsible for reading STL files into numpy-stl Meshes.
+    """
+    header_size = 80  # Bytes of free text at the start of a binary STL
+    count_size = 4  # Bytes of the little endian facet count after the header
+    ascii_chunk_size = 1 << 20  # Bytes of an ASCII STL file parsed at a time
+    ascii_facet_size = 200  # Rough bytes per facet of an ASCII STL, to size the first array
+    normal_pattern = re.compile(rb"facet[ \t]+normal[ \t]+(\S+[ \t]+\S+[ \t]+\S+)", re.IGNORECASE)
+    vertex_pattern = re.compile(rb"vertex[ \t]+(\S+[ \t]+\S+[ \t]+\S+)", re.IGNORECASE)
+    end_pattern = re.compile(rb"^[ \t]*end[ \t]?solid", re.IGNORECASE | re.MULTILINE)
+
+    @staticmethod
+    def get_binary_count(file_path: str):
+        """Get the facet count of a binary STL file.
+
+        :param file_path: The path to the stl file.
+        :return: The facet count, or None if the file is not a binary STL.
+        """
+        data_offset = StlReader.header_size + StlReader.count_size
+        file_size = os.path.getsize(file_path)
+        if file_size < data_offset:
+            return None
+
+        with open(file_path, "rb") as file:
+            file.seek(StlReader.header_size)
+            count = int.from_bytes(file.read(StlReader.count_size), "little")
+
+        # ASCII files can start with "solid" just like a binary header can, but the size of
+        # a binary file always matches its facet count.
+        if file_size != data_offset + count * Mesh.dtype.itemsize:
+            return None
+        return count
+
+    @staticmethod
+    def load_binary(file_path: str, calculate_normals: bool = True):
+        """Load a binary STL file by memory mapping it, so the facet records are viewed where
+        the OS already caches them instead of being read and copied.
+        The mapping is copy on write: the file is never changed, and only the pages that get
+        written to (such as the normals, when they are recalculated) are copied.
+
+        :param file_path: The path to the stl file.
+        :param calculate_normals: Recalculate the normals from the vertices, like Mesh.from_file.
+        :return: The Mesh, or None if the file is not a non-empty binary STL.
+        """
+        count = StlReader.get_binary_count(file_path)
+        if not count:
+            return None
+
+        with open(file_path, "rb") as file:
+            name = file.read(StlReader.header_size).strip()
+
+        data = numpy.memmap(file_path, dtype=Mesh.dtype, mode="c",
+                            offset=StlReader.header_size + StlReader.count_size, shape=(count,))
+        # A plain ndarray view of the mapping, so the Mesh arrays behave like loaded ones.
+        return Mesh(data.view(numpy.ndarray), calculate_normals, name=name)
+
+    @staticmethod
+    def load_ascii(file_path: str, calculate_normals: bool = True, progress=None):
+        """Load an ASCII STL file a chunk at a time. The normal and vertex values of each chunk
+        are found with a regular expression and parsed together by numpy, into an array that
+        grows as needed. Like Mesh.from_file, only the first solid of the file is read.
+
+        :param file_path: The path to the stl file.
+        :param calculate_normals: Recalculate the normals from the vertices, like Mesh.from_file.
+        :param progress: Optional function called with the fraction of the file read so far.
+        :return: The Mesh, or None if the file does not start like an ASCII STL or has no facets,
+        such as a binary STL whose header starts with "solid".
+        """
+        file_size = os.path.getsize(file_path)
+        data = numpy.zeros(max(file_size // StlReader.ascii_facet_size, 1), dtype=Mesh.dtype)
+        normal_count = 0
+        vertex_count = 0
+
+        with open(file_path, "rb") as file:
+            name = file.readline()
+            while name and not name.strip():
+                name = file.readline()
+            if not name.strip().lower().startswith(b"solid"):
+                return None
+            name = name.strip()[5:].strip()
+
+            remainder = b""
+            is_end = False
+            while not is_end:
+                chunk = file.read(StlReader.ascii_chunk_size)
+                is_end = not chunk
+                chunk = remainder + chunk
+
+                # Parse up to the last full line, the rest goes with the next chunk
+                end = StlReader.end_pattern.search(chunk)
+                if end is not None:
+                    chunk = chunk[:end.start()]
+                    is_end = True
+                elif not is_end:
+                    split = chunk.rfind(b"\n") + 1
+                    chunk, remainder = chunk[:split], chunk[split:]
+
+                normals = StlReader.parse_values(StlReader.normal_pattern.findall(chunk))
+                vertices = StlReader.parse_values(StlReader.vertex_pattern.findall(chunk))
+
+                needed = max(normal_count + len(normals), (vertex_count + len(vertices) + 2) // 3)
+                if needed > len(data):
+                    grown = numpy.zeros(max(needed, 2 * len(data)), dtype=Mesh.dtype)
+                    grown[:len(data)] = data
+                    data = grown
+
+                data["normals"][normal_count:normal_count + len(normals)] = normals
+                indices = numpy.arange(vertex_count, vertex_count + len(vertices))
+                data["vectors"][indices // 3, indices % 3] = vertices
+                normal_count += len(normals)
+                vertex_count += len(vertices)
+
+                if progress is not None:
+                    progress(1.0 if is_end else file.tell() / file_size)
+
+        if normal_count == 0 and vertex_count == 0:
+            return None
+        if vertex_count != normal_count * 3:
+            raise ValueError(f"Found {normal_count} facet normals and {vertex_count} vertices "
+                             f"in the STL file: {file_path}")
+
+        data.resize((normal_count,), refcheck=False)
+        return Mesh(data, calculate_normals, name=name)
+
+    @staticmethod
+    def parse_values(matches: []):
+        """Parse the text of some xyz triples.
+
+        :param matches: List of bytes, each with three numbers separated by spaces.
+        :return: Float32 array of shape (len(matches), 3).
+        """
+        if not matches:
+            return numpy.zeros((0, 3), dtype=numpy.float32)
+        # Parsed as float64 first, so each value is rounded the same way float() rounds it.
+        values = numpy.array(b" ".join(matches).split(), dtype=numpy.float64)
+        return values.astype(numpy.float32).reshape(-1, 3)
+
+    @staticmethod
+    def load(file_path: str, calculate_normals: bool = True, progress=None):
+        """Load a binary STL file through load_binary, an ASCII STL file through load_ascii,
+        or any other STL file through Mesh.from_file.
+
+        :param file_path: The path to the stl file.
+        :param calculate_normals: Recalculate the normals from the vertices.
+        :param progress: Optional function called with the fraction of an ASCII file read so far.
+        :return: The Mesh.
+        """
+        mesh = StlReader.load_binary(file_path, calculate_normals)
+        if mesh is None:
+            mesh = StlReader.load_ascii(file_path, calculate_normals, progress)
+        if mesh is None:
+            mesh = Mesh.from_file(file_path, calculate_normals)
+        return mesh
@@ -14,29 +14,86 @@ from src.model_conversion.edge import Edge
 
 class UniqueEdgeList:
     """This class is a container for unique edges composed in a list format.
+    Edges are stored in a dict keyed by Edge.get_key(), in insertion order, along with an
+    index from each vertex to the edges that touch it.
     """
 
     def __init__(self):
         """Constructor that makes a UniqueEdgeList.
         """
-        self.edge_list = []
+        self.edges = {}  # Edge key -> Edge, in insertion order
+        self.order = {}  # Edge key -> insertion number, to sort neighbors in list order
+        self.indices = None  # Edge key -> index in edge_list, made on demand
+        self.vertex_edges = {}  # Vertex -> set of keys of the edges that touch it
+        self.next_order = 0
 
-    def remove(self, edge_to_remove: Edge):
-        """Attempt to remove an edge from the list of edges.
+    @property
+    def edge_list(self):
+        """The edges in the order they were added.
 
-        :param edge_to_remove: The edge to search for.
-        :return: True, if the edge was removed.
+        :return: A view of the edges, which follows later changes to the list.
         """
-        index_found = -1
+        return self.edges.values()
+
+    @edge_list.setter
+    def edge_list(self, new_edge_list: []):
+        """Replace the edges with a list of edges.
+
+        :param new_edge_list: The list of edges to store.
+        :return: None
+        """
+        self.edges = {}
+        self.order = {}
+        self.indices = None
+        self.vertex_edges = {}
+        for edge in new_edge_list:
+            self.add(edge)
+
+    def count(self):
+        """Counts the number of edges in the list.
+
+        :return: Int value
+        """
+        return len(self.edges)
+
+    def get_first_edge(self):
+        """Get the oldest edge in the list.
+
+        :return: The first edge, or None if the list is empty.
+        """
+        return next(iter(self.edges.values()), None)
+
+    def has_edge(self, check_edge: Edge):
+        """Checks if the list has an edge overlapping the given edge.
 
-        for i in range(len(self.edge_list)):
-            if Edge.same_edge(self.edge_list[i], edge_to_remove):
-                index_found = i
+        :param check_edge: Edge
+        :return: True or False
+        """
+        return check_edge.get_key() in self.edges
 
-        if index_found != -1:
-            del self.edge_list[index_found]
+    def remove(self, edge_to_remove: Edge):
+        """Attempt to remove an edge from the list of edges. Takes constant time, the list
+        indices are only worked out again when get_neighbor_indices_for_edge needs them.
 
-        return index_found is not -1
+        :param edge_to_remove: The edge to search for.
+        :return: True, if the edge was removed.
+        """
+        key = edge_to_remove.get_key()
+        edge = self.edges.get(key)
+
+        # Only an edge in the same direction is removed.
+        if edge is None or not Edge.same_edge(edge, edge_to_remove):
+            return False
+
+        del self.edges[key]
+        del self.order[key]
+        self.indices = None  # The edges after this one moved up
+        for vertex in key:
+            keys = self.vertex_edges[vertex]
+            keys.discard(key)
+            if not keys:
+                del self.vertex_edges[vertex]
+        return True
 
     def add(self, new_edge: Edge):
         """Add a new edge to this list, but only if it isn't in there already.
@@ -44,16 +101,18 @@ class UniqueEdgeList:
         :param new_edge: The new edge to add to the set.
         :return: True, if the new edge was added.
         """
-        found = False
-        for e in self.edge_list:
-            if Edge.are_overlapping_edges(new_edge, e):
-                found = True
-                break
-
-        if not found:
-            self.edge_list.append(new_edge)
-
-        return not found
+        key = new_edge.get_key()
+        if key in self.edges:
+            return False
+
+        self.edges[key] = new_edge
+        self.order[key] = self.next_order
+        self.next_order += 1
+        if self.indices is not None:
+            self.indices[key] = len(self.edges) - 1
+        for vertex in key:
+            self.vertex_edges.setdefault(vertex, set()).add(key)
+        return True
 
     @staticmethod
     def set_difference(a, b):
@@ -64,29 +123,44 @@ class UniqueEdgeList:
         :return: A list of edges in set 'a' that aren't in set 'b'.
         """
         result = UniqueEdgeList()
-        new_edge_list = []
-        for edge_in_a in a.edge_list:
-            found = False
-            for edge_in_b in b.edge_list:
-                if Edge.same_edge(edge_in_a, edge_in_b):
-                    found = True
-            if not found:
-                new_edge_list.append(edge_in_a)
-        result.edge_list = new_edge_list
+        for key, edge_in_a in a.edges.items():
+            edge_in_b = b.edges.get(key)
+            if edge_in_b is None or not Edge.same_edge(edge_in_a, edge_in_b):
+                result.add(edge_in_a)
         return result
 
     def to_vertex_array(self):
         return [[]]
 
     def display(self):
-        for edge in self.edge_list:
+        for edge in self.edges.values():
             edge.display()
 
+    def get_neighbors_for_edge(self, edge: Edge):
+        """Get the edges that share a vertex with the given edge, including the edge itself
+        if it is in the list.
+
+        :param edge: The edge to find neighbors for.
+        :return: List of edges, in the order they were added.
+        """
+        keys = set()
+        for vertex in edge.get_key():
+            keys.update(self.vertex_edges.get(vertex, ()))
+        return [self.edges[key] for key in sorted(keys, key=self.order.get)]
+
     def get_neighbor_indices_for_edge(self, edge: Edge):
-        result = []
-        for i in range(len(self.edge_list)):
-            if Edge.has_shared_vertex(edge, self.edge_list[i]):
-                result.append(i)
-        return result
+        """Get the indices in edge_list of the edges that share a vertex with the given edge.
+        The first call after a remove numbers every edge again, which is linear in the number
+        of edges.
+
+        :param edge: The edge to find neighbors for.
+        :return: List of indices.
+        """
+        if self.indices is None:
+            self.indices = {key: index for index, key in enumerate(self.edges)}
+        keys = set()
+        for vertex in edge.get_key():
+            keys.update(self.vertex_edges.get(vertex, ()))
+        return sorted(self.indices[key] for key in keys)
 
 
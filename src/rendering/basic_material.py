@@ -14,6 +14,7 @@ import OpenGL.GL.shaders
 from pyrr import *
 from src.rendering.rendering_engine import RenderingEngine
 from src.rendering.material import Material
+from src.rendering.resource_cache import ResourceCache
 from PIL import Image
 import numpy
 from src.util import Util
@@ -22,14 +23,31 @@ from src.util import Util
 class BasicMaterial(Material):
     """This class controls the shader material information and determines how the mesh object should look
     in the OpenGL rendering context.
-    """
 
-    def __init__(self, triangle_data):
+    The shader program and texture are shared by every BasicMaterial, through the programs and
+    textures caches. Only the vertex and element buffers belong to one material.
+    """
+    texture_path = "assets/images/default_brick_diffuse.jpg"
+    # Shader programs by their vertex and fragment shader source
+    programs = ResourceCache(lambda sources: BasicMaterial.compile_program(sources),
+                             lambda program: glDeleteProgram(program))
+    # Textures by the path of their image
+    textures = ResourceCache(lambda file_path: BasicMaterial.load_texture(file_path),
+                             lambda texture: glDeleteTextures(1, [texture]))
+
+    def __init__(self, triangle_data, index_data=None):
         """Constructor for the BasicMaterial.
 
-        :param triangle_data: The triangle data to use in OpenGL Rendering context.
+        :param triangle_data: Float32 array with the interleaved position, uv and normal of
+        each vertex, to use in OpenGL Rendering context.
+        :param index_data: Optional uint16 or uint32 array with the vertex of each triangle
+        corner, uploaded as the element buffer.
         """
         Material.__init__(self)
+        self.index_type = None  # GL type of the element buffer, None when there is none
+        self.vbo = None
+        self.ebo = None
+        self.texture = None
 
         self.vertex_shader = """
 # version 420
@@ -138,20 +156,24 @@ void main() {
 }
 """
         try:
-            self.shader = OpenGL.GL.shaders.compileProgram(
-                OpenGL.GL.shaders.compileShader(self.vertex_shader,
-                                                GL_VERTEX_SHADER),
-                OpenGL.GL.shaders.compileShader(self.fragment_shader,
-                                                GL_FRAGMENT_SHADER))
+            self.shader = BasicMaterial.programs.acquire((self.vertex_shader, self.fragment_shader))
         except Error:
             print("Failed to compile glsl shader.")
             return
 
         glUseProgram(self.shader)
 
-        vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, vbo)
-        glBufferData(GL_ARRAY_BUFFER, len(triangle_data) * 4, triangle_data, GL_STATIC_DRAW)
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, triangle_data.nbytes, triangle_data, GL_STATIC_DRAW)
+
+        if index_data is not None:
+            # The element buffer binding is kept by the bound vertex array object.
+            self.ebo = glGenBuffers(1)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, index_data.nbytes, index_data, GL_STATIC_DRAW)
+            self.index_type = GL_UNSIGNED_SHORT if index_data.dtype == numpy.uint16 \
+                else GL_UNSIGNED_INT
 
         # Positions input to shader.
         glVertexAttribPointer(0,
@@ -180,20 +202,8 @@ void main() {
         glEnableVertexAttribArray(0)
         glEnableVertexAttribArray(1)
         glEnableVertexAttribArray(2)
-        texture = glGenTextures(1)
-
-        glBindTexture(GL_TEXTURE_2D, texture)
-        # Set the texture wrapping parameters
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-        # Set texture filtering parameters
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-
-        # load image
-        image = Image.open(Util.path_conversion("assets/images/default_brick_diffuse.jpg"))
-        img_data = numpy.array(list(image.getdata()), numpy.uint8)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, image.width, image.height, 0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
+        self.texture = BasicMaterial.textures.acquire(Util.path_conversion(self.texture_path))
+        glBindTexture(GL_TEXTURE_2D, self.texture)
         glEnable(GL_TEXTURE_2D)
 
         self.set_uniform_matrix4fv("view",
@@ -209,6 +219,60 @@ void main() {
         self.set_uniform3f("light_color", Vector3([0.2, 0.2, 0.2]))
         self.set_uniform1f("light_power", 100.0)
 
+    @staticmethod
+    def compile_program(sources: tuple):
+        """Compile and link a shader program.
+
+        :param sources: The vertex and fragment shader source str.
+        :return: The shader program.
+        """
+        return OpenGL.GL.shaders.compileProgram(
+            OpenGL.GL.shaders.compileShader(sources[0], GL_VERTEX_SHADER),
+            OpenGL.GL.shaders.compileShader(sources[1], GL_FRAGMENT_SHADER))
+
+    @staticmethod
+    def load_texture(file_path: str):
+        """Load an image file into a new texture.
+
+        :param file_path: The path to the image.
+        :return: The texture.
+        """
+        texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture)
+        # Set the texture wrapping parameters
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
+        # Set texture filtering parameters
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+        # load image
+        with Image.open(file_path) as image:
+            img_data = numpy.asarray(image.convert("RGB"), dtype=numpy.uint8)
+        # Rows of an RGB image are not always a multiple of 4 bytes long
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, img_data.shape[1], img_data.shape[0], 0, GL_RGB,
+                     GL_UNSIGNED_BYTE, img_data)
+        return texture
+
+    def release(self):
+        """Free the buffers of this material and give up its hold on the shared shader program
+        and texture.
+
+        :return: None
+        """
+        for buffer in [self.vbo, self.ebo]:
+            if buffer is not None:
+                glDeleteBuffers(1, [buffer])
+        self.vbo = None
+        self.ebo = None
+        if self.texture is not None:
+            BasicMaterial.textures.release(self.texture)
+            self.texture = None
+        if self.shader is not None:
+            BasicMaterial.programs.release(self.shader)
+            self.shader = None
+
     def set_view_matrix(self, view_matrix):
         """Update the view matrix.
 
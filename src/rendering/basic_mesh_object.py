@@ -20,52 +20,95 @@ class BasicMeshObject(SceneObject):
     """This class serves as a derived class for a SceneObject that contains mesh data
     for OpenGL rendering context.
     """
+    # The texture coordinates of the v2, v1 and v0 corner of every triangle
+    corner_uvs = numpy.array([[0.000059, 1.0 - 0.000059],
+                              [0.000103, 1.0 - 0.336048],
+                              [0.335973, 1.0 - 0.335903]], dtype=numpy.float32)
+    use_indexed_drawing = True  # Draw the welded vertices with an element buffer, not every corner
 
-    def __init__(self, tag, mesh):
+    def __init__(self, tag, mesh, vertex_data=None):
         """Constructor for a BasicMeshObject.
 
         :param tag: The tag str to recognize this object.
         :param mesh: The Mesh object to use for OpenGL rendering.
+        :param vertex_data: The buffers made by prepare_vertex_data for the mesh, which are made
+        here when None. Only uploading them to OpenGL is left to do.
         """
         SceneObject.__init__(self, tag)
         self.mesh_data = mesh
 
-        triangle_data = []
-        for i in range(len(self.mesh_data.normals)):
-                triangle_data.append(self.mesh_data.v2[i][0])
-                triangle_data.append(self.mesh_data.v2[i][1])
-                triangle_data.append(self.mesh_data.v2[i][2])
-                triangle_data.append(0.000059)
-                triangle_data.append(1.0 - 0.000059)
-                triangle_data.append(self.mesh_data.normals[i][0])
-                triangle_data.append(self.mesh_data.normals[i][1])
-                triangle_data.append(self.mesh_data.normals[i][2])
-                triangle_data.append(self.mesh_data.v1[i][0])
-                triangle_data.append(self.mesh_data.v1[i][1])
-                triangle_data.append(self.mesh_data.v1[i][2])
-                triangle_data.append(0.000103)
-                triangle_data.append(1.0 - 0.336048)
-                triangle_data.append(self.mesh_data.normals[i][0])
-                triangle_data.append(self.mesh_data.normals[i][1])
-                triangle_data.append(self.mesh_data.normals[i][2])
-                triangle_data.append(self.mesh_data.v0[i][0])
-                triangle_data.append(self.mesh_data.v0[i][1])
-                triangle_data.append(self.mesh_data.v0[i][2])
-                triangle_data.append(0.335973)
-                triangle_data.append(1.0 - 0.335903)
-                triangle_data.append(self.mesh_data.normals[i][0])
-                triangle_data.append(self.mesh_data.normals[i][1])
-                triangle_data.append(self.mesh_data.normals[i][2])
+        if vertex_data is None:
+            vertex_data = self.prepare_vertex_data(self.mesh_data)
+        triangle_data, index_data = vertex_data
+        self.vertex_count = len(self.mesh_data.normals) * 3
+        self.model_matrix = self.transform.get_trs_matrix()
+
         if glInitGl42VERSION():
             RenderingEngine.opengl_success = True
             self.vao = glGenVertexArrays(1)
 
             self.bind()
-            self.material = BasicMaterial(numpy.array(triangle_data, dtype=numpy.float32))
+            self.material = BasicMaterial(triangle_data, index_data)
             self.unbind()
         else:
             RenderingEngine.opengl_success = False
 
+    @staticmethod
+    def prepare_vertex_data(mesh):
+        """Build the buffers to upload for a mesh. This does not use OpenGL, so it can run on
+        any thread.
+
+        :param mesh: The Mesh to build the buffers for.
+        :return: Tuple of the vertex data and the index data, which is None when the mesh is
+        drawn without an element buffer.
+        """
+        triangle_data = BasicMeshObject.make_vertex_data(mesh)
+        index_data = None
+        if BasicMeshObject.use_indexed_drawing:
+            vertices, indices = BasicMeshObject.weld_vertices(triangle_data)
+            # Meshes without shared flat faces, like noisy scans, are smaller unrolled
+            if vertices.nbytes + indices.nbytes < triangle_data.nbytes:
+                triangle_data, index_data = vertices, indices
+        return triangle_data, index_data
+
+    @staticmethod
+    def make_vertex_data(mesh):
+        """Build the interleaved vertex buffer of a mesh: the position, texture coordinates and
+        normal of the v2, v1 and v0 corner of each triangle in turn.
+
+        :param mesh: The Mesh to build the vertex buffer for.
+        :return: Float32 array of shape (n * 3, 8).
+        """
+        triangle_count = len(mesh.normals)
+        vertex_data = numpy.empty((triangle_count, 3, 8), dtype=numpy.float32)
+        vertex_data[:, :, 0:3] = numpy.stack((mesh.v2, mesh.v1, mesh.v0), axis=1)
+        vertex_data[:, :, 3:5] = BasicMeshObject.corner_uvs
+        vertex_data[:, :, 5:8] = numpy.asarray(mesh.normals)[:, numpy.newaxis, :]
+        return vertex_data.reshape(triangle_count * 3, 8)
+
+    @staticmethod
+    def weld_vertices(vertex_data):
+        """Merge the corners that have the same position and normal into one vertex, so
+        corners of flat shaded triangles that face different ways stay apart. A merged vertex
+        keeps the texture coordinates of its first corner, the default texture is an even
+        grey so this does not show.
+
+        :param vertex_data: Float32 array of shape (n, 8) with the data of each corner.
+        :return: The merged vertices, in the order they first appear, and the index of the
+        vertex of each corner as uint16, or uint32 if there are too many vertices.
+        """
+        keys = numpy.ascontiguousarray(numpy.concatenate((vertex_data[:, 0:3],
+                                                          vertex_data[:, 5:8]), axis=1))
+        rows = keys.view(numpy.dtype((numpy.void, keys.itemsize * keys.shape[1])))[:, 0]
+        _, first, inverse = numpy.unique(rows, return_index=True, return_inverse=True)
+
+        # Keep the vertices in the order of the triangles, the GPU caches recent vertices
+        order = numpy.argsort(first)
+        new_ids = numpy.empty(len(order), dtype=numpy.int64)
+        new_ids[order] = numpy.arange(len(order))
+        index_type = numpy.uint16 if len(order) <= 1 << 16 else numpy.uint32
+        return vertex_data[first[order]], new_ids[inverse.reshape(-1)].astype(index_type)
+
     def bind(self):
         """Bind the vertex array object.
 
@@ -82,14 +125,28 @@ class BasicMeshObject(SceneObject):
         if RenderingEngine.opengl_success:
             glBindVertexArray(0)
 
+    def can_draw(self):
+        """Check that OpenGL is running and the shader program of the material compiled.
+
+        :return: True if the mesh can be drawn.
+        """
+        return RenderingEngine.opengl_success and self.material.shader is not None
+
     def draw(self):
-        """Draw the vertex buffer.
+        """Draw the vertex buffer. Nothing is drawn when the shader failed to compile.
 
         :return: None
         """
-        if RenderingEngine.opengl_success:
+        if self.can_draw():
+            # The shader program is shared, so the model matrix is set before every draw
+            self.material.use()
+            self.material.set_model_matrix(self.model_matrix)
             self.bind()
-            glDrawArrays(GL_TRIANGLES, 0, len(self.mesh_data.normals) * 3)
+            if self.material.index_type is not None:
+                glDrawElements(GL_TRIANGLES, self.vertex_count, self.material.index_type,
+                               ctypes.c_void_p(0))
+            else:
+                glDrawArrays(GL_TRIANGLES, 0, self.vertex_count)
             self.unbind()
 
     def update(self):
@@ -97,9 +154,19 @@ class BasicMeshObject(SceneObject):
 
         :return: None
         """
-        if RenderingEngine.opengl_success:
+        self.model_matrix = self.transform.get_trs_matrix()
+        if self.can_draw():
+            self.material.use()
             self.material.set_view_matrix(RenderingEngine.camera.get_view_matrix())
-            self.material.set_model_matrix(self.transform.get_trs_matrix())
+
+    def release(self):
+        """Free the vertex array object and the material.
+
+        :return: None
+        """
+        if RenderingEngine.opengl_success:
+            self.material.release()
+            glDeleteVertexArrays(1, [self.vao])
 
     def get_mesh_data(self):
         """Retrieve the stored mesh data.
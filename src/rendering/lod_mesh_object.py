@@ -0,0 +1,129 @@
+# Copyright (C) 2018
+# This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License.
+# See LICENSE file for the full text.
+import numpy
+from src.rendering.basic_mesh_object import BasicMeshObject
+from src.rendering.mesh_lod import MeshLod
+from src.rendering.scene_object import SceneObject
+from src.rendering.rendering_engine import RenderingEngine
+
+
+class LodMeshObject(SceneObject):
+    """This class serves as a derived class for a SceneObject that draws a mesh at the level of
+    detail that fits the triangle budget and the distance of the camera. Each level is a
+    BasicMeshObject sharing the transform of this object.
+    """
+
+    def __init__(self, tag, mesh, prepared_levels=None):
+        """Constructor for a LodMeshObject.
+
+        :param tag: The tag str to recognize this object.
+        :param mesh: The full Mesh object.
+        :param prepared_levels: The levels made by prepare_levels for the mesh, which are made
+        here when None.
+        """
+        SceneObject.__init__(self, tag)
+        self.mesh_data = mesh
+        self.bounding_radius = self.get_bounding_radius(self.mesh_data)
+
+        if prepared_levels is None:
+            prepared_levels = self.prepare_levels(self.mesh_data)
+        self.levels = []
+        for level_mesh, vertex_data in prepared_levels:
+            level = BasicMeshObject(tag, level_mesh, vertex_data)
+            level.transform = self.transform
+            self.levels.append(level)
+        self.level = 0
+
+    @staticmethod
+    def prepare_levels(mesh):
+        """Make the levels of detail of a mesh and build their buffers. Levels over the triangle
+        budget are never drawn, so they are left out, but at least two levels are kept so the
+        camera distance has a level to switch to. This does not use OpenGL, so it can run on any
+        thread.
+
+        :param mesh: The full Mesh.
+        :return: List of tuples of the Mesh and the buffers made by
+        BasicMeshObject.prepare_vertex_data of each level, finest first.
+        """
+        levels = MeshLod.make_levels(mesh)
+        first = MeshLod.select_level(LodMeshObject.count_triangles(levels), 0.0, 1.0)
+        first = min(first, max(0, len(levels) - 2))
+        return [(level, BasicMeshObject.prepare_vertex_data(level)) for level in levels[first:]]
+
+    @staticmethod
+    def count_triangles(meshes: []):
+        """Count the triangles of each mesh.
+
+        :param meshes: List of Meshes.
+        :return: List of the triangle count of each mesh.
+        """
+        return [len(mesh.data) for mesh in meshes]
+
+    @staticmethod
+    def get_bounding_radius(mesh):
+        """Measure the radius of the sphere around the bounding box of a mesh.
+
+        :param mesh: The Mesh to measure.
+        :return: The float radius, 0.0 for an empty mesh.
+        """
+        if len(mesh.data) == 0:
+            return 0.0
+        return float(numpy.linalg.norm(mesh.max_ - mesh.min_)) / 2.0
+
+    def select_level(self, camera_distance: float):
+        """Pick the level to draw for a camera distance, relative to the size of the model at
+        its current scale.
+
+        :param camera_distance: The distance of the camera to the model.
+        :return: None
+        """
+        model_radius = self.bounding_radius * float(numpy.abs(self.transform.scale).max())
+        self.level = MeshLod.select_level(
+            self.count_triangles([level.get_mesh_data() for level in self.levels]),
+            camera_distance, model_radius)
+
+    def draw(self):
+        """Draw the selected level.
+
+        :return: None
+        """
+        self.levels[self.level].draw()
+
+    def update(self):
+        """Pick the level for the camera distance the Scene set, and update it.
+
+        :return: None
+        """
+        self.select_level(RenderingEngine.camera.follow_distance)
+        self.levels[self.level].update()
+
+    def release(self):
+        """Free the buffers of every level.
+
+        :return: None
+        """
+        for level in self.levels:
+            level.release()
+
+    def get_mesh_data(self):
+        """Retrieve the stored mesh data.
+
+        :return: The full Mesh this object was made from.
+        """
+        return self.mesh_data
+
+    def get_level_mesh(self):
+        """Retrieve the mesh of the selected level.
+
+        :return: The Mesh that is drawn.
+        """
+        return self.levels[self.level].get_mesh_data()
@@ -19,6 +19,15 @@ class Material:
     def __init__(self):
         self.shader = None
 
+    def use(self):
+        """Make the shader program of this material the current program, which the uniforms
+        are set on.
+
+        :return: None
+        """
+        assert self.shader is not None, "Shader program not set."
+        glUseProgram(self.shader)
+
     def set_uniform_matrix4fv(self, key, value):
         """Set a shader matrix 4x4 float at key with value.
 
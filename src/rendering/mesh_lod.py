@@ -0,0 +1,159 @@
+# Copyright (C) 2018
+# This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License.
+# See LICENSE file for the full text.
+import math
+import numpy
+from stl import Mesh
+
+
+class MeshLod:
+    """The static class responsible for making and picking the levels of detail of preview
+    meshes. Coarser levels are made by vertex clustering: every vertex in a cell of a grid
+    over the bounding box is moved to the mean of the cell, and triangles that collapse are
+    dropped. Only the preview uses them, the conversion always uses the full mesh.
+    """
+    triangle_budget = 250000  # Most triangles a preview is drawn with
+    min_triangles = 50000  # Meshes with fewer triangles only have the full level
+    level_count = 3  # Coarser levels made below the first level within the budget
+    level_reduction = 4  # Each level has about this many times fewer triangles than the one above
+    level_tolerance = 0.1  # Fraction of its target a level may fall short by
+    grid_searches = 12  # Most grid sizes tried to reach the target of a level
+    detail_distance = 4.0  # Camera distance, in bounding radii of the scaled model, up to which
+    # the finest level in the budget is used
+
+    @staticmethod
+    def make_levels(mesh: Mesh):
+        """Make the levels of detail of a mesh. The chain starts at the budget: the first level is
+        the full mesh when it fits, else the mesh clustered down to the budget, and each level
+        after it has level_reduction times fewer triangles.
+
+        :param mesh: The full Mesh.
+        :return: List of Meshes from the full mesh to the coarsest level.
+        """
+        levels = [mesh]
+        if len(mesh.data) < MeshLod.min_triangles:
+            return levels
+
+        if len(mesh.data) <= MeshLod.triangle_budget:
+            drawn_levels = 1
+            target = len(mesh.data) // MeshLod.level_reduction
+        else:
+            drawn_levels = 0
+            target = MeshLod.triangle_budget
+        while drawn_levels <= MeshLod.level_count:
+            # Each level is clustered from the one above, which is much quicker on large meshes
+            level = MeshLod.cluster_to_target(levels[-1], target)
+            if len(level.data) == 0 or len(level.data) >= len(levels[-1].data):
+                break
+            levels.append(level)
+            if len(level.data) <= MeshLod.triangle_budget:
+                drawn_levels += 1
+            target = len(level.data) // MeshLod.level_reduction
+        return levels
+
+    @staticmethod
+    def cluster_to_target(mesh: Mesh, target: int):
+        """Cluster the vertices of a mesh on the grid that leaves the most triangles up to
+        target. The grid size is searched until the count is within level_tolerance of target.
+
+        :param mesh: The Mesh to simplify.
+        :param target: The most triangles the level should have.
+        :return: The simplified Mesh, or the smallest one found when every grid tried was over
+        target.
+        """
+        best = None
+        smallest = None
+        low_size = 1  # Largest grid size known to give at most target triangles
+        high_size = None  # Smallest grid size known to give more than target triangles
+        # A surface through a grid of n cells a side is cut into about n * n triangles.
+        grid_size = max(2, int(math.sqrt(max(target, 1))))
+        for _ in range(MeshLod.grid_searches):
+            level = MeshLod.cluster_vertices(mesh, grid_size)
+            count = len(level.data)
+            if count <= target:
+                if best is None or count > len(best.data):
+                    best = level
+                if count >= target * (1.0 - MeshLod.level_tolerance):
+                    break
+                low_size = grid_size
+            else:
+                if smallest is None or count < len(smallest.data):
+                    smallest = level
+                high_size = grid_size
+
+            # Scale the size by the count it gave until the target is bracketed, then bisect,
+            # as the count jumps with how the cells line up with the mesh.
+            estimate = int(grid_size * math.sqrt(target / max(count, 1)))
+            if high_size is None:
+                grid_size = max(estimate, int(grid_size * 1.5) + 1)
+            elif high_size - low_size <= 1:
+                break
+            elif low_size <= 1:
+                grid_size = max(2, min(estimate, int(grid_size / 1.5)))
+            else:
+                grid_size = (low_size + high_size) // 2
+        return best if best is not None else smallest
+
+    @staticmethod
+    def cluster_vertices(mesh: Mesh, grid_size: int):
+        """Simplify a mesh by merging the vertices in each cell of a grid.
+
+        :param mesh: The Mesh to simplify.
+        :param grid_size: The number of cells along the longest side of the bounding box.
+        :return: The simplified Mesh, without collapsed or repeated triangles.
+        """
+        points = numpy.asarray(mesh.vectors, dtype=numpy.float64).reshape(-1, 3)
+        if len(points) == 0:
+            return Mesh(numpy.zeros(0, dtype=Mesh.dtype))
+        lowest = points.min(axis=0)
+        extent = (points.max(axis=0) - lowest).max()
+        if extent <= 0.0:
+            return Mesh(numpy.zeros(0, dtype=Mesh.dtype))
+
+        cells = numpy.floor((points - lowest) * (grid_size / extent)).astype(numpy.int64)
+        numpy.clip(cells, 0, grid_size - 1, out=cells)
+        keys = (cells[:, 0] * grid_size + cells[:, 1]) * grid_size + cells[:, 2]
+        _, cluster_ids = numpy.unique(keys, return_inverse=True)
+        cluster_ids = cluster_ids.reshape(-1)
+
+        # The mean of the vertices in each cell
+        counts = numpy.bincount(cluster_ids)
+        centers = numpy.column_stack([numpy.bincount(cluster_ids, weights=points[:, axis]) / counts
+                                      for axis in range(3)])
+
+        triangles = cluster_ids.reshape(-1, 3)
+        is_open = ((triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) &
+                   (triangles[:, 0] != triangles[:, 2]))
+        triangles = triangles[is_open]
+        _, first = numpy.unique(numpy.sort(triangles, axis=1), axis=0, return_index=True)
+        triangles = triangles[numpy.sort(first)]
+
+        data = numpy.zeros(len(triangles), dtype=Mesh.dtype)
+        data["vectors"] = centers[triangles]
+        return Mesh(data)
+
+    @staticmethod
+    def select_level(triangle_counts: [], camera_distance: float, model_radius: float):
+        """Pick the level of detail to draw: the finest level within the triangle budget, and
+        one level coarser for each doubling of the camera distance past detail_distance radii
+        of the model.
+
+        :param triangle_counts: The number of triangles of each level, finest first.
+        :param camera_distance: The distance of the camera to the model.
+        :param model_radius: The bounding radius of the model, times its scale.
+        :return: The index of the level.
+        """
+        level = next((i for i, count in enumerate(triangle_counts)
+                      if count <= MeshLod.triangle_budget), len(triangle_counts) - 1)
+        detail_distance = MeshLod.detail_distance * model_radius
+        if detail_distance > 0.0 and camera_distance > detail_distance:
+            level += int(math.log2(camera_distance / detail_distance))
+        return max(0, min(level, len(triangle_counts) - 1))
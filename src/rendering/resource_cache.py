@@ -0,0 +1,67 @@
+# Copyright (C) 2018
+# This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License.
+# See LICENSE file for the full text.
+
+
+class ResourceCache:
+    """Shares resources, like shader programs and textures, between everyone that asks for the
+    same key. Each resource is counted, and destroyed once the last user releases it.
+    """
+
+    def __init__(self, create, destroy):
+        """Constructor for the ResourceCache class.
+
+        :param create: Function that makes the resource for a key.
+        :param destroy: Function that frees a resource.
+        """
+        self.create = create
+        self.destroy = destroy
+        self.entries = {}  # Key to the resource and the number of users
+        self.keys = {}  # Resource to its key
+
+    def acquire(self, key):
+        """Get the resource for a key, making it if no one holds it yet.
+
+        :param key: The hashable key of the resource.
+        :return: The resource.
+        """
+        if key not in self.entries:
+            resource = self.create(key)
+            self.entries[key] = [resource, 0]
+            self.keys[resource] = key
+        entry = self.entries[key]
+        entry[1] += 1
+        return entry[0]
+
+    def release(self, resource):
+        """Give up one hold on a resource, destroying it when it was the last.
+
+        :param resource: A resource returned by acquire.
+        :return: None
+        """
+        key = self.keys.get(resource)
+        if key is None:
+            return
+        entry = self.entries[key]
+        entry[1] -= 1
+        if entry[1] <= 0:
+            self.entries.pop(key)
+            self.keys.pop(resource)
+            self.destroy(resource)
+
+    def get_count(self, key):
+        """Get the number of users of the resource for a key.
+
+        :param key: The key of the resource.
+        :return: The number of holds on it, 0 when it is not in the cache.
+        """
+        entry = self.entries.get(key)
+        return 0 if entry is None else entry[1]
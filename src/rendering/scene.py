@@ -10,8 +10,10 @@
 # This software is licensed under the MIT License.
 # See LICENSE file for the full text.
 import time
-from src.rendering.basic_mesh_object import BasicMeshObject
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from src.rendering.camera import Camera
+from src.rendering.lod_mesh_object import LodMeshObject
 from src.rendering.rendering_engine import RenderingEngine
 from pyrr import *
 
@@ -25,6 +27,7 @@ class Scene:
     _ang_y = 0
     _camera_distance = 4.0
     _view = Vector3()
+    prepare_in_background = True  # Build the levels of detail of new meshes on a worker thread
 
     def __init__(self):
         """Constructor to initialize the scene.
@@ -34,6 +37,10 @@ class Scene:
         self._last_time = time.process_time()
         self.active_scene_object = None
         self.mouse_rotate_sensitivity = 1.0
+        self.is_dirty = True  # Something moved or changed since the scene was last updated
+        self.mesh_preparer = ThreadPoolExecutor(max_workers=1)
+        self.pending_meshes = {}  # Tag to the mesh and the future of its levels of detail
+        self.model_active = {}  # Tag to whether the model should be shown once it is ready
         self.scene_objects = {
             "camera": Camera("camera"),
             "input_model": None,
@@ -73,23 +80,35 @@ class Scene:
 
         RenderingEngine.camera.follow_distance = self._camera_distance
         RenderingEngine.camera.update()
+        self.mark_dirty()
         event.Skip()
 
+    def mark_dirty(self):
+        """Mark the scene as changed, so the next update pushes the matrices to the scene
+        objects and the canvas draws it again.
+
+        :return: None
+        """
+        self.is_dirty = True
+
     def draw(self):
         """Draw all the scene objects that are enabled.
 
         :return: None
         """
         for key, scene_object in self.scene_objects.items():
-            if scene_object is not None:
+            if scene_object is not None and scene_object.enabled:
                 scene_object.draw()
 
     def update(self, dt: float):
         """Called by the OpenGLCanvas, which is called every loop by the GUIEventLoop.
+        The matrices are only pushed to the scene objects when the scene is dirty.
 
          :param dt: The delta time between the last call.
-         :return: None
+         :return: True if the scene changed and needs to be drawn again.
          """
+        self._add_prepared_meshes()
+
         # Move the camera based on mouse tracking.
         dy = self.delta_mouse[1] * self.mouse_rotate_sensitivity
         dx = self.delta_mouse[0] * self.mouse_rotate_sensitivity
@@ -98,6 +117,11 @@ class Scene:
             # Rotation of the camera.
             self.active_scene_object.transform.euler_angles += Vector3([-dy, -dx, 0.0])
             RenderingEngine.camera.target = self.active_scene_object.transform.position
+            self.mark_dirty()
+
+        self.delta_mouse = (0.0, 0.0)
+        if not self.is_dirty:
+            return False
 
         RenderingEngine.camera.update()
 
@@ -107,7 +131,8 @@ class Scene:
                 if scene_object.enabled:
                     scene_object.update()
 
-        self.delta_mouse = (0.0, 0.0)
+        self.is_dirty = False
+        return True
 
     def replace_input_model_mesh(self, mesh):
         """Replace the input model mesh with a new mesh.
@@ -126,19 +151,60 @@ class Scene:
         self._replace_model_mesh("output_model", mesh)
 
     def _replace_model_mesh(self, tag, mesh):
-        """Replace the model mesh with a new mesh.
+        """Replace the model mesh with a new mesh. With prepare_in_background on, the vertex
+        data of the mesh is built on a worker thread and the old model is shown until a later
+        update adds the new one. The preview draws the level of detail fitting the camera distance,
+        the mesh itself is left at full resolution for the conversion.
 
         :param mesh: The new mesh.
         :param tag: The tag to use to search for the scene object.
         :return: None
         """
-        self.remove_scene_object(tag)
-        if mesh is not None:
-            self.scene_objects.update({tag: BasicMeshObject(tag, mesh)})
-            self.scene_objects[tag].transform.position = Vector3([0.0, 0.0, 0.0])
-            self.scene_objects[tag].transform.euler_angles = Vector3([0.0, 0.0, 0.0])
-        else:
+        pending = self.pending_meshes.pop(tag, None)
+        if pending is not None:
+            pending[1].cancel()
+
+        scene_object = self.scene_objects.get(tag)
+        if mesh is None:
+            self.remove_scene_object(tag)
             self.scene_objects.update({tag: None})
+            self.mark_dirty()
+        elif scene_object is not None and scene_object.get_mesh_data() is mesh:
+            pass  # Already showing this mesh
+        elif self.prepare_in_background:
+            self.pending_meshes[tag] = (
+                mesh, self.mesh_preparer.submit(LodMeshObject.prepare_levels, mesh))
+        else:
+            self._add_model_mesh(tag, mesh, LodMeshObject.prepare_levels(mesh))
+
+    def _add_model_mesh(self, tag, mesh, prepared_levels):
+        """Upload the levels of detail of a mesh and put it in the scene in place of the old model.
+
+        :param tag: The tag to use to search for the scene object.
+        :param mesh: The new mesh.
+        :param prepared_levels: The levels made by LodMeshObject.prepare_levels.
+        :return: None
+        """
+        self.remove_scene_object(tag)
+        self.scene_objects.update({tag: LodMeshObject(tag, mesh, prepared_levels)})
+        self.scene_objects[tag].transform.position = Vector3([0.0, 0.0, 0.0])
+        self.scene_objects[tag].transform.euler_angles = Vector3([0.0, 0.0, 0.0])
+        self.mark_dirty()
+        if self.model_active.get(tag, False):
+            self._set_model_active(tag, True)
+
+    def _add_prepared_meshes(self):
+        """Add the meshes whose levels of detail are ready to the scene.
+
+        :return: None
+        """
+        for tag, (mesh, future) in list(self.pending_meshes.items()):
+            if future.done():
+                self.pending_meshes.pop(tag)
+                try:
+                    self._add_model_mesh(tag, mesh, future.result())
+                except Exception as err:
+                    logging.error(f"Failed to prepare the {tag} preview : {err}")
 
     def set_input_model_active(self, value):
         """Set the input model active state.
@@ -163,8 +229,9 @@ class Scene:
         :param value: The enable/disable state of the model.
         :return: None
         """
-
+        self.model_active[tag] = value
         if self.scene_objects[tag] is not None:
+            self.mark_dirty()
             if value is True:
                 self.active_scene_object = self.scene_objects[tag]
                 self.scene_objects[tag].enable()
@@ -172,13 +239,16 @@ class Scene:
                 self.scene_objects[tag].disable()
 
     def remove_scene_object(self, tag):
-        """Destroy a scene object.
+        """Destroy a scene object and free its resources.
 
         :param tag: The tag to use to search for the scene object.
         :return: None
         """
         if self.scene_objects.get(tag) is not None:
-            self.scene_objects.pop(tag)
+            scene_object = self.scene_objects.pop(tag)
+            scene_object.release()
+            if self.active_scene_object is scene_object:
+                self.active_scene_object = None
 
     def get_main_camera(self):
         """Retrieve the main camera object.
@@ -215,6 +285,7 @@ class Scene:
             input_model.transform.scale = scale_vector
         if output_model is not None:
             output_model.transform.scale = scale_vector
+        self.mark_dirty()
 
     def set_mouse_rotation_sensitivity(self, value: float):
         """Set a new mouse rotation sensitivity.
@@ -35,3 +35,10 @@ class SceneObject:
         :return: None
         """
         self.enabled = False
+
+    def release(self):
+        """Free any resources this scene object holds, when it is removed from the scene.
+
+        :return: None
+        """
+        pass
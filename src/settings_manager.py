@@ -16,6 +16,8 @@ class SettingsManager:
     settings_path = Util.path_conversion("assets/settings")
     filename = "user_settings.json"
     file_path = settings_path + "/" + filename
+    default_author = "First Last"
+    default_license = "Redistributable under CCAL version 2.0 : see CAreadme.txt"
 
     @staticmethod
     def create_settings(filename: str):
@@ -31,9 +33,9 @@ class SettingsManager:
         # default part name directory
         default_part_dir = Util.path_conversion("assets/parts/")
         # default author
-        default_author = "First Last"
+        default_author = SettingsManager.default_author
         # default license
-        default_license = "Redistributable under CCAL version 2.0 : see CAreadme.txt"
+        default_license = SettingsManager.default_license
         # default Log directory
         default_log_dir = Util.path_conversion(str(Path.home()) + "/Documents")
 
@@ -17,6 +17,7 @@ class BaseJob:
     """The pseudo interface for processing jobs to
     inherit method properties from.
     """
+    job_settings = ()  # Names of the class attributes that configure the job, sent to a worker process
 
     def __init__(self, feedback_log):
         """Initialize class members
@@ -69,6 +70,18 @@ class BaseJob:
         """
         return self.status
 
+    def continue_job(self, new_status=None):
+        """Update the status if there is a new one, then wait while the job is paused.
+        Used as the step callback of a ConversionPipeline.
+
+        :param new_status: The new status, or None to keep the current one.
+        :return: False if the job was killed, True otherwise.
+        """
+        if new_status is not None:
+            self.update_status(new_status)
+        self.is_running.wait()
+        return not self.is_killed
+
     def update_status(self, new_status):
         self.status = new_status
         self.put_feedback(LogMessage(LogType.INFORMATION, self.status))
@@ -9,6 +9,7 @@
 # This software is licensed under the MIT License. See LICENSE file for the full text.
 import queue
 from src.threading.worker_thread import *
+from src.threading.worker_process import WorkerProcess
 from src.threading.worker_state import WorkerState
 from src.ui.user_event import UserEvent
 from src.ui.user_event_type import UserEventType
@@ -19,6 +20,7 @@ class ThreadManager:
     """Has instance of work threads, manages communications between them
     and the classes that would interact with LogMessage data.
     """
+    use_worker_process = True  # Run the jobs in a child process, so they do not hold the UI's GIL
 
     def __init__(self):
         """Initialize class members
@@ -89,7 +91,10 @@ class ThreadManager:
 
         :return: None
         """
-        self.worker_thread = WorkerThread(self.feedback_log, self.job_list)  # only created when processing begins. May be recreated
+        if self.use_worker_process:
+            self.worker_thread = WorkerProcess(self.feedback_log, self.job_list)
+        else:
+            self.worker_thread = WorkerThread(self.feedback_log, self.job_list)  # only created when processing begins. May be recreated
         self.worker_thread.daemon = True
         self.worker_thread.start()
 
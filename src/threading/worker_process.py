@@ -0,0 +1,247 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+
+import queue
+import threading
+import multiprocessing
+from src.threading.worker_state import WorkerState
+from src.threading.worker_thread import WorkerThread
+from src.log_messages.log_message import LogMessage
+from src.log_messages.log_type import LogType
+from src.log_messages.output_model_message import OutputModelMessage
+from src.model_conversion.model_shipper import ModelShipper
+from src.model_conversion.ldraw_model import LDrawModel
+from src.model_conversion.conversion_pipeline import ConversionPipeline
+from src.model_conversion.mesh_cache import MeshCache
+from src.model_conversion.stage_profiler import StageProfiler
+from src.settings_manager import SettingsManager
+
+
+class ProcessFeedbackLog:
+    """Stands in for the feedback log queue of the jobs in the child process. Every message is
+    sent to the parent along with the ModelShipper output state when it carries the output model.
+    """
+
+    def __init__(self, message_queue):
+        """Constructor for the ProcessFeedbackLog class.
+
+        :param message_queue: The multiprocessing queue to the parent process.
+        """
+        self.message_queue = message_queue
+
+    def put(self, log_msg):
+        """Send a LogMessage to the parent process.
+
+        :param log_msg: log message
+        :return: None
+        """
+        output_state = None
+        if isinstance(log_msg, OutputModelMessage):
+            output_state = (ModelShipper.output_data_path, ModelShipper.output_data_text,
+                            ModelShipper.output_profile)
+        self.message_queue.put((log_msg, output_state))
+
+
+def get_input_state(job_list):
+    """Gather the state the jobs read from class attributes, which a spawned process does not
+    inherit. An input model memory mapped from a file is sent as its path, to be mapped again
+    instead of being copied through a pipe.
+
+    :param job_list: The job classes to run.
+    :return: Dictionary of the state, for apply_input_state.
+    """
+    input_path = ModelShipper.input_path if ModelShipper.input_model is not None else None
+    return {"input_path": input_path,
+            "input_model": ModelShipper.input_model if input_path is None else None,
+            "input_cache_key": ModelShipper.input_cache_key,
+            "recalculate_normals": ModelShipper.recalculate_normals,
+            "stream_output": ModelShipper.stream_output,
+            "settings_path": SettingsManager.file_path,
+            "profile": StageProfiler.enabled,
+            "cache_enabled": MeshCache.enabled,
+            "cache_dir": MeshCache.cache_dir,
+            "job_settings": [{name: getattr(job, name) for name in job.job_settings}
+                             for job in job_list]}
+
+
+def apply_input_state(job_list, input_state):
+    """Set the state gathered by get_input_state in this process.
+
+    :param job_list: The job classes to run.
+    :param input_state: Dictionary made by get_input_state.
+    :return: None
+    """
+    ModelShipper.input_cache_key = input_state["input_cache_key"]
+    ModelShipper.recalculate_normals = input_state["recalculate_normals"]
+    ModelShipper.stream_output = input_state["stream_output"]
+    SettingsManager.file_path = input_state["settings_path"]
+    StageProfiler.enabled = input_state["profile"]
+    MeshCache.enabled = input_state["cache_enabled"]
+    MeshCache.cache_dir = input_state["cache_dir"]
+    for job, settings in zip(job_list, input_state["job_settings"]):
+        for name, value in settings.items():
+            setattr(job, name, value)
+
+    ModelShipper.input_model = input_state["input_model"]
+    if input_state["input_path"] is not None:
+        mesh = ConversionPipeline.load_mesh(input_state["input_path"],
+                                            ModelShipper.recalculate_normals, None,
+                                            ModelShipper.input_cache_key)[0]
+        ModelShipper.input_model = LDrawModel(mesh)
+        ModelShipper.input_path = input_state["input_path"]
+
+
+def run_jobs(job_list, message_queue, control_queue, input_state):
+    """Entry point of the child process. Runs the jobs in a WorkerThread, like the thread
+    backend does, and applies the WorkerStates sent by the parent to it.
+
+    :param job_list: The job classes to run, in order.
+    :param message_queue: The multiprocessing queue to send (LogMessage, output state) pairs on.
+    :param control_queue: The multiprocessing queue the parent sends WorkerStates on.
+    :param input_state: Dictionary made by get_input_state in the parent.
+    :return: None
+    """
+    try:
+        apply_input_state(job_list, input_state)
+    except Exception as err:
+        message_queue.put((LogMessage(LogType.ERROR, f"Failed to load the input model : {err}"),
+                           None))
+        message_queue.put(None)
+        return
+
+    worker_thread = WorkerThread(ProcessFeedbackLog(message_queue), job_list)
+
+    # States sent while this process was starting are applied before the first job starts
+    def apply_states():
+        while True:
+            state = control_queue.get()
+            worker_thread.change_state(state)
+            if state == WorkerState.STOP:
+                break
+
+    listener = threading.Thread(target=apply_states, daemon=True)
+    worker_thread.start()
+    listener.start()
+    worker_thread.join()
+
+    if worker_thread.current_job is not None and not worker_thread.current_job.is_done.is_set():
+        failed_msg = LogMessage(LogType.ERROR, "Failed during " + worker_thread.current_job.name + ".")
+        message_queue.put((failed_msg, None))
+
+    # The parent owns the output file now, so it must outlive this process.
+    ModelShipper.output_data_path = None
+    message_queue.put(None)
+
+
+class WorkerProcess(threading.Thread):
+    """Runs the job list in a child process, so the jobs do not hold the GIL of the UI.
+    This thread relays the messages of the child into the feedback log and forwards
+    pause/resume/stop to it. Has the same interface as WorkerThread.
+    """
+    stop_timeout = 5.0  # Seconds to wait for a killed job to stop before terminating it
+
+    def __init__(self, feedback_log, job_list):
+        threading.Thread.__init__(self)
+        self.feedback_log = feedback_log
+        # Spawn instead of fork, a forked wx process is not safe to use.
+        context = multiprocessing.get_context("spawn")
+        self.message_queue = context.Queue()
+        self.control_queue = context.Queue()
+        self.process = context.Process(
+            target=run_jobs,
+            args=(job_list, self.message_queue, self.control_queue, get_input_state(job_list)),
+            daemon=True)
+        self.state = WorkerState.RUNNING
+        self.status = None
+
+    def run(self):
+        """Relay the messages of the child process until it is done.
+
+        :return: None
+        """
+        while True:
+            try:
+                item = self.message_queue.get(timeout=0.1)
+            except queue.Empty:
+                if self.process.is_alive():
+                    continue
+                if self.state != WorkerState.STOP:
+                    self.feedback_log.put(LogMessage(LogType.ERROR,
+                                                     "The worker process ended unexpectedly."))
+                break
+            if item is None:
+                break
+
+            log_msg, output_state = item
+            if output_state is not None:
+                # Take over the output of the child before anyone hears it is ready
+                ModelShipper.discard_output_data()
+                (ModelShipper.output_data_path, ModelShipper.output_data_text,
+                 ModelShipper.output_profile) = output_state
+                ModelShipper.output_model = log_msg.get_model()
+            elif type(log_msg) is LogMessage and log_msg.get_message_type() == LogType.INFORMATION:
+                self.status = log_msg.get_message()
+            self.feedback_log.put(log_msg)
+
+        self.process.join()
+        self.state = WorkerState.STOP
+
+    def change_state(self, new_state):
+        """Changes worker state (run/pause/stop) in the child process
+
+        :param new_state: WorkerState to set the worker to
+        :return:
+        """
+        if self.state == WorkerState.STOP:
+            return
+        self.state = new_state
+        self.control_queue.put(new_state)
+
+    def start(self):
+        """Start the child process and relaying its messages
+
+        :return: None
+        """
+        self.process.start()
+        threading.Thread.start(self)
+
+    def kill(self):
+        """Change worker state to STOP
+
+        :return: None
+        """
+        self.change_state(WorkerState.STOP)
+
+    def join(self, timeout=None):
+        """Wait for the child process to end. A killed child that does not stop within
+        stop_timeout is terminated.
+
+        :param timeout: Seconds to wait, or None to wait until it ends.
+        :return: None
+        """
+        if self.state == WorkerState.STOP and self.process.is_alive():
+            self.process.join(self.stop_timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        threading.Thread.join(self, timeout)
+
+    def get_state(self):
+        """Gets worker state
+
+        :return: WorkerState
+        """
+        return self.state
+
+    def get_status(self):
+        """Gets status of current job as string
+
+        :return: The last status the current job reported
+        """
+        return self.status
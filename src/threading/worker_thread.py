@@ -24,6 +24,7 @@ class WorkerThread(threading.Thread):
             self.job_list.append(job(feedback_log))
         self.current_job = None
         self.state = WorkerState.RUNNING
+        self.state_lock = threading.Lock()  # Held while the state or the current job changes
 
     def run(self):
         """Process the thread and do work with its CPU time.
@@ -31,12 +32,13 @@ class WorkerThread(threading.Thread):
         :return: None
         """
         for job in self.job_list:
-            if self.state == WorkerState.STOP:
-                break # Stop doing jobs if killed
-            # add a check for if paused here too... maybe use an event
-            self.current_job = job
-            if self.current_job and not self.current_job.is_running.isSet():
-                self.current_job.go()
+            with self.state_lock:
+                if self.state == WorkerState.STOP:
+                    break # Stop doing jobs if killed
+                self.current_job = job
+                # A job started while the worker is paused waits until it is resumed
+                if self.state == WorkerState.RUNNING and not self.current_job.is_running.isSet():
+                    self.current_job.go()
 
             self.current_job.do_job()
             self.current_job.is_done.wait()
@@ -56,23 +58,27 @@ class WorkerThread(threading.Thread):
         self.feedback_log.put(log_msg)
 
     def change_state(self, new_state):
-        """Changes worker thread state (run/pause/stop)
+        """Changes worker thread state (run/pause/stop). A state set before the first job
+        starts is applied to it when it starts.
 
         :param new_state: WorkerState to set the worker to
         :return:
         """
-        self.state = new_state
-        if new_state == WorkerState.RUNNING:
-            if self.current_job:
-                self.current_job.go()
-            self.put_feedback("Beginning processing.", LogType.DEBUG)
-        elif new_state == WorkerState.PAUSE:
-            self.current_job.pause()
-            self.put_feedback("Processing paused.", LogType.DEBUG)
-        elif new_state == WorkerState.STOP:
-            self.current_job.is_killed = True
-            self.current_job.go()
-            self.put_feedback("Processing ended.", LogType.DEBUG)
+        with self.state_lock:
+            self.state = new_state
+            if new_state == WorkerState.RUNNING:
+                if self.current_job:
+                    self.current_job.go()
+                self.put_feedback("Beginning processing.", LogType.DEBUG)
+            elif new_state == WorkerState.PAUSE:
+                if self.current_job:
+                    self.current_job.pause()
+                self.put_feedback("Processing paused.", LogType.DEBUG)
+            elif new_state == WorkerState.STOP:
+                if self.current_job:
+                    self.current_job.is_killed = True
+                    self.current_job.go()
+                self.put_feedback("Processing ended.", LogType.DEBUG)
 
     def start(self):
         """Change worker state to RUNNING and start its main routine
@@ -18,9 +18,6 @@ from src.ui.ui_style import UIStyle
 from src.ui.user_event_type import UserEventType
 from src.model_conversion.model_shipper import ModelShipper
 from src.ui.button import Button
-from src.settings_manager import SettingsManager
-import json
-from src.util import Util
 
 
 class ConversionPanel(wx.Panel, IUIBehavior):
@@ -131,14 +128,8 @@ class ConversionPanel(wx.Panel, IUIBehavior):
         """
         self.save_button.Disable()
 
-        with open(SettingsManager.file_path, "r") as file:
-            file_settings = json.load(file)
-            part_dir = file_settings["part_dir"]
-            part_name = file_settings["part_name"]
-
-        file_path = Util.path_conversion(part_dir + "/" + part_name)
-        with open(file_path, "w") as text_file:
-            text_file.write(ModelShipper.get_metadata() + ModelShipper.output_data_text)
+        file_path = ModelShipper.get_output_path()
+        ModelShipper.save_output(file_path)
         self.save_button.Enable()
         UIDriver.fire_event(
             UserEvent(UserEventType.LOG_INFO,
@@ -287,7 +287,7 @@ class MetadataPanel(wx.Panel, IUIBehavior):
 
                 # Only update stuff if selection changed
                 # Check if this .stl is valid
-                mesh = ModelShipper.load_stl_model(filename)
+                mesh = self.load_stl_model(filename)
                 if mesh:
                     # Load in LDraw object to input model
                     ModelShipper.input_model = LDrawModel(mesh)
@@ -317,6 +317,28 @@ class MetadataPanel(wx.Panel, IUIBehavior):
 
         dialog.Destroy()
 
+    def load_stl_model(self, file_path: str):
+        """Load an STL model through the ModelShipper, reporting the progress of reading an
+        ASCII file to the log every tenth of the file.
+
+        :param file_path: The path to the stl file.
+        :return: The loaded Mesh, or a falsy value if the file is not a valid STL file.
+        """
+        reported = [0]
+
+        def report_progress(fraction: float):
+            percent = int(fraction * 10) * 10
+            if percent > reported[0]:
+                reported[0] = percent
+                UIDriver.fire_event(
+                    UserEvent(UserEventType.LOG_INFO,
+                              LogMessage(LogType.INFORMATION,
+                                         "Reading '" + file_path + "': " + str(percent) + "%")))
+                # Let the log repaint, without taking user input while the file is read
+                wx.SafeYield(None, True)
+
+        return ModelShipper.load_stl_model(file_path, report_progress)
+
     def text_ctrl_input_on_gain_focus(self, event):
         """ Return the path to the original.
         :param event:
@@ -344,7 +366,7 @@ class MetadataPanel(wx.Panel, IUIBehavior):
 
                     # Check if this .stl is valid
 
-                    mesh = ModelShipper.load_stl_model(self.stl_path_text)
+                    mesh = self.load_stl_model(self.stl_path_text)
 
                     if mesh:
                         # Load in LDraw object to input model
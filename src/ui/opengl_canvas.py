@@ -126,7 +126,6 @@ class OpenGLCanvas(glcanvas.GLCanvas, IUIBehavior):
         else:
             glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
 
-        self.Refresh()
         if self.scene is not None:
             self.scene.draw()
         self.SwapBuffers()
@@ -155,6 +154,7 @@ class OpenGLCanvas(glcanvas.GLCanvas, IUIBehavior):
                 if event.get_event_type() == UserEventType.RENDERING_WIRE_FRAME_PRESSED:
                     # A log message of this type is a BoolMessage.
                     self.wire_frame = event.get_log_message().get_bool()
+                    self.scene.mark_dirty()
                     
                 if event.get_event_type() == UserEventType.RENDERING_CANVAS_DISABLE:
                     self.Unbind(wx.EVT_PAINT)
@@ -166,13 +166,14 @@ class OpenGLCanvas(glcanvas.GLCanvas, IUIBehavior):
                     self.Refresh()
 
     def update(self, dt: float):
-        """Called every loop by the GUIEventLoop
+        """Called every loop by the GUIEventLoop. The canvas is only painted again when the
+        scene changed, so it does not use any CPU or GPU time while nothing moves.
 
         :param dt: The delta time between the last call.
         :return: None
         """
-        if self.scene is not None:
-            self.scene.update(dt)
+        if self.scene is not None and self.scene.update(dt):
+            self.Refresh()
 
     def process_erase_background(self, event):
         """Process the erase background event.
@@ -181,6 +182,7 @@ class OpenGLCanvas(glcanvas.GLCanvas, IUIBehavior):
 
     def update_meshes(self):
         """Update the meshes in the scene with the Modelshipper models, if they exist.
+        Their vertex data is built in the background, the scene adds them once it is ready.
 
         :return: None
         """
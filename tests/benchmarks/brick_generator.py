@@ -0,0 +1,219 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+"""Generate plates and bricks as closed STL meshes, to benchmark the conversion at any size.
+
+Usage: python -m tests.benchmarks.brick_generator [--plates PLATES] [--segments SEGMENTS]
+                                                  [--solid] [--holes] -o OUTPUT STUDS_X STUDS_Y
+"""
+import sys
+import math
+import argparse
+import numpy
+import triangle as tr
+from stl import Mesh
+
+
+class BrickGenerator:
+    """The static class responsible for building plates and bricks out of triangles, in LDraw
+    units with z up. Every mesh is closed, with each edge shared by two triangles, and every
+    triangle wound so its normal points out of the part.
+
+    The top of a part has a stud in the middle of each cell. A hollow part has an open
+    underside with a tube at each inner corner between four cells, a solid part is filled in.
+    Holes go down through the inner corners, and through the tubes of a hollow part.
+    """
+    pitch = 20.0  # Width of one cell, the distance between studs
+    plate_height = 8.0  # Height of a plate, a brick is three plates high
+    stud_radius = 6.0
+    stud_height = 4.0
+    wall_thickness = 4.0  # Thickness of the outer walls of a hollow part
+    top_thickness = 4.0  # Thickness of the top of a hollow part
+    tube_radius = 8.0  # Outer radius of the tubes under a hollow part
+    hole_radius = 6.0  # Radius of the holes, and the inner radius of the tubes
+
+    @staticmethod
+    def make_part(studs_x: int, studs_y: int, plates: int = 3, segments: int = 16,
+                  hollow: bool = True, holes: bool = False):
+        """Build a plate or brick.
+
+        :param studs_x: The number of studs along x.
+        :param studs_y: The number of studs along y.
+        :param plates: The height of the part in plates, 1 for a plate and 3 for a brick.
+        :param segments: The number of sides of each stud, tube and hole, at least 3.
+        :param hollow: Leave the underside open, with tubes between the studs.
+        :param holes: Put a hole through each inner corner between four studs.
+        :return: The Mesh of the part.
+        """
+        width = studs_x * BrickGenerator.pitch
+        depth = studs_y * BrickGenerator.pitch
+        height = plates * BrickGenerator.plate_height
+        outer = BrickGenerator.make_rectangle(0.0, 0.0, width, depth)
+
+        stud_centers = [((x + 0.5) * BrickGenerator.pitch, (y + 0.5) * BrickGenerator.pitch)
+                        for x in range(studs_x) for y in range(studs_y)]
+        corner_centers = [(x * BrickGenerator.pitch, y * BrickGenerator.pitch)
+                          for x in range(1, studs_x) for y in range(1, studs_y)]
+        studs = [BrickGenerator.make_circle(center, BrickGenerator.stud_radius, segments)
+                 for center in stud_centers]
+        hole_circles = [BrickGenerator.make_circle(center, BrickGenerator.hole_radius, segments)
+                        for center in corner_centers] if holes else []
+
+        triangles = [BrickGenerator.make_wall(outer, 0.0, height),
+                     BrickGenerator.make_face(outer, studs + hole_circles, height, True)]
+        for stud in studs:
+            top = height + BrickGenerator.stud_height
+            triangles.append(BrickGenerator.make_wall(stud, height, top))
+            triangles.append(BrickGenerator.make_face(stud, [], top, True))
+
+        if not hollow:
+            triangles.append(BrickGenerator.make_face(outer, hole_circles, 0.0, False))
+            for hole in hole_circles:
+                triangles.append(BrickGenerator.make_wall(hole, 0.0, height, True))
+            return BrickGenerator.make_mesh(triangles)
+
+        # The open underside, with a tube at each inner corner
+        ceiling = height - BrickGenerator.top_thickness
+        inner = BrickGenerator.make_rectangle(BrickGenerator.wall_thickness,
+                                              BrickGenerator.wall_thickness,
+                                              width - BrickGenerator.wall_thickness,
+                                              depth - BrickGenerator.wall_thickness)
+        tubes = [BrickGenerator.make_circle(center, BrickGenerator.tube_radius, segments)
+                 for center in corner_centers]
+        tube_holes = [BrickGenerator.make_circle(center, BrickGenerator.hole_radius, segments)
+                      for center in corner_centers]
+
+        triangles.append(BrickGenerator.make_face(outer, [inner], 0.0, False))
+        triangles.append(BrickGenerator.make_wall(inner, 0.0, ceiling, True))
+        triangles.append(BrickGenerator.make_face(inner, tubes, ceiling, False))
+        for tube, tube_hole in zip(tubes, tube_holes):
+            triangles.append(BrickGenerator.make_wall(tube, 0.0, ceiling))
+            triangles.append(BrickGenerator.make_face(tube, [tube_hole], 0.0, False))
+            if holes:
+                # The hole carries on down the inside of the tube
+                triangles.append(BrickGenerator.make_wall(tube_hole, 0.0, height, True))
+            else:
+                triangles.append(BrickGenerator.make_wall(tube_hole, 0.0, ceiling, True))
+                triangles.append(BrickGenerator.make_face(tube_hole, [], ceiling, False))
+        return BrickGenerator.make_mesh(triangles)
+
+    @staticmethod
+    def make_rectangle(x0: float, y0: float, x1: float, y1: float):
+        """Make the outline of a rectangle.
+
+        :return: Float array of shape (4, 2) with the corners in counter clockwise order.
+        """
+        return numpy.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]])
+
+    @staticmethod
+    def make_circle(center: tuple, radius: float, segments: int):
+        """Make the outline of a regular polygon standing in for a circle.
+
+        :param center: The x and y of the center.
+        :param radius: The distance from the center to each corner.
+        :param segments: The number of sides.
+        :return: Float array of shape (segments, 2) with the corners in counter clockwise order.
+        """
+        angles = numpy.arange(segments) * (2.0 * math.pi / segments)
+        return numpy.column_stack((center[0] + radius * numpy.cos(angles),
+                                   center[1] + radius * numpy.sin(angles)))
+
+    @staticmethod
+    def make_wall(outline, bottom: float, top: float, inward: bool = False):
+        """Make the vertical wall standing on an outline, two triangles for each side.
+
+        :param outline: Float array of shape (n, 2) with the corners in counter clockwise order.
+        :param bottom: The z of the bottom of the wall.
+        :param top: The z of the top of the wall.
+        :param inward: Face the inside of the outline, for the wall of a hole.
+        :return: Float array of shape (2n, 3, 3) with the corners of each triangle.
+        """
+        start = numpy.asarray(outline)
+        end = numpy.roll(start, -1, axis=0)
+        if inward:
+            start, end = end, start
+        start_bottom = numpy.column_stack((start, numpy.full(len(start), bottom)))
+        end_bottom = numpy.column_stack((end, numpy.full(len(end), bottom)))
+        start_top = numpy.column_stack((start, numpy.full(len(start), top)))
+        end_top = numpy.column_stack((end, numpy.full(len(end), top)))
+        return numpy.concatenate((numpy.stack((start_bottom, end_bottom, end_top), axis=1),
+                                  numpy.stack((start_bottom, end_top, start_top), axis=1)))
+
+    @staticmethod
+    def make_face(outline, holes: [], z: float, upward: bool):
+        """Make a flat face at a height, triangulated without adding any point to its outlines.
+
+        :param outline: Float array of shape (n, 2) with the corners of the face.
+        :param holes: List of float arrays with the corners of each hole in the face.
+        :param z: The height of the face.
+        :param upward: Face up instead of down.
+        :return: Float array of shape (k, 3, 3) with the corners of each triangle.
+        """
+        vertices = []
+        segments = []
+        for loop in [outline] + holes:
+            start = sum(len(points) for points in vertices)
+            ids = numpy.arange(start, start + len(loop))
+            segments.append(numpy.column_stack((ids, numpy.roll(ids, -1))))
+            vertices.append(numpy.asarray(loop))
+
+        pslg = {"vertices": numpy.concatenate(vertices), "segments": numpy.concatenate(segments)}
+        if holes:
+            pslg["holes"] = numpy.array([numpy.mean(hole, axis=0) for hole in holes])
+        triangulation = tr.triangulate(pslg, "pY")
+
+        corners = triangulation["vertices"][triangulation["triangles"]]
+        # Wind each triangle counter clockwise seen from the side the face is facing
+        edge_1 = corners[:, 1] - corners[:, 0]
+        edge_2 = corners[:, 2] - corners[:, 0]
+        is_clockwise = edge_1[:, 0] * edge_2[:, 1] - edge_1[:, 1] * edge_2[:, 0] < 0
+        flip = is_clockwise == upward
+        corners[flip] = corners[flip][:, ::-1]
+        return numpy.concatenate((corners, numpy.full(corners.shape[:2] + (1,), z)), axis=2)
+
+    @staticmethod
+    def make_mesh(triangles: []):
+        """Join arrays of triangles into a Mesh.
+
+        :param triangles: List of float arrays of shape (k, 3, 3).
+        :return: The Mesh, with the normals calculated from the vertices.
+        """
+        vectors = numpy.concatenate(triangles)
+        data = numpy.zeros(len(vectors), dtype=Mesh.dtype)
+        data["vectors"] = vectors
+        return Mesh(data)
+
+
+def main(arguments=None):
+    """Generate a part and save it as a binary STL file.
+
+    :param arguments: The command line arguments, sys.argv[1:] when None.
+    :return: The exit code.
+    """
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.brick_generator",
+                                     description="Generate a plate or brick as an STL file.")
+    parser.add_argument("studs_x", type=int)
+    parser.add_argument("studs_y", type=int)
+    parser.add_argument("-o", "--output", required=True, help="STL file to write")
+    parser.add_argument("--plates", type=int, default=3, help="height in plates (default: 3)")
+    parser.add_argument("--segments", type=int, default=16,
+                        help="sides of each stud, tube and hole (default: 16)")
+    parser.add_argument("--solid", action="store_true", help="fill in the underside")
+    parser.add_argument("--holes", action="store_true", help="put holes between the studs")
+    args = parser.parse_args(arguments)
+
+    mesh = BrickGenerator.make_part(args.studs_x, args.studs_y, args.plates, args.segments,
+                                    not args.solid, args.holes)
+    mesh.save(args.output)
+    print(f"Wrote {len(mesh.data)} triangles to {args.output}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+"""Benchmark each stage of the conversion on the models in tests/test_models.
+
+Usage: python -m tests.benchmarks.run_benchmarks [-r REPEAT] [-o RESULTS] [--baseline BASELINE]
+                                                 [--update-baseline] [MODEL ...]
+
+Every model is loaded and converted REPEAT times, with the MeshCache off. The median, 90th
+percentile, minimum and maximum wall time of each stage are written to a JSON results file,
+along with the peak memory of each stage from one more run with tracemalloc on. The results
+are then compared to a baseline made on the same machine, and the exit code is 1 if a stage
+got slower or uses more memory than the threshold allows.
+"""
+import os
+import sys
+import glob
+import json
+import platform
+import argparse
+import numpy
+from pathlib import Path
+from stl import Mesh
+from src.util import Util
+from src.model_conversion.conversion_pipeline import ConversionPipeline
+from src.model_conversion.ldraw_model import LDrawModel
+from src.model_conversion.stage_profiler import StageProfiler
+from src.model_conversion.mesh_cache import MeshCache
+
+model_folder = Util.path_conversion("tests/test_models")
+results_version = 1  # Raise it when the layout of the results file changes
+default_results_path = Util.path_conversion("tests/benchmarks/results.json")
+default_baseline_path = Util.path_conversion("tests/benchmarks/baseline.json")
+
+
+def profile_model(file_path: str, trace_memory: bool):
+    """Load and convert a model once, profiling each stage. The MeshCache should be disabled,
+    as benchmark_model does, or the load stage times reading the cached mesh.
+
+    :param file_path: The path to the stl file.
+    :param trace_memory: Measure the peak memory of each stage, which makes the stages slower.
+    :return: The triangle count of the model and the list of stage dictionaries.
+    """
+    StageProfiler.trace_memory = trace_memory
+    profiler = StageProfiler()
+    with profiler.stage("load") as outputs:
+        mesh = ConversionPipeline.load_mesh(file_path)[0]
+        outputs["triangles"] = len(mesh.data)
+    profile_mesh(mesh, profiler)
+    return len(mesh.data), profiler.stages
+
+
+def profile_mesh(mesh: Mesh, profiler: StageProfiler, use_indexed_mesh: bool = True):
+    """Simplify a mesh and convert it to LDraw text once, profiling each stage. The text is
+    written to the null device, as a file would be, rather than kept in memory.
+
+    :param mesh: The Mesh to convert.
+    :param profiler: The StageProfiler to add the stages to.
+    :param use_indexed_mesh: Find the face boundaries from an IndexedMesh, not Triangle objects.
+    :return: None
+    """
+    pipeline = ConversionPipeline()
+    pipeline.use_cache = False
+    pipeline.use_indexed_mesh = use_indexed_mesh
+    pipeline.profiler = profiler
+    model = LDrawModel(pipeline.simplify(mesh))
+    with open(os.devnull, "w") as output:
+        pipeline.write_model(model, output)
+
+
+def sum_stages(stages: [], key: str):
+    """Add up a value of each stage by stage name, for stages that run more than once.
+
+    :param stages: List of stage dictionaries.
+    :param key: The value to add up.
+    :return: Dictionary of the total of each stage, in the order the stages first ran.
+    """
+    totals = {}
+    for stage in stages:
+        totals[stage["stage"]] = totals.get(stage["stage"], 0) + (stage[key] or 0)
+    return totals
+
+
+def benchmark_model(file_path: str, repeat: int):
+    """Benchmark each stage of the conversion of a model.
+
+    :param file_path: The path to the stl file.
+    :param repeat: The number of timed runs.
+    :return: Dictionary with the triangle count, the statistics of each stage and an error
+    message, which is None when the conversion worked.
+    """
+    result = {"triangles": 0, "stages": {}, "error": None}
+    trace_memory = StageProfiler.trace_memory
+    # Every run parses the file, and the user's cache is left alone
+    cache_enabled = MeshCache.enabled
+    MeshCache.enabled = False
+    try:
+        wall_times = {}
+        for _ in range(repeat):
+            result["triangles"], stages = profile_model(file_path, False)
+            for name, wall_time in sum_stages(stages, "wall_time").items():
+                wall_times.setdefault(name, []).append(wall_time)
+
+        peak_memory = sum_stages(profile_model(file_path, True)[1], "peak_memory")
+    except Exception as err:
+        result["error"] = f"{type(err).__name__}: {err}"
+        return result
+    finally:
+        StageProfiler.trace_memory = trace_memory
+        MeshCache.enabled = cache_enabled
+
+    for name, times in wall_times.items():
+        result["stages"][name] = {"median": float(numpy.median(times)),
+                                  "p90": float(numpy.percentile(times, 90)),
+                                  "min": min(times),
+                                  "max": max(times),
+                                  "peak_memory": peak_memory.get(name)}
+    return result
+
+
+def run_benchmarks(file_paths: [], repeat: int):
+    """Benchmark each model.
+
+    :param file_paths: List of stl file paths.
+    :param repeat: The number of timed runs of each model.
+    :return: The results dictionary, as written to the results file.
+    """
+    results = {"version": results_version,
+               "python": platform.python_version(),
+               "machine": platform.platform(),
+               "repeat": repeat,
+               "models": {}}
+    for file_path in file_paths:
+        results["models"][Path(file_path).name] = benchmark_model(file_path, repeat)
+    return results
+
+
+def compare_results(results: dict, baseline: dict, threshold: float = 0.25,
+                    min_time: float = 0.005, min_memory: int = 64 * 1024):
+    """Find the stages that got slower or use more memory than in the baseline.
+
+    :param results: The results dictionary of this run.
+    :param baseline: The results dictionary to compare against.
+    :param threshold: The fraction a median time or peak memory may grow by.
+    :param min_time: Seconds a median time may grow by regardless of the threshold, so the
+    noise of very short stages is not flagged.
+    :param min_memory: Bytes a peak memory may grow by regardless of the threshold.
+    :return: List of str describing each regression.
+    """
+    regressions = []
+    for model_name, model in results["models"].items():
+        base_model = baseline["models"].get(model_name)
+        if base_model is None:
+            continue
+        if model["error"] is not None and base_model["error"] is None:
+            regressions.append(f"{model_name}: failed with {model['error']}")
+            continue
+
+        for stage_name, stage in model["stages"].items():
+            base_stage = base_model["stages"].get(stage_name)
+            if base_stage is None:
+                continue
+            if stage["median"] > max(base_stage["median"] * (1.0 + threshold),
+                                     base_stage["median"] + min_time):
+                regressions.append(f"{model_name} {stage_name}: median {stage['median']:.4f}s, "
+                                   f"was {base_stage['median']:.4f}s")
+            if (stage["peak_memory"] is not None and base_stage["peak_memory"] is not None and
+                    stage["peak_memory"] > max(base_stage["peak_memory"] * (1.0 + threshold),
+                                               base_stage["peak_memory"] + min_memory)):
+                regressions.append(f"{model_name} {stage_name}: peak memory "
+                                   f"{stage['peak_memory']} bytes, "
+                                   f"was {base_stage['peak_memory']} bytes")
+    return regressions
+
+
+def format_results(results: dict):
+    """Format the results as a table, one line for each stage of each model.
+
+    :param results: The results dictionary.
+    :return: The table as a str.
+    """
+    lines = [f"{'model':<34} {'stage':<20} {'median':>9} {'p90':>9} {'peak MiB':>9}"]
+    for model_name, model in results["models"].items():
+        if model["error"] is not None:
+            lines.append(f"{model_name:<34} failed: {model['error']}")
+        for stage_name, stage in model["stages"].items():
+            peak = "-" if stage["peak_memory"] is None else \
+                f"{stage['peak_memory'] / (1024 * 1024):.2f}"
+            lines.append(f"{model_name:<34} {stage_name:<20} {stage['median']:>8.4f}s "
+                         f"{stage['p90']:>8.4f}s {peak:>9}")
+    return "\n".join(lines)
+
+
+def save_results(file_path: str, results: dict):
+    """Write a results dictionary to a JSON file.
+
+    :param file_path: The path of the JSON file.
+    :param results: The results dictionary.
+    :return: None
+    """
+    with open(file_path, "w") as file:
+        json.dump(results, file, indent=4)
+
+
+def main(arguments=None):
+    """Benchmark the models given on the command line, or every test model, and compare the
+    results to the baseline.
+
+    :param arguments: The command line arguments, sys.argv[1:] when None.
+    :return: The exit code, 1 if a stage regressed or a model that converted in the baseline
+    failed.
+    """
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.run_benchmarks",
+                                     description="Benchmark each stage of the conversion.")
+    parser.add_argument("models", nargs="*", help="stl files (default: tests/test_models/*.stl)")
+    parser.add_argument("-r", "--repeat", type=int, default=7, help="timed runs of each model")
+    parser.add_argument("-o", "--output", default=default_results_path, help="results file")
+    parser.add_argument("--baseline", default=default_baseline_path, help="baseline file")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store the results as the new baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="fraction a median time or peak memory may grow by (default: 0.25)")
+    args = parser.parse_args(arguments)
+
+    file_paths = args.models or sorted(glob.glob(os.path.join(model_folder, "*.stl")))
+    results = run_benchmarks(file_paths, max(1, args.repeat))
+    print(format_results(results))
+    save_results(args.output, results)
+
+    if args.update_baseline:
+        save_results(args.baseline, results)
+        print(f"Stored the baseline at {args.baseline}.")
+        return 0
+
+    if not Util.is_file(args.baseline):
+        print(f"No baseline at {args.baseline}, store one with --update-baseline.")
+        return 0
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+    if baseline.get("version") != results_version:
+        print(f"The baseline at {args.baseline} is from another version, store a new one.")
+        return 0
+
+    regressions = compare_results(results, baseline, args.threshold)
+    for regression in regressions:
+        print("Regression: " + regression)
+    print(f"{len(regressions)} regressions against {args.baseline}.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
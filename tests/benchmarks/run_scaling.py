@@ -0,0 +1,170 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+"""Measure how the time of each stage of the conversion grows with the triangle count.
+
+Usage: python -m tests.benchmarks.run_scaling [--min-triangles MIN] [--max-triangles MAX]
+                                              [--steps STEPS] [--legacy] [-o RESULTS]
+
+Square bricks are generated with about MIN to MAX triangles and converted. A line through the
+log of the median time against the log of the triangle count is fitted for each stage, its
+slope is the empirical exponent: 1 for linear time, 2 for quadratic time. The sweep stops
+early once a conversion takes longer than the time limit.
+"""
+import sys
+import math
+import json
+import time
+import argparse
+import numpy
+from src.model_conversion.stage_profiler import StageProfiler
+from tests.benchmarks.brick_generator import BrickGenerator
+from tests.benchmarks.run_benchmarks import profile_mesh, sum_stages
+
+
+def get_brick_size(triangles: int, plates: int, segments: int, hollow: bool, holes: bool):
+    """Find the number of studs along each side of the square brick with the triangle count
+    closest to the one asked for.
+
+    The triangle count of an n by n brick is a quadratic in n: each stud, inner corner and
+    stretch of wall adds a fixed number of triangles, as the faces are triangulated without
+    adding points. The quadratic is fitted to the three smallest bricks, which it matches exactly.
+
+    :param triangles: The triangle count to aim for.
+    :return: The number of studs along each side.
+    """
+    sizes = [1, 2, 3]
+    counts = [len(BrickGenerator.make_part(size, size, plates, segments, hollow, holes).data)
+              for size in sizes]
+    a, b, c = numpy.polyfit(sizes, counts, 2)
+    size = (-b + math.sqrt(max(b * b - 4.0 * a * (c - triangles), 0.0))) / (2.0 * a)
+    candidates = set(max(1, int(round_size)) for round_size in (math.floor(size), math.ceil(size)))
+    return min(candidates, key=lambda n: (abs(a * n * n + b * n + c - triangles), n))
+
+
+def fit_exponent(triangle_counts: [], times: []):
+    """Fit time = c * triangles ^ k to the measurements.
+
+    :param triangle_counts: The triangle count of each measurement.
+    :param times: The seconds taken by each measurement.
+    :return: The exponent k, or None if there are fewer than two usable measurements.
+    """
+    points = [(count, seconds) for count, seconds in zip(triangle_counts, times)
+              if count > 0 and seconds > 0]
+    if len(set(count for count, _ in points)) < 2:
+        return None
+    log_counts, log_times = numpy.log([[count for count, _ in points],
+                                       [seconds for _, seconds in points]])
+    return float(numpy.polyfit(log_counts, log_times, 1)[0])
+
+
+def run_scaling(targets: [], repeat: int = 3, plates: int = 3, segments: int = 16,
+                hollow: bool = True, holes: bool = False, use_indexed_mesh: bool = True,
+                time_limit: float = 60.0):
+    """Convert bricks of growing size and fit the exponent of each stage.
+
+    :param targets: The triangle counts to aim for, smallest first.
+    :param repeat: The number of timed runs of each brick.
+    :param use_indexed_mesh: Find the face boundaries from an IndexedMesh, not Triangle objects.
+    :param time_limit: Seconds a conversion may take before the larger bricks are skipped.
+    :return: Dictionary with the settings, the median time of each stage for each brick and
+    the exponent of each stage.
+    """
+    results = {"settings": {"plates": plates, "segments": segments, "hollow": hollow,
+                            "holes": holes, "use_indexed_mesh": use_indexed_mesh},
+               "bricks": [],
+               "exponents": {}}
+    trace_memory = StageProfiler.trace_memory
+    StageProfiler.trace_memory = False
+    try:
+        sizes = []
+        for target in targets:
+            size = get_brick_size(target, plates, segments, hollow, holes)
+            if size in sizes:
+                continue
+            sizes.append(size)
+
+            mesh = BrickGenerator.make_part(size, size, plates, segments, hollow, holes)
+            stage_times = {}
+            start = time.perf_counter()
+            for _ in range(repeat):
+                profiler = StageProfiler()
+                profile_mesh(mesh, profiler, use_indexed_mesh)
+                for name, wall_time in sum_stages(profiler.stages, "wall_time").items():
+                    stage_times.setdefault(name, []).append(wall_time)
+            results["bricks"].append({
+                "studs": size,
+                "triangles": len(mesh.data),
+                "stages": {name: float(numpy.median(times)) for name, times in stage_times.items()}})
+            if (time.perf_counter() - start) / repeat > time_limit:
+                break
+    finally:
+        StageProfiler.trace_memory = trace_memory
+
+    triangle_counts = [brick["triangles"] for brick in results["bricks"]]
+    for name in results["bricks"][0]["stages"] if results["bricks"] else []:
+        times = [brick["stages"].get(name, 0.0) for brick in results["bricks"]]
+        results["exponents"][name] = fit_exponent(triangle_counts, times)
+    return results
+
+
+def format_results(results: dict):
+    """Format the results as a table with a row for each stage and a column for each brick.
+
+    :param results: The results dictionary.
+    :return: The table as a str.
+    """
+    bricks = results["bricks"]
+    lines = [f"{'triangles':<20}" + "".join(f"{brick['triangles']:>11}" for brick in bricks) +
+             f"{'exponent':>10}"]
+    for name, exponent in results["exponents"].items():
+        exponent_text = "-" if exponent is None else f"{exponent:.2f}"
+        lines.append(f"{name:<20}" +
+                     "".join(f"{brick['stages'].get(name, 0.0):>10.4f}s" for brick in bricks) +
+                     f"{exponent_text:>10}")
+    return "\n".join(lines)
+
+
+def main(arguments=None):
+    """Run the sweep given on the command line and print the time and exponent of each stage.
+
+    :param arguments: The command line arguments, sys.argv[1:] when None.
+    :return: The exit code.
+    """
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.run_scaling",
+                                     description="Fit how each stage scales with triangles.")
+    parser.add_argument("--min-triangles", type=int, default=1000)
+    parser.add_argument("--max-triangles", type=int, default=1000000)
+    parser.add_argument("--steps", type=int, default=7, help="brick sizes to convert")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="timed runs of each brick")
+    parser.add_argument("--plates", type=int, default=3, help="height in plates (default: 3)")
+    parser.add_argument("--segments", type=int, default=16,
+                        help="sides of each stud, tube and hole (default: 16)")
+    parser.add_argument("--solid", action="store_true", help="fill in the underside")
+    parser.add_argument("--holes", action="store_true", help="put holes between the studs")
+    parser.add_argument("--legacy", action="store_true",
+                        help="find the face boundaries from Triangle objects")
+    parser.add_argument("--time-limit", type=float, default=60.0,
+                        help="seconds a conversion may take before the sweep stops")
+    parser.add_argument("-o", "--output", help="JSON file to write the results to")
+    args = parser.parse_args(arguments)
+
+    targets = numpy.geomspace(args.min_triangles, args.max_triangles, max(2, args.steps))
+    results = run_scaling([int(target) for target in targets], max(1, args.repeat),
+                          args.plates, args.segments, not args.solid, args.holes,
+                          not args.legacy, args.time_limit)
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+
+import os
+import io
+import json
+import tempfile
+import unittest
+import contextlib
+from src.util import Util
+import src.batch_convert as BatchConvert
+from src.model_conversion.mesh_cache import MeshCache
+from src.model_conversion.ldraw_writer import LDrawWriter
+
+model_folder = Util.path_conversion("tests/test_models") + os.sep
+
+
+class TestBatchConvert(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_enabled = MeshCache.enabled
+        MeshCache.enabled = False
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        MeshCache.enabled = self.cache_enabled
+
+    def test_find_input_files(self):
+        file_paths = BatchConvert.find_input_files([model_folder + "cube*.stl",
+                                                    model_folder + "cube.stl"])
+        self.assertEqual([os.path.basename(path) for path in file_paths],
+                         ["cube.stl", "cube_rot.stl"])
+
+    def test_get_output_paths(self):
+        output_paths = BatchConvert.get_output_paths(
+            [os.path.join("scans", "a", "brick.stl"), os.path.join("scans", "b", "brick.stl")],
+            "parts")
+        self.assertEqual(output_paths, [os.path.join("parts", "a", "brick.dat"),
+                                        os.path.join("parts", "b", "brick.dat")])
+        self.assertEqual(BatchConvert.get_output_paths([model_folder + "cube.stl"], "parts"),
+                         [os.path.join("parts", "cube.dat")])
+
+    def test_convert_file(self):
+        result = BatchConvert.convert_file((model_folder + "cube.stl",
+                                            os.path.join(self.temp_dir.name, "cube.dat"),
+                                            "First Last", "CCAL", False))
+        self.assertIsNone(result["error"])
+        self.assertEqual(result["triangles"], 12)
+        self.assertEqual(result["lines"], 6)
+        with open(os.path.join(self.temp_dir.name, "cube.dat"), "r") as file:
+            lines = file.read().splitlines()
+        self.assertEqual(lines[:4], ["0 LScan auto generated part cube.dat", "0 Name: cube.dat",
+                                     "0 Author: First Last", "0 !LICENSE CCAL"])
+        self.assertEqual([line[:4] for line in lines[4:]], ["4 4 "] * 6)
+
+    def test_convert_file_failed_write(self):
+        output_path = os.path.join(self.temp_dir.name, "cube.dat")
+        with open(output_path, "w") as file:
+            file.write("0 Earlier part\n")
+
+        # The writer fails after the metadata was written
+        chunk_size = LDrawWriter.chunk_size
+        LDrawWriter.chunk_size = 0
+        try:
+            result = BatchConvert.convert_file((model_folder + "cube.stl", output_path,
+                                                "First Last", "CCAL", False))
+        finally:
+            LDrawWriter.chunk_size = chunk_size
+        self.assertIsNotNone(result["error"])
+
+        # The earlier part is left as it was, and the temporary file is gone
+        self.assertEqual(os.listdir(self.temp_dir.name), ["cube.dat"])
+        with open(output_path, "r") as file:
+            self.assertEqual(file.read(), "0 Earlier part\n")
+
+    def test_convert_file_profile(self):
+        result = BatchConvert.convert_file((model_folder + "cube.stl",
+                                            os.path.join(self.temp_dir.name, "cube.dat"),
+                                            "First Last", "CCAL", True))
+        self.assertIsNone(result["error"])
+        with open(os.path.join(self.temp_dir.name, "cube.dat.profile.json"), "r") as file:
+            stages = json.load(file)["stages"]
+        self.assertEqual(stages[0]["stage"], "load")
+        self.assertEqual(stages[0]["outputs"], {"triangles": 12})
+        self.assertEqual(stages[-1]["stage"], "write lines")
+        self.assertEqual(stages[-1]["inputs"], {"lines": 6})
+
+    def test_main(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            exit_code = BatchConvert.main(["-j", "2", "-o", self.temp_dir.name,
+                                           model_folder + "cube*.stl"])
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ["cube.dat", "cube_rot.dat"])
+        self.assertIn("Converted 2 of 2 files", output.getvalue())
+
+    def test_main_same_names(self):
+        input_dir = os.path.join(self.temp_dir.name, "scans")
+        output_dir = os.path.join(self.temp_dir.name, "parts")
+        for folder, model in (("a", "cube.stl"), ("b", "cube_rot.stl")):
+            os.makedirs(os.path.join(input_dir, folder))
+            with open(model_folder + model, "rb") as source, \
+                    open(os.path.join(input_dir, folder, "cube.stl"), "wb") as target:
+                target.write(source.read())
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            exit_code = BatchConvert.main(["-j", "1", "-o", output_dir,
+                                           os.path.join(input_dir, "*", "cube.stl")])
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(os.listdir(os.path.join(output_dir, "a")), ["cube.dat"])
+        self.assertEqual(os.listdir(os.path.join(output_dir, "b")), ["cube.dat"])
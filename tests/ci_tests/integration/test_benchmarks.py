@@ -0,0 +1,89 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import os
+import io
+import copy
+import json
+import tempfile
+import unittest
+import contextlib
+from src.util import Util
+import tests.benchmarks.run_benchmarks as Benchmarks
+from src.model_conversion.mesh_cache import MeshCache
+
+model_folder = Util.path_conversion("tests/test_models") + os.sep
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = MeshCache.cache_dir
+        MeshCache.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.results = Benchmarks.run_benchmarks([model_folder + "cube.stl"], 3)
+
+    def tearDown(self):
+        MeshCache.cache_dir = self.cache_dir
+        self.temp_dir.cleanup()
+
+    def test_run_benchmarks(self):
+        model = self.results["models"]["cube.stl"]
+        self.assertIsNone(model["error"])
+        self.assertEqual(model["triangles"], 12)
+        self.assertEqual(list(model["stages"])[0], "load")
+        self.assertIn("triangulation", model["stages"])
+        self.assertIn("write lines", model["stages"])
+        for stage in model["stages"].values():
+            self.assertLessEqual(stage["min"], stage["median"])
+            self.assertLessEqual(stage["median"], stage["p90"])
+            self.assertLessEqual(stage["p90"], stage["max"])
+            self.assertIsNotNone(stage["peak_memory"])
+        # Nothing was loaded from or stored in the cache
+        self.assertFalse(os.path.exists(MeshCache.cache_dir))
+
+    def test_failed_model(self):
+        model = Benchmarks.run_benchmarks([model_folder + "missing.stl"], 1)["models"]["missing.stl"]
+        self.assertIsNotNone(model["error"])
+        self.assertEqual(model["stages"], {})
+
+    def test_compare_results(self):
+        self.assertEqual(Benchmarks.compare_results(self.results, self.results), [])
+
+        slower = copy.deepcopy(self.results)
+        slower["models"]["cube.stl"]["stages"]["triangulation"]["median"] += 1.0
+        slower["models"]["cube.stl"]["stages"]["faces"]["peak_memory"] += 1024 * 1024
+        regressions = Benchmarks.compare_results(slower, self.results)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("cube.stl faces: peak memory"))
+        self.assertTrue(regressions[1].startswith("cube.stl triangulation: median"))
+
+        failed = copy.deepcopy(self.results)
+        failed["models"]["cube.stl"]["error"] = "KeyError: 'triangles'"
+        self.assertEqual(len(Benchmarks.compare_results(failed, self.results)), 1)
+
+    def test_main(self):
+        results_path = os.path.join(self.temp_dir.name, "results.json")
+        baseline_path = os.path.join(self.temp_dir.name, "baseline.json")
+        arguments = ["-r", "1", "-o", results_path, "--baseline", baseline_path,
+                     model_folder + "cube.stl"]
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(Benchmarks.main(arguments + ["--update-baseline"]), 0)
+            self.assertEqual(Benchmarks.main(arguments), 0)
+            self.assertIn("0 regressions", output.getvalue())
+
+            # A baseline faster than possible flags the stage
+            with open(baseline_path, "r") as file:
+                baseline = json.load(file)
+            baseline["models"]["cube.stl"]["stages"]["faces"]["median"] = -1.0
+            Benchmarks.save_results(baseline_path, baseline)
+            self.assertEqual(Benchmarks.main(arguments), 1)
+        self.assertIn("Regression: cube.stl faces: median", output.getvalue())
+        self.assertTrue(Util.is_file(results_path))
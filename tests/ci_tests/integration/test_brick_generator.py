@@ -0,0 +1,83 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import math
+import unittest
+import numpy
+from src.model_conversion.conversion_pipeline import ConversionPipeline
+from tests.benchmarks.brick_generator import BrickGenerator
+import tests.benchmarks.run_scaling as Scaling
+
+
+class TestBrickGenerator(unittest.TestCase):
+
+    def count_open_edges(self, mesh):
+        # Each directed edge of a closed mesh shows up once, and reversed once
+        edges = {}
+        for triangle in mesh.vectors.astype(numpy.float64):
+            for i in range(3):
+                edge = (tuple(triangle[i]), tuple(triangle[(i + 1) % 3]))
+                edges[edge] = edges.get(edge, 0) + 1
+        return sum(1 for (start, end), count in edges.items()
+                   if count != 1 or edges.get((end, start)) != 1)
+
+    def get_volume(self, mesh):
+        vectors = mesh.vectors.astype(numpy.float64)
+        return numpy.einsum("ij,ij->", vectors[:, 0],
+                            numpy.cross(vectors[:, 1], vectors[:, 2])) / 6.0
+
+    def test_closed(self):
+        for hollow in [True, False]:
+            for holes in [True, False]:
+                mesh = BrickGenerator.make_part(3, 2, 3, 12, hollow, holes)
+                self.assertEqual(self.count_open_edges(mesh), 0)
+                self.assertGreater(self.get_volume(mesh), 0.0)
+
+    def test_solid_plate_volume(self):
+        segments = 16
+        mesh = BrickGenerator.make_part(2, 2, 1, segments, hollow=False)
+        stud_area = segments / 2.0 * 6.0 ** 2 * math.sin(2.0 * math.pi / segments)
+        self.assertAlmostEqual(self.get_volume(mesh), 40 * 40 * 8 + 4 * stud_area * 4, places=2)
+
+    def test_segments(self):
+        coarse = BrickGenerator.make_part(2, 2, segments=8)
+        fine = BrickGenerator.make_part(2, 2, segments=32)
+        self.assertGreater(len(fine.data), len(coarse.data) * 3)
+
+    def test_convert(self):
+        mesh = BrickGenerator.make_part(2, 2, 1, 8, holes=True)
+        pipeline = ConversionPipeline()
+        pipeline.use_cache = False
+        model, text = pipeline.convert(mesh)
+        self.assertEqual(self.count_open_edges(model.get_mesh()), 0)
+        self.assertAlmostEqual(self.get_volume(model.get_mesh()), self.get_volume(mesh), places=1)
+
+    def test_get_brick_size(self):
+        for hollow, holes in ((True, False), (False, True)):
+            size = Scaling.get_brick_size(5000, 3, 16, hollow, holes)
+
+            def miss(n):
+                return abs(len(BrickGenerator.make_part(n, n, 3, 16, hollow, holes).data) - 5000)
+            # No other size comes closer to the target
+            self.assertLessEqual(miss(size), miss(size + 1))
+            self.assertLessEqual(miss(size), miss(size - 1))
+
+    def test_fit_exponent(self):
+        counts = [1000, 10000, 100000]
+        self.assertAlmostEqual(Scaling.fit_exponent(counts, [count * 1e-6 for count in counts]),
+                               1.0)
+        self.assertAlmostEqual(Scaling.fit_exponent(counts, [count ** 2 * 1e-9 for count in counts]),
+                               2.0)
+        self.assertIsNone(Scaling.fit_exponent([1000], [1.0]))
+
+    def test_run_scaling(self):
+        results = Scaling.run_scaling([100, 1000], repeat=1, plates=1, segments=8)
+        self.assertEqual(len(results["bricks"]), 2)
+        self.assertLess(results["bricks"][0]["triangles"], results["bricks"][1]["triangles"])
+        self.assertIn("triangulation", results["exponents"])
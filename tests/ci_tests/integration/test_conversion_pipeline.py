@@ -0,0 +1,80 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from stl import Mesh
+from src.util import Util
+from src.model_conversion.conversion_pipeline import ConversionPipeline
+from src.model_conversion.stage_profiler import StageProfiler
+
+
+class TestConversionPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.model_folder = "tests/test_models/"
+
+    def load(self, file_name):
+        return Mesh.from_file(Util.path_conversion(self.model_folder + file_name))
+
+    def test_convert(self):
+        statuses = []
+        pipeline = ConversionPipeline(lambda status: statuses.append(status) or True)
+        pipeline.use_cache = False
+        model, text = pipeline.convert(self.load("cube.stl"))
+
+        self.assertEqual(len(model.get_mesh().data), 12)
+        self.assertEqual([line[:4] for line in text.splitlines()], ["4 4 "] * 6)
+        self.assertIn("Triangulating...", statuses)
+        self.assertIn("Converting main mesh...", statuses)
+
+    def test_profile(self):
+        pipeline = ConversionPipeline()
+        pipeline.use_cache = False
+        pipeline.profiler = StageProfiler()
+        pipeline.convert(self.load("cube.stl"))
+
+        stages = {stage["stage"]: stage for stage in pipeline.profiler.stages}
+        self.assertEqual(list(stages), ["indexed mesh", "faces", "face boundaries",
+                                        "simple boundaries", "split boundaries",
+                                        "outside boundaries", "triangulation", "recombine",
+                                        "merge quads", "write lines"])
+        self.assertEqual(stages["indexed mesh"]["outputs"], {"vertices": 8})
+        self.assertEqual(stages["faces"]["outputs"], {"faces": 6})
+        self.assertEqual(stages["simple boundaries"]["outputs"], {"edges": 24})
+        self.assertEqual(stages["split boundaries"]["outputs"], {"boundaries": 6})
+        self.assertEqual(stages["recombine"]["outputs"], {"triangles": 12})
+        self.assertEqual(stages["merge quads"]["outputs"], {"quads": 6, "triangles": 0})
+        self.assertEqual(stages["write lines"]["inputs"], {"lines": 6})
+
+    def test_stop(self):
+        statuses = []
+
+        def stop_at_triangulation(status):
+            statuses.append(status)
+            return status != "Triangulating..."
+
+        pipeline = ConversionPipeline(stop_at_triangulation)
+        pipeline.use_cache = False
+        self.assertIsNone(pipeline.convert(self.load("cube.stl")))
+        self.assertTrue(pipeline.is_stopped)
+        self.assertEqual(statuses[-1], "Triangulating...")
+
+    def test_concurrent_conversions(self):
+        file_names = ["cube.stl", "3001.stl", "2_holes.stl", "cube_rot.stl"] * 2
+
+        def convert(file_name):
+            pipeline = ConversionPipeline()
+            pipeline.use_cache = False
+            return pipeline.convert(self.load(file_name))[1]
+
+        expected = [convert(file_name) for file_name in file_names]
+        with ThreadPoolExecutor(4) as executor:
+            self.assertEqual(list(executor.map(convert, file_names)), expected)
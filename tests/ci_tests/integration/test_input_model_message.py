@@ -11,6 +11,7 @@ import unittest
 from src.log_messages.input_model_message import InputModelMessage
 from src.log_messages.log_type import LogType
 from src.model_conversion.model_shipper import ModelShipper
+from src.model_conversion.mesh_cache import MeshCache
 from src.util import Util
 
 
@@ -18,6 +19,13 @@ class TestInputModelMessage(unittest.TestCase):
     """Testing the InputModelMessage class.
     """
 
+    def setUp(self):
+        self.cache_enabled = MeshCache.enabled
+        MeshCache.enabled = False
+
+    def tearDown(self):
+        MeshCache.enabled = self.cache_enabled
+
     def test_(self):
         test_message = "test input model message"
 
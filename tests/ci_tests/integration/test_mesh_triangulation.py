@@ -9,9 +9,12 @@
 # This software is licensed under the MIT License. See LICENSE file for the full text.
 import unittest
 import copy
+import numpy
+import multiprocessing
 from stl import Mesh
 from src.util import Util
 import src.model_conversion.mesh_triangulation as MeshTriangulation
+from src.model_conversion.indexed_mesh import IndexedMesh
 
 
 class TestMeshTriangulation(unittest.TestCase):
@@ -95,3 +98,109 @@ class TestMeshTriangulation(unittest.TestCase):
         ordered_separate_boundaries = mesh_dict["ordered_separate_boundaries"]
         self.assertTrue(len(ordered_separate_boundaries) == 1)
         self.assertTrue(len(ordered_separate_boundaries[0][0].edge_list) == 4)
+
+    def test_cube_normal_groups(self):
+        file_path = self.model_folder + "cube.stl"
+        mesh = Mesh.from_file(Util.path_conversion(file_path))
+        triangles = MeshTriangulation.get_mesh_triangles(mesh)
+        normal_groups = MeshTriangulation.make_normal_groups(triangles)
+        self.assertEqual(len(normal_groups), 6)
+        for group in normal_groups:
+            self.assertEqual(len(group), 2)
+
+    def test_group_normal_indices(self):
+        normals = [[0, 0, 1], [1, 0, 0], [0, 0, 2], [0, 0.00001, 1], [0, 0.1, 1], [0, 0, 0]]
+        groups = MeshTriangulation.group_normal_indices(normals)
+        self.assertEqual([list(group) for group in groups], [[0, 2, 3], [1], [4], [5]])
+
+    def test_cube_faces(self):
+        file_path = self.model_folder + "cube.stl"
+        mesh = Mesh.from_file(Util.path_conversion(file_path))
+        triangles = MeshTriangulation.get_mesh_triangles(mesh)
+        normal_groups = MeshTriangulation.make_normal_groups(triangles)
+        faces = MeshTriangulation.make_face_groups_loop(normal_groups)
+        self.assertEqual(len(faces), 6)
+        for face in faces:
+            self.assertEqual(face.count(), 2)
+
+    def test_cube_boundaries(self):
+        file_path = self.model_folder + "cube.stl"
+        mesh = Mesh.from_file(Util.path_conversion(file_path))
+        triangles = MeshTriangulation.get_mesh_triangles(mesh)
+        normal_groups = MeshTriangulation.make_normal_groups(triangles)
+        faces = MeshTriangulation.make_face_groups_loop(normal_groups)
+        face_boundaries, normals = MeshTriangulation.make_face_boundaries(faces)
+        self.assertEqual(len(face_boundaries), 6)
+        self.assertEqual(len(normals), 6)
+        for boundary in face_boundaries:
+            self.assertEqual(len(boundary.edge_list), 4)
+
+    def test_indexed_face_boundaries(self):
+        file_path = self.model_folder + "2_holes.stl"
+        mesh = Mesh.from_file(Util.path_conversion(file_path))
+        triangles = MeshTriangulation.get_mesh_triangles(mesh)
+        normal_groups = MeshTriangulation.make_normal_groups(triangles)
+        faces = MeshTriangulation.make_face_groups_loop(normal_groups)
+        face_boundaries, normals = MeshTriangulation.make_face_boundaries(faces)
+
+        indexed_mesh = IndexedMesh.from_mesh(mesh)
+        indexed_faces = MeshTriangulation.make_indexed_faces(indexed_mesh)
+        indexed_boundaries, indexed_normals = MeshTriangulation.make_indexed_face_boundaries(
+            indexed_mesh, indexed_faces)
+
+        self.assertEqual(len(indexed_faces), len(faces))
+        self.assertEqual(len(indexed_boundaries), len(face_boundaries))
+        for boundary, indexed_boundary in zip(face_boundaries, indexed_boundaries):
+            self.assertEqual([edge.get_key() for edge in boundary.edge_list],
+                             [edge.get_key() for edge in indexed_boundary.edge_list])
+
+    def test_triangulate_bucket_in_pool(self):
+        file_path = self.model_folder + "2_holes.stl"
+        mesh_dict = TestMeshTriangulation.build_mesh_triangulation_data(file_path)
+        buckets = mesh_dict["ordered_separate_boundaries"]
+        triangulations = [MeshTriangulation.triangulate(face) for face in mesh_dict["triangulated_faces"]]
+
+        with multiprocessing.Pool(2) as pool:
+            pool_triangulations = pool.map(MeshTriangulation.triangulate_bucket, buckets)
+
+        self.assertEqual(len(pool_triangulations), len(triangulations))
+        for triangulation, pool_triangulation in zip(triangulations, pool_triangulations):
+            self.assertTrue(numpy.array_equal(triangulation["vertices"], pool_triangulation["vertices"]))
+            self.assertTrue(numpy.array_equal(triangulation["triangles"], pool_triangulation["triangles"]))
+
+    def test_cube_triangulation_to_mesh(self):
+        file_path = self.model_folder + "cube.stl"
+        mesh = Mesh.from_file(Util.path_conversion(file_path))
+        triangles = MeshTriangulation.get_mesh_triangles(mesh)
+        normal_groups = MeshTriangulation.make_normal_groups(triangles)
+        faces = MeshTriangulation.make_face_groups_loop(normal_groups)
+        face_boundaries, normals = MeshTriangulation.make_face_boundaries(faces)
+        simple_boundaries = MeshTriangulation.make_simple_boundaries(face_boundaries)
+        separate_boundaries = MeshTriangulation.split_boundaries(simple_boundaries)
+        triangulated_faces = MeshTriangulation.buckets_to_dicts(separate_boundaries)
+        triangulations = [MeshTriangulation.triangulate(face) for face in triangulated_faces]
+
+        simple_mesh = MeshTriangulation.triangulation_to_mesh(triangulations, normals)
+        self.assertEqual(len(simple_mesh.vectors), 12)
+        # Every triangle is wound to face the same way as the face it came from.
+        face_normals = numpy.repeat(numpy.asarray(normals), 2, axis=0)
+        self.assertTrue(numpy.all(numpy.sum(simple_mesh.normals * face_normals, axis=1) > 0))
+
+    def test_merge_coplanar_quads(self):
+        file_path = self.model_folder + "cube.stl"
+        mesh = Mesh.from_file(Util.path_conversion(file_path))
+
+        quads, triangles = MeshTriangulation.merge_coplanar_quads(mesh)
+        self.assertEqual(quads.shape, (6, 4, 3))
+        self.assertEqual(len(triangles.vectors), 0)
+        # Every quad is a 2x2 square facing out of the cube.
+        sides = numpy.roll(quads, -1, axis=1) - quads
+        self.assertTrue(numpy.allclose(numpy.linalg.norm(sides, axis=2), 2, atol=1e-5))
+        centers = quads.mean(axis=1)
+        quad_normals = numpy.cross(sides[:, 0], sides[:, 1])
+        self.assertTrue(numpy.all(numpy.sum(quad_normals * centers, axis=1) > 0))
+
+        # Triangles that do not share an edge are left alone.
+        quads, triangles = MeshTriangulation.merge_coplanar_quads(Mesh(mesh.data[[0, 2, 4]]))
+        self.assertEqual(len(quads), 0)
+        self.assertEqual(len(triangles.vectors), 3)
@@ -13,6 +13,7 @@ import os
 import unittest
 import numpy
 from src.model_conversion.model_shipper import ModelShipper
+from src.model_conversion.mesh_cache import MeshCache
 from pyrr import Vector3
 from src.util import Util
 path = Util.path_conversion("tests/test_models/cube.stl")
@@ -22,12 +23,17 @@ from src.model_conversion.ldraw_model import LDrawModel
 class TestModelShipper(unittest.TestCase):
 
     def setUp(self):
+        self.cache_enabled = MeshCache.enabled
+        MeshCache.enabled = False
         ModelShipper.input_model = ModelShipper.load_stl_model(path)
         ModelShipper.output_model = None
         ModelShipper.output_data_text = None
         ModelShipper.output_path = None
         ModelShipper.output_metadata_text = None
 
+    def tearDown(self):
+        MeshCache.enabled = self.cache_enabled
+
     def testImportPlane(self):
         # Load the model from the assets folder.
         mesh = ModelShipper.load_stl_model(Util.path_conversion("tests/test_models/plane.stl"))
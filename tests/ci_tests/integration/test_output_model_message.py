@@ -12,6 +12,7 @@ from src.log_messages.input_model_message import InputModelMessage
 from src.log_messages.log_type import LogType
 from src.model_conversion.ldraw_model import LDrawModel
 from src.model_conversion.model_shipper import ModelShipper
+from src.model_conversion.mesh_cache import MeshCache
 from src.util import Util
 
 
@@ -19,6 +20,13 @@ class TestInputModelMessage(unittest.TestCase):
     """Testing the InputModelMessage class.
     """
 
+    def setUp(self):
+        self.cache_enabled = MeshCache.enabled
+        MeshCache.enabled = False
+
+    def tearDown(self):
+        MeshCache.enabled = self.cache_enabled
+
     def test_(self):
 
         # Load the model from the assets folder.
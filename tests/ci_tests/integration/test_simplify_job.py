@@ -0,0 +1,60 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+
+import queue
+import unittest
+from src.util import Util
+from src.log_messages.profile_message import ProfileMessage
+from src.model_conversion.ldraw_model import LDrawModel
+from src.model_conversion.mesh_cache import MeshCache
+from src.model_conversion.model_shipper import ModelShipper
+from src.model_conversion.simplify_job import SimplifyJob
+from src.model_conversion.stage_profiler import StageProfiler
+
+
+class TestSimplifyJob(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_enabled = MeshCache.enabled
+        self.profile = StageProfiler.enabled
+        MeshCache.enabled = False
+        StageProfiler.enabled = True
+        ModelShipper.input_model = LDrawModel(
+            ModelShipper.load_stl_model(Util.path_conversion("tests/test_models/cube.stl")))
+
+    def tearDown(self):
+        MeshCache.enabled = self.cache_enabled
+        StageProfiler.enabled = self.profile
+        ModelShipper.input_model = None
+        ModelShipper.input_path = None
+        ModelShipper.output_model = None
+        ModelShipper.output_profile = None
+
+    def test_profile_messages(self):
+        feedback_log = queue.Queue()
+        job = SimplifyJob(feedback_log)
+        job.go()
+        job.do_job()
+        messages = []
+        while not feedback_log.empty():
+            messages.append(feedback_log.get())
+
+        # Each stage is reported as soon as it ends, before the steps that follow it
+        profile_indices = [i for i, message in enumerate(messages)
+                           if isinstance(message, ProfileMessage)]
+        statuses = [message.get_message() for message in messages]
+        self.assertEqual(len(profile_indices), len(ModelShipper.output_profile))
+        self.assertLess(profile_indices[0], statuses.index("Simplifying faces..."))
+        self.assertEqual(messages[profile_indices[0]].get_stage(), ModelShipper.output_profile[0])
+        self.assertEqual(statuses[-1], "Finished mesh simplification.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+
+import os
+import time
+import queue
+import numpy
+import threading
+import unittest
+from src.util import Util
+from src.threading.base_job import BaseJob
+from src.threading.worker_state import WorkerState
+from src.threading.worker_process import WorkerProcess
+from src.threading.worker_thread import WorkerThread
+from src.log_messages.log_message import LogMessage
+from src.log_messages.log_type import LogType
+from src.model_conversion.ldraw_model import LDrawModel
+from src.model_conversion.mesh_cache import MeshCache
+from src.model_conversion.model_shipper import ModelShipper
+
+
+# The jobs are run in a spawned child process, which imports them from this module.
+class MessageJob(BaseJob):
+    message = "default"
+    job_settings = ("message",)
+
+    def do_job(self):
+        self.is_running.wait()
+        self.put_feedback(LogMessage(LogType.INFORMATION, self.message))
+        self.is_done.set()
+
+
+class InputJob(BaseJob):
+    def do_job(self):
+        self.is_running.wait()
+        data = ModelShipper.input_model.get_mesh().data
+        self.put_feedback(LogMessage(LogType.INFORMATION,
+                                     f"{len(data)} {isinstance(data.base, numpy.memmap)}"))
+        self.is_done.set()
+
+
+class TickJob(BaseJob):
+    def do_job(self):
+        ticks = 0
+        # continue_job waits while the job is paused
+        while self.continue_job() and ticks < 3000:
+            self.put_feedback(LogMessage(LogType.INFORMATION, "tick"))
+            ticks += 1
+            time.sleep(0.01)
+        self.update_status("Cancelled" if self.is_killed else "Finished")
+        self.is_done.set()
+
+
+class CrashJob(BaseJob):
+    def do_job(self):
+        os._exit(3)
+
+
+class TestWorkerProcess(unittest.TestCase):
+
+    def setUp(self):
+        self.feedback_log = queue.Queue()
+        self.cache_enabled = MeshCache.enabled
+        MeshCache.enabled = False
+
+    def tearDown(self):
+        MeshCache.enabled = self.cache_enabled
+
+    def get_messages(self):
+        messages = []
+        while not self.feedback_log.empty():
+            messages.append(self.feedback_log.get().get_message())
+        return messages
+
+    def wait_for(self, text: str, timeout: float = 30.0):
+        end = time.time() + timeout
+        while time.time() < end:
+            try:
+                if self.feedback_log.get(timeout=0.1).get_message() == text:
+                    return True
+            except queue.Empty:
+                pass
+        return False
+
+    def run_jobs(self, job_list):
+        worker = WorkerProcess(self.feedback_log, job_list)
+        worker.start()
+        worker.join()
+        self.assertEqual(worker.get_state(), WorkerState.STOP)
+        return self.get_messages()
+
+    def test_feedback_and_job_settings(self):
+        # A setting changed at run time reaches the child
+        MessageJob.message = "changed"
+        try:
+            messages = self.run_jobs([MessageJob, MessageJob])
+        finally:
+            MessageJob.message = "default"
+        self.assertEqual(messages.count("changed"), 2)
+        self.assertIn("All jobs complete", messages)
+
+    def test_input_path(self):
+        ModelShipper.input_model = LDrawModel(
+            ModelShipper.load_stl_model(Util.path_conversion("tests/test_models/3001.stl")))
+        try:
+            self.assertIsNotNone(ModelShipper.input_path)
+            # The child maps the file again instead of getting a copy of the mesh
+            self.assertIn("700 True", self.run_jobs([InputJob]))
+        finally:
+            ModelShipper.input_model = None
+            ModelShipper.input_path = None
+
+    def test_pause_resume_cancel(self):
+        worker = WorkerProcess(self.feedback_log, [TickJob])
+        worker.start()
+        try:
+            self.assertTrue(self.wait_for("tick"))
+            worker.change_state(WorkerState.PAUSE)
+            time.sleep(0.5)
+            self.get_messages()  # Ticks sent before the pause arrived
+            time.sleep(0.5)
+            self.assertNotIn("tick", self.get_messages())
+
+            worker.change_state(WorkerState.RUNNING)
+            self.assertTrue(self.wait_for("tick"))
+        finally:
+            worker.kill()
+            worker.join()
+        self.assertIn("Cancelled", self.get_messages())
+        self.assertFalse(worker.process.is_alive())
+
+    def test_pause_right_after_start(self):
+        worker = WorkerProcess(self.feedback_log, [TickJob])
+        worker.start()
+        worker.change_state(WorkerState.PAUSE)
+        try:
+            self.assertTrue(self.wait_for("Processing paused."))
+            time.sleep(0.3)
+            self.get_messages()  # A tick sent while the pause was applied
+            time.sleep(0.5)
+            self.assertNotIn("tick", self.get_messages())
+
+            # The states sent later still reach the job
+            worker.change_state(WorkerState.RUNNING)
+            self.assertTrue(self.wait_for("tick"))
+        finally:
+            worker.kill()
+            worker.join()
+        self.assertIn("Cancelled", self.get_messages())
+        self.assertEqual(worker.process.exitcode, 0)
+
+    def test_stop_right_after_start(self):
+        worker = WorkerProcess(self.feedback_log, [TickJob])
+        worker.start()
+        worker.kill()
+        worker.join()
+        self.assertIn("Processing ended.", self.get_messages())
+        # The child stopped by itself, it was not terminated
+        self.assertEqual(worker.process.exitcode, 0)
+
+    def test_child_crash(self):
+        messages = self.run_jobs([CrashJob])
+        self.assertIn("The worker process ended unexpectedly.", messages)
+
+
+
+class TestWorkerThreadState(unittest.TestCase):
+    """The listener of a worker process can apply a state before the first job is started."""
+
+    def setUp(self):
+        self.feedback_log = queue.Queue()
+
+    def get_messages(self):
+        messages = []
+        while not self.feedback_log.empty():
+            messages.append(self.feedback_log.get().get_message())
+        return messages
+
+    def test_pause_before_first_job(self):
+        worker = WorkerThread(self.feedback_log, [TickJob])
+        worker.change_state(WorkerState.PAUSE)
+        # Run the jobs without the RUNNING state WorkerThread.start sets
+        threading.Thread.start(worker)
+        try:
+            time.sleep(0.5)
+            self.assertNotIn("tick", self.get_messages())
+            worker.change_state(WorkerState.RUNNING)
+            time.sleep(0.5)
+            self.assertIn("tick", self.get_messages())
+        finally:
+            worker.kill()
+            worker.join()
+        self.assertIn("Cancelled", self.get_messages())
+
+    def test_stop_before_first_job(self):
+        worker = WorkerThread(self.feedback_log, [TickJob])
+        worker.change_state(WorkerState.STOP)
+        threading.Thread.start(worker)
+        worker.join()
+        self.assertIsNone(worker.current_job)
+        self.assertNotIn("tick", self.get_messages())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -70,6 +70,14 @@ class EdgeTest(unittest.TestCase):
         self.assertFalse(shared_vertex3)
         self.assertTrue(shared_vertex4)
 
+    def test_GetKey(self):
+        test_edge1 = Edge(0, 0, 0, 1, 1, 1)
+        test_edge2 = Edge(1, 1, 1, 0, 0, 0)
+        test_edge3 = Edge(0, 0, 0, 2, 2, 2)
+
+        self.assertEqual(test_edge1.get_key(), test_edge2.get_key())
+        self.assertNotEqual(test_edge1.get_key(), test_edge3.get_key())
+
     def test_EdgeIsParallel(self):
         test_edge1 = Edge(0, 0, 0, 1, 1, 1.005)
         test_edge_parallel = Edge(1, 1, 1, 2, 2, 2)
@@ -0,0 +1,47 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+
+import numpy
+import unittest
+from stl import Mesh
+from src.util import Util
+from src.model_conversion.indexed_mesh import IndexedMesh
+
+path = Util.path_conversion("tests/test_models/cube.stl")
+
+
+class TestIndexedMesh(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = Mesh.from_file(path)
+        self.indexed_mesh = IndexedMesh.from_mesh(self.mesh)
+
+    def testShapes(self):
+        self.assertEqual(self.indexed_mesh.count(), 12)
+        self.assertEqual(self.indexed_mesh.get_vertices().shape, (8, 3))
+        self.assertEqual(self.indexed_mesh.get_faces().shape, (12, 3))
+        self.assertEqual(self.indexed_mesh.get_faces().dtype, numpy.int32)
+
+    def testVertices(self):
+        vertices = self.indexed_mesh.get_vertices()[self.indexed_mesh.get_faces()]
+        self.assertTrue(numpy.array_equal(vertices, self.mesh.vectors))
+
+    def testNormals(self):
+        lengths = numpy.linalg.norm(self.indexed_mesh.get_normals(), axis=1)
+        self.assertTrue(numpy.allclose(lengths, 1.0))
+
+    def testEdges(self):
+        faces = self.indexed_mesh.get_faces()
+        edges = self.indexed_mesh.get_edges()
+        self.assertEqual(edges.shape, (36, 2))
+        self.assertEqual(list(edges[0]), [faces[0][0], faces[0][1]])
+        self.assertEqual(list(edges[2]), [faces[0][2], faces[0][0]])
+        keys = self.indexed_mesh.get_edge_keys()
+        self.assertTrue(numpy.all(keys[:, 0] <= keys[:, 1]))
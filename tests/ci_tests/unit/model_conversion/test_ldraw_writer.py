@@ -0,0 +1,75 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+
+import numpy
+import unittest
+from stl import Mesh
+from src.util import Util
+from src.model_conversion.ldraw_writer import LDrawWriter
+
+path = Util.path_conversion("tests/test_models/3001.stl")
+
+
+class TestLDrawWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = Mesh.from_file(path)
+        self.chunk_size = LDrawWriter.chunk_size
+        self.format_coordinates = LDrawWriter.format_coordinates
+
+    def tearDown(self):
+        LDrawWriter.chunk_size = self.chunk_size
+        LDrawWriter.format_coordinates = staticmethod(self.format_coordinates)
+
+    def testTriangleLines(self):
+        expected = ""
+        for i in range(len(self.mesh.normals)):
+            expected += ("3 4 " + " ".join(str(value) for value in self.mesh.v2[i]) + " "
+                         + " ".join(str(value) for value in self.mesh.v1[i]) + " "
+                         + " ".join(str(value) for value in self.mesh.v0[i]) + "\n")
+
+        LDrawWriter.chunk_size = 7
+        chunks = list(LDrawWriter.triangle_lines(self.mesh))
+        self.assertEqual(len(chunks), -(-len(self.mesh.normals) // 7))
+        self.assertEqual("".join(chunks), expected)
+
+    def testChunksFormattedOnTheirOwn(self):
+        sizes = []
+
+        def format_coordinates(values):
+            sizes.append(len(values))
+            return self.format_coordinates(values)
+        LDrawWriter.format_coordinates = staticmethod(format_coordinates)
+
+        # Only the rows of the first chunk are formatted before it is produced
+        LDrawWriter.chunk_size = 7
+        chunks = LDrawWriter.triangle_lines(self.mesh)
+        self.assertEqual(next(chunks).count("\n"), 7)
+        self.assertEqual(sizes, [7 * 9])
+
+        list(chunks)
+        self.assertEqual(sum(sizes), len(self.mesh.normals) * 9)
+        self.assertLessEqual(max(sizes), 7 * 9)
+
+    def testQuadLines(self):
+        quads = numpy.array([[[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]],
+                             [[0, 0, 1], [-0.5, 0, 1], [-0.5, 2, 1], [0, 2, 1]]])
+        self.assertEqual("".join(LDrawWriter.quad_lines(quads, color=16)),
+                         "4 16 0.0 1.0 0.0 1.0 1.0 0.0 1.0 0.0 0.0 0.0 0.0 0.0\n"
+                         "4 16 0.0 2.0 1.0 -0.5 2.0 1.0 -0.5 0.0 1.0 0.0 0.0 1.0\n")
+
+    def testFormatCoordinates(self):
+        values = numpy.array([1.5, -0.0, 0.0, 1.5, 1e20, 0.1], dtype=numpy.float32)
+        self.assertEqual(LDrawWriter.format_coordinates(values).tolist(),
+                         [str(value) for value in values])
+
+    def testEmptyMesh(self):
+        mesh = Mesh(numpy.zeros(0, dtype=Mesh.dtype))
+        self.assertEqual(list(LDrawWriter.triangle_lines(mesh)), [])
@@ -0,0 +1,72 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+
+import os
+import tempfile
+import unittest
+from stl import Mesh
+from src.util import Util
+from src.model_conversion.mesh_cache import MeshCache
+from src.model_conversion.conversion_pipeline import ConversionPipeline
+
+path = Util.path_conversion("tests/test_models/cube.stl")
+
+
+class TestMeshCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = MeshCache.cache_dir
+        MeshCache.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.mesh = Mesh.from_file(path)
+
+    def tearDown(self):
+        MeshCache.cache_dir = self.cache_dir
+        self.temp_dir.cleanup()
+
+    def testMakeKey(self):
+        file_hash = MeshCache.hash_file(path)
+        self.assertEqual(file_hash, MeshCache.hash_file(path))
+        self.assertEqual(MeshCache.make_key(file_hash, True), MeshCache.make_key(file_hash, True))
+        self.assertNotEqual(MeshCache.make_key(file_hash, True), MeshCache.make_key(file_hash, False))
+
+    def testStoreLoad(self):
+        key = MeshCache.make_key(MeshCache.hash_file(path))
+        self.assertIsNone(MeshCache.load(key))
+        MeshCache.store(key, self.mesh)
+        mesh = MeshCache.load(key)
+        self.assertEqual(mesh.data.tobytes(), self.mesh.data.tobytes())
+        self.assertEqual(os.listdir(MeshCache.cache_dir), [key + ".npy"])
+
+    def testEvictLeastRecentlyUsed(self):
+        keys = [MeshCache.make_key(str(i)) for i in range(3)]
+        for i, key in enumerate(keys):
+            MeshCache.store(key, self.mesh)
+            os.utime(MeshCache.get_path(key), (i, i))
+        entry_size = os.path.getsize(MeshCache.get_path(keys[0]))
+
+        # Loading marks the first entry as used most recently.
+        MeshCache.load(keys[0])
+        MeshCache.evict(2 * entry_size)
+        self.assertIsNotNone(MeshCache.load(keys[0]))
+        self.assertIsNone(MeshCache.load(keys[1]))
+        self.assertIsNotNone(MeshCache.load(keys[2]))
+
+    def testLoadMeshStoresOnlyParsedFiles(self):
+        mesh, key = ConversionPipeline.load_mesh(path)
+        self.assertEqual(os.listdir(MeshCache.cache_dir), [key + ".npy"])
+        self.assertEqual(ConversionPipeline.load_mesh(path)[0].data.tobytes(), mesh.data.tobytes())
+
+        # A binary file is memory mapped, so it is not copied into the cache
+        binary_path = Util.path_conversion("tests/test_models/3001.stl")
+        mesh, key = ConversionPipeline.load_mesh(binary_path)
+        self.assertIsNotNone(key)
+        self.assertEqual(len(mesh.data), 700)
+        self.assertFalse(Util.is_file(MeshCache.get_path(key)))
@@ -10,10 +10,16 @@
 # This software is licensed under the MIT License.
 # See LICENSE file for the full text.
 
+import os
+import json
 import numpy
+import tempfile
 import unittest
+from stl import Mesh
 from src.util import Util
+from src.settings_manager import SettingsManager
 from src.model_conversion.model_shipper import ModelShipper
+from src.model_conversion.mesh_cache import MeshCache
 
 path = Util.path_conversion("tests/test_models/cube.stl")
 
@@ -24,12 +30,72 @@ class ModelShipperTest(unittest.TestCase):
     return: none
     """
     def setUp(self):
+        self.cache_enabled = MeshCache.enabled
+        MeshCache.enabled = False
         ModelShipper.input_model = ModelShipper.load_stl_model(path)
         ModelShipper.output_model = None
         ModelShipper.output_data_text = None
         ModelShipper.output_metadata_text = None
 
+    def tearDown(self):
+        MeshCache.enabled = self.cache_enabled
+
     def test_get_input_model(self):
         self.assertEqual(len(ModelShipper.input_model), len(ModelShipper.get_input_model()))
         self.assertTrue(numpy.array_equal(ModelShipper.input_model.data, ModelShipper.get_input_model().data))
 
+    def test_load_invalid_values(self):
+        # Vertices that make the normals invalid fail to load, without changing the error
+        # state of numpy outside the load.
+        data = numpy.zeros(1, dtype=Mesh.dtype)
+        data["vectors"][0] = [[0.0, 0.0, 0.0], [numpy.inf, 0.0, 0.0], [0.0, numpy.inf, 0.0]]
+        error_state = numpy.geterr()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "invalid.stl")
+            with numpy.errstate(all="ignore"):
+                Mesh(data, calculate_normals=False).save(file_path)
+            self.assertFalse(ModelShipper.load_stl_model(file_path))
+        self.assertEqual(numpy.geterr(), error_state)
+
+    def test_save_output(self):
+        settings_path = SettingsManager.file_path
+        with tempfile.TemporaryDirectory() as temp_dir:
+            SettingsManager.file_path = os.path.join(temp_dir, "user_settings.json")
+            with open(SettingsManager.file_path, "w") as file:
+                json.dump({"part_dir": temp_dir, "part_name": "cube.dat",
+                           "author": "First Last", "license": "CCAL"}, file)
+            try:
+                file_path = ModelShipper.get_output_path()
+                self.assertEqual(file_path, os.path.join(temp_dir, "cube.dat"))
+                metadata = ModelShipper.get_metadata()
+
+                # Lines streamed to a temporary file outside the parts folder.
+                with ModelShipper.open_output_data() as output:
+                    output.write("3 4 0.0 0.0 0.0 1.0 0.0 0.0 0.0 1.0 0.0\n")
+                self.assertEqual(Util.get_parent(ModelShipper.output_data_path),
+                                 tempfile.gettempdir())
+                ModelShipper.save_output(file_path)
+                with open(file_path, "r") as file:
+                    self.assertEqual(file.read(),
+                                     metadata + "3 4 0.0 0.0 0.0 1.0 0.0 0.0 0.0 1.0 0.0\n")
+
+                # Lines held in output_data_text.
+                ModelShipper.discard_output_data()
+                ModelShipper.output_data_text = "3 4 1.0 1.0 1.0 2.0 1.0 1.0 1.0 2.0 1.0\n"
+                ModelShipper.save_output(file_path)
+                with open(file_path, "r") as file:
+                    self.assertEqual(file.read(), metadata + ModelShipper.output_data_text)
+                self.assertEqual(os.listdir(temp_dir).count("cube.dat"), 1)
+                self.assertEqual(len(os.listdir(temp_dir)), 2)
+
+                if os.name != "nt":
+                    # A new part gets the mode from the umask, a replaced part keeps its mode.
+                    mask = os.umask(0o022)
+                    os.umask(mask)
+                    self.assertEqual(os.stat(file_path).st_mode & 0o777, 0o666 & ~mask)
+                    os.chmod(file_path, 0o640)
+                    ModelShipper.save_output(file_path)
+                    self.assertEqual(os.stat(file_path).st_mode & 0o777, 0o640)
+            finally:
+                ModelShipper.discard_output_data()
+                SettingsManager.file_path = settings_path
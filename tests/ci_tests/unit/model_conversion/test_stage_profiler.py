@@ -0,0 +1,83 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import os
+import json
+import tempfile
+import unittest
+import tracemalloc
+from src.model_conversion.stage_profiler import StageProfiler
+
+
+class TestStageProfiler(unittest.TestCase):
+
+    def test_stage(self):
+        profiler = StageProfiler()
+        with profiler.stage("faces", triangles=12) as outputs:
+            data = [0] * 100000
+            outputs["faces"] = 6
+        del data
+
+        self.assertEqual(len(profiler.stages), 1)
+        stage = profiler.stages[0]
+        self.assertEqual(stage["stage"], "faces")
+        self.assertEqual(stage["inputs"], {"triangles": 12})
+        self.assertEqual(stage["outputs"], {"faces": 6})
+        self.assertGreaterEqual(stage["wall_time"], 0.0)
+        self.assertGreaterEqual(stage["cpu_time"], 0.0)
+        self.assertGreaterEqual(stage["peak_memory"], 100000 * 8)
+
+    def test_stage_callback(self):
+        stages = []
+        profiler = StageProfiler(stages.append)
+        with profiler.stage("faces"):
+            # Not reported before the stage ends
+            self.assertEqual(stages, [])
+        self.assertEqual(stages, profiler.stages)
+
+    def test_stage_in_running_trace(self):
+        # Nested in a running trace, the peak is only measured where it can be reset
+        trace_memory = StageProfiler.trace_memory
+        StageProfiler.trace_memory = True
+        tracemalloc.start()
+        try:
+            profiler = StageProfiler()
+            with profiler.stage("faces"):
+                pass
+        finally:
+            tracemalloc.stop()
+            StageProfiler.trace_memory = trace_memory
+        if hasattr(tracemalloc, "reset_peak"):
+            self.assertGreaterEqual(profiler.stages[0]["peak_memory"], 0)
+        else:
+            self.assertIsNone(profiler.stages[0]["peak_memory"])
+
+    def test_stage_exception(self):
+        profiler = StageProfiler()
+        with self.assertRaises(ValueError):
+            with profiler.stage("faces"):
+                raise ValueError()
+        self.assertEqual(profiler.stages[0]["stage"], "faces")
+
+    def test_format_stage(self):
+        stage = {"stage": "faces", "wall_time": 1.5, "cpu_time": 1.25, "peak_memory": 1024 * 1024,
+                 "inputs": {"triangles": 12}, "outputs": {"faces": 6}}
+        self.assertEqual(StageProfiler.format_stage(stage),
+                         "faces: 1.500s wall, 1.250s cpu, 1.0 MiB peak, 12 triangles -> 6 faces")
+
+    def test_save(self):
+        profiler = StageProfiler()
+        with profiler.stage("faces", triangles=12) as outputs:
+            outputs["faces"] = 6
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "part.dat.profile.json")
+            self.assertTrue(StageProfiler.save(file_path, profiler.stages))
+            with open(file_path, "r") as file:
+                self.assertEqual(json.load(file), {"stages": profiler.stages})
@@ -0,0 +1,84 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+
+import os
+import numpy
+import tempfile
+import unittest
+from stl import Mesh
+from src.util import Util
+from src.model_conversion.stl_reader import StlReader
+
+binary_path = Util.path_conversion("tests/test_models/3001.stl")
+ascii_path = Util.path_conversion("tests/test_models/cube.stl")
+
+
+class TestStlReader(unittest.TestCase):
+
+    def testGetBinaryCount(self):
+        self.assertEqual(StlReader.get_binary_count(binary_path), 700)
+        self.assertIsNone(StlReader.get_binary_count(ascii_path))
+
+    def testLoadBinary(self):
+        mesh = StlReader.load_binary(binary_path)
+        self.assertIsInstance(mesh.data.base, numpy.memmap)
+        expected = Mesh.from_file(binary_path)
+        self.assertEqual(mesh.data.tobytes(), expected.data.tobytes())
+        self.assertEqual(mesh.name, expected.name)
+        self.assertIsNone(StlReader.load_binary(ascii_path))
+
+    def testLoadKeepsFileNormals(self):
+        mesh = StlReader.load(binary_path, calculate_normals=False)
+        expected = Mesh.from_file(binary_path, calculate_normals=False)
+        self.assertTrue(numpy.array_equal(mesh.normals, expected.normals))
+
+    def testLoadAscii(self):
+        mesh = StlReader.load(ascii_path)
+        expected = Mesh.from_file(ascii_path)
+        self.assertEqual(mesh.data.tobytes(), expected.data.tobytes())
+        self.assertEqual(mesh.name, expected.name)
+        self.assertIsNone(StlReader.load_ascii(binary_path))
+
+    def testLoadAsciiInChunks(self):
+        chunk_size = StlReader.ascii_chunk_size
+        facet_size = StlReader.ascii_facet_size
+        try:
+            # Chunks that split lines and an array that has to grow many times.
+            StlReader.ascii_chunk_size = 37
+            StlReader.ascii_facet_size = 100000
+            progress = []
+            mesh = StlReader.load_ascii(ascii_path, calculate_normals=False,
+                                        progress=progress.append)
+        finally:
+            StlReader.ascii_chunk_size = chunk_size
+            StlReader.ascii_facet_size = facet_size
+
+        expected = Mesh.from_file(ascii_path, calculate_normals=False)
+        self.assertEqual(mesh.data.tobytes(), expected.data.tobytes())
+        self.assertGreater(len(progress), 1)
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(progress[-1], 1.0)
+
+    def testLoadBinaryWithSolidHeader(self):
+        # A binary STL whose header starts with "solid" and whose size does not match its
+        # facet count is left to Mesh.from_file.
+        with open(binary_path, "rb") as file:
+            data = file.read()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "solid_header.stl")
+            with open(file_path, "wb") as file:
+                file.write(b"solid binary".ljust(StlReader.header_size, b" "))
+                file.write(data[StlReader.header_size:] + b"\0\0\0\0")
+
+            self.assertIsNone(StlReader.get_binary_count(file_path))
+            self.assertIsNone(StlReader.load_ascii(file_path))
+            mesh = StlReader.load(file_path)
+            self.assertEqual(len(mesh.data), 700)
+            self.assertTrue(numpy.array_equal(mesh.vectors, Mesh.from_file(binary_path).vectors))
@@ -0,0 +1,74 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+
+import unittest
+from src.model_conversion.edge import Edge
+from src.model_conversion.unique_edge_list import UniqueEdgeList
+
+
+class TestUniqueEdgeList(unittest.TestCase):
+
+    def setUp(self):
+        self.test_edge1 = Edge(0, 0, 0, 1, 0, 0)
+        self.test_edge2 = Edge(1, 0, 0, 1, 1, 0)
+        self.test_edge3 = Edge(1, 1, 0, 0, 0, 0)
+        self.unique_edge_list = UniqueEdgeList()
+        self.unique_edge_list.add(self.test_edge1)
+        self.unique_edge_list.add(self.test_edge2)
+        self.unique_edge_list.add(self.test_edge3)
+
+    def testAdd(self):
+        self.assertFalse(self.unique_edge_list.add(Edge(1, 0, 0, 0, 0, 0)))
+        self.assertTrue(self.unique_edge_list.add(Edge(5, 5, 5, 6, 6, 6)))
+        self.assertEqual(self.unique_edge_list.count(), 4)
+
+    def testRemove(self):
+        # Only an edge in the same direction is removed.
+        self.assertFalse(self.unique_edge_list.remove(Edge(1, 0, 0, 0, 0, 0)))
+        self.assertTrue(self.unique_edge_list.remove(Edge(0, 0, 0, 1, 0, 0)))
+        self.assertFalse(self.unique_edge_list.has_edge(self.test_edge1))
+        self.assertEqual(list(self.unique_edge_list.edge_list), [self.test_edge2, self.test_edge3])
+
+    def testGetFirstEdge(self):
+        self.assertEqual(self.unique_edge_list.get_first_edge(), self.test_edge1)
+        self.unique_edge_list.remove(self.test_edge1)
+        self.assertEqual(self.unique_edge_list.get_first_edge(), self.test_edge2)
+        self.assertIsNone(UniqueEdgeList().get_first_edge())
+
+    def testSetDifference(self):
+        other = UniqueEdgeList()
+        other.add(self.test_edge2)
+        other.add(Edge(0, 0, 0, 1, 1, 0))
+        difference = UniqueEdgeList.set_difference(self.unique_edge_list, other)
+        self.assertEqual(list(difference.edge_list), [self.test_edge1, self.test_edge3])
+
+    def testGetNeighbors(self):
+        self.unique_edge_list.add(Edge(5, 5, 5, 6, 6, 6))
+        self.assertEqual(self.unique_edge_list.get_neighbors_for_edge(self.test_edge2),
+                         [self.test_edge1, self.test_edge2, self.test_edge3])
+        self.assertCountEqual(self.unique_edge_list.get_neighbor_indices_for_edge(self.test_edge1),
+                              [0, 1, 2])
+
+    def testNeighborIndicesAfterRemove(self):
+        self.unique_edge_list.remove(self.test_edge1)
+        self.unique_edge_list.add(Edge(1, 1, 0, 2, 2, 0))
+        edge_list = list(self.unique_edge_list.edge_list)
+        indices = self.unique_edge_list.get_neighbor_indices_for_edge(self.test_edge3)
+        self.assertEqual([edge_list[i] for i in indices],
+                         self.unique_edge_list.get_neighbors_for_edge(self.test_edge3))
+
+    def testNeighborIndicesAfterChanges(self):
+        # The indices stay right as edges are added after, and removed between, the calls
+        edge4 = Edge(0, 0, 0, 2, 2, 0)
+        self.assertEqual(self.unique_edge_list.get_neighbor_indices_for_edge(edge4), [0, 2])
+        self.unique_edge_list.add(edge4)
+        self.assertEqual(self.unique_edge_list.get_neighbor_indices_for_edge(edge4), [0, 2, 3])
+        self.unique_edge_list.remove(self.test_edge2)
+        self.assertEqual(self.unique_edge_list.get_neighbor_indices_for_edge(edge4), [0, 1, 2])
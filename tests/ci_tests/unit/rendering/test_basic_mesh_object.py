@@ -0,0 +1,75 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import unittest
+import numpy
+from stl import Mesh
+from src.util import Util
+from src.rendering.basic_mesh_object import BasicMeshObject
+from src.rendering.material import Material
+from src.rendering.rendering_engine import RenderingEngine
+from src.rendering.scene import Scene
+
+
+class BasicMeshObjectTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = Mesh.from_file(Util.path_conversion("tests/test_models/3001.stl"))
+
+    def tearDown(self):
+        self.mesh = None
+
+    def testMakeVertexData(self):
+        # The vertex buffer as it was built one float at a time
+        expected = []
+        for i in range(len(self.mesh.normals)):
+            for vertex, uv in zip([self.mesh.v2[i], self.mesh.v1[i], self.mesh.v0[i]],
+                                  [(0.000059, 1.0 - 0.000059),
+                                   (0.000103, 1.0 - 0.336048),
+                                   (0.335973, 1.0 - 0.335903)]):
+                expected += list(vertex) + list(uv) + list(self.mesh.normals[i])
+        expected = numpy.array(expected, dtype=numpy.float32).reshape(-1, 8)
+
+        vertex_data = BasicMeshObject.make_vertex_data(self.mesh)
+        self.assertEqual(vertex_data.dtype, numpy.float32)
+        self.assertEqual(vertex_data.shape, (len(self.mesh.data) * 3, 8))
+        self.assertTrue(vertex_data.flags["C_CONTIGUOUS"])
+        numpy.testing.assert_array_equal(vertex_data, expected)
+
+    def testMakeVertexDataEmpty(self):
+        mesh = Mesh(numpy.zeros(0, dtype=Mesh.dtype))
+        self.assertEqual(BasicMeshObject.make_vertex_data(mesh).shape, (0, 8))
+
+    def testWeldVertices(self):
+        vertex_data = BasicMeshObject.make_vertex_data(self.mesh)
+        vertices, indices = BasicMeshObject.weld_vertices(vertex_data)
+        self.assertEqual(indices.dtype, numpy.uint16)
+        self.assertLess(len(vertices), len(vertex_data))
+        # Only the texture coordinates of merged corners change
+        numpy.testing.assert_array_equal(vertices[indices][:, 0:3], vertex_data[:, 0:3])
+        numpy.testing.assert_array_equal(vertices[indices][:, 5:8], vertex_data[:, 5:8])
+        first_corners = numpy.unique(indices, return_index=True)[1]
+        numpy.testing.assert_array_equal(vertices, vertex_data[first_corners])
+        # The vertices are kept in the order the triangles first use them
+        self.assertEqual(indices[0], 0)
+        self.assertTrue(numpy.all(numpy.diff(numpy.maximum.accumulate(indices)) <= 1))
+
+    def testSkipFailedShader(self):
+        # A material whose shader failed to compile is skipped instead of asserting
+        Scene()  # Sets up the camera of the RenderingEngine
+        mesh_object = BasicMeshObject("input_model", self.mesh)
+        mesh_object.material = Material()
+        opengl_success = RenderingEngine.opengl_success
+        RenderingEngine.opengl_success = True
+        try:
+            self.assertFalse(mesh_object.can_draw())
+            mesh_object.update()
+            mesh_object.draw()
+        finally:
+            RenderingEngine.opengl_success = opengl_success
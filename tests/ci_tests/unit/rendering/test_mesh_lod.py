@@ -0,0 +1,118 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import unittest
+import numpy
+from stl import Mesh
+from pyrr import Vector3
+from src.util import Util
+from src.rendering.mesh_lod import MeshLod
+from src.rendering.lod_mesh_object import LodMeshObject
+
+
+class MeshLodTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = Mesh.from_file(Util.path_conversion("tests/test_models/3001_dense.stl"))
+        self.min_triangles = MeshLod.min_triangles
+        self.triangle_budget = MeshLod.triangle_budget
+        MeshLod.min_triangles = 1000
+
+    def tearDown(self):
+        MeshLod.min_triangles = self.min_triangles
+        MeshLod.triangle_budget = self.triangle_budget
+
+    def testClusterVertices(self):
+        level = MeshLod.cluster_vertices(self.mesh, 8)
+        self.assertGreater(len(level.data), 0)
+        self.assertLess(len(level.data), len(self.mesh.data))
+
+        # No collapsed triangles, and the level stays inside the bounding box of the mesh
+        areas = numpy.linalg.norm(numpy.cross(level.v1 - level.v0, level.v2 - level.v0), axis=1)
+        self.assertTrue(numpy.all(areas > 0.0))
+        self.assertTrue(numpy.all(level.min_ >= self.mesh.min_ - 1e-3))
+        self.assertTrue(numpy.all(level.max_ <= self.mesh.max_ + 1e-3))
+
+    def testClusterToTarget(self):
+        for target in [2000, 1000]:
+            count = len(MeshLod.cluster_to_target(self.mesh, target).data)
+            self.assertLessEqual(count, target)
+            self.assertGreaterEqual(count, target * (1.0 - MeshLod.level_tolerance))
+
+    def testMakeLevels(self):
+        levels = MeshLod.make_levels(self.mesh)
+        self.assertIs(levels[0], self.mesh)
+        self.assertEqual(len(levels), MeshLod.level_count + 1)
+        counts = LodMeshObject.count_triangles(levels)
+        self.assertEqual(counts, sorted(counts, reverse=True))
+
+    def testMakeLevelsStartAtBudget(self):
+        MeshLod.triangle_budget = 2000
+        levels = MeshLod.make_levels(self.mesh)
+        self.assertIs(levels[0], self.mesh)
+        counts = LodMeshObject.count_triangles(levels)
+        # The first clustered level is made for the budget, not a quarter of the full mesh
+        self.assertLessEqual(counts[1], MeshLod.triangle_budget)
+        self.assertGreaterEqual(counts[1],
+                                MeshLod.triangle_budget * (1.0 - MeshLod.level_tolerance))
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        self.assertGreater(len(levels), 2)
+
+    def testSmallMeshHasOneLevel(self):
+        MeshLod.min_triangles = self.min_triangles
+        self.assertEqual(MeshLod.make_levels(self.mesh), [self.mesh])
+
+    def testSelectLevel(self):
+        MeshLod.triangle_budget = 1000
+        counts = [4000, 1000, 250, 60]
+        self.assertEqual(MeshLod.select_level(counts, 0.0, 1.0), 1)
+        self.assertEqual(MeshLod.select_level(counts, MeshLod.detail_distance, 1.0), 1)
+        self.assertEqual(MeshLod.select_level(counts, MeshLod.detail_distance * 2.0, 1.0), 2)
+        self.assertEqual(MeshLod.select_level(counts, MeshLod.detail_distance * 100.0, 1.0), 3)
+
+        # The distance is measured in radii of the model
+        self.assertEqual(MeshLod.select_level(counts, MeshLod.detail_distance * 2.0, 2.0), 1)
+        self.assertEqual(MeshLod.select_level(counts, MeshLod.detail_distance * 2.0, 0.5), 3)
+
+        # The coarsest level is drawn when every level is over the budget
+        MeshLod.triangle_budget = 10
+        self.assertEqual(MeshLod.select_level(counts, 0.0, 1.0), 3)
+
+    def testLodMeshObject(self):
+        MeshLod.triangle_budget = 2000
+        model = LodMeshObject("input_model", self.mesh)
+        self.assertIs(model.get_mesh_data(), self.mesh)
+        # The full mesh is over the budget, so it is not uploaded
+        self.assertEqual(len(model.levels), len(MeshLod.make_levels(self.mesh)) - 1)
+        self.assertTrue(all(level.transform is model.transform for level in model.levels))
+
+        model.select_level(0.0)
+        self.assertLessEqual(len(model.get_level_mesh().data), MeshLod.triangle_budget)
+        model.select_level(MeshLod.detail_distance * model.bounding_radius * 100.0)
+        self.assertIs(model.get_level_mesh(), model.levels[-1].get_mesh_data())
+
+    def testLodMeshObjectScale(self):
+        MeshLod.triangle_budget = 2000
+        model = LodMeshObject("input_model", self.mesh)
+        camera_distance = MeshLod.detail_distance * model.bounding_radius
+        model.select_level(camera_distance)
+        self.assertEqual(model.level, 0)
+
+        # A model scaled down to a quarter is drawn two levels coarser from the same distance
+        model.transform.scale = Vector3([0.25, 0.25, 0.25])
+        model.select_level(camera_distance)
+        self.assertEqual(model.level, 2)
+
+    def testPrepareLevelsKeepsTwoLevels(self):
+        MeshLod.triangle_budget = 10
+        levels = LodMeshObject.prepare_levels(self.mesh)
+        self.assertEqual(len(levels), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import unittest
+from src.rendering.resource_cache import ResourceCache
+
+
+class ResourceCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.created = []
+        self.destroyed = []
+        self.cache = ResourceCache(self.create, self.destroyed.append)
+
+    def tearDown(self):
+        self.cache = None
+
+    def create(self, key):
+        self.created.append(key)
+        return len(self.created)
+
+    def testAcquireShares(self):
+        first = self.cache.acquire("shader")
+        second = self.cache.acquire("shader")
+        self.assertEqual(first, second)
+        self.assertEqual(self.created, ["shader"])
+        self.assertEqual(self.cache.get_count("shader"), 2)
+        self.assertNotEqual(self.cache.acquire("texture"), first)
+
+    def testReleaseDestroysLast(self):
+        resource = self.cache.acquire("shader")
+        self.cache.acquire("shader")
+        self.cache.release(resource)
+        self.assertEqual(self.destroyed, [])
+        self.cache.release(resource)
+        self.assertEqual(self.destroyed, [resource])
+        self.assertEqual(self.cache.get_count("shader"), 0)
+
+        # Released resources are not destroyed twice, and the key is made again
+        self.cache.release(resource)
+        self.assertEqual(self.destroyed, [resource])
+        self.cache.acquire("shader")
+        self.assertEqual(self.created, ["shader", "shader"])
+
+    def testCreateFails(self):
+        def fail(key):
+            raise ValueError(key)
+
+        cache = ResourceCache(fail, self.destroyed.append)
+        with self.assertRaises(ValueError):
+            cache.acquire("shader")
+        self.assertEqual(cache.get_count("shader"), 0)
@@ -0,0 +1,104 @@
+# Copyright (C) 2018 - This notice is to be included in all relevant source files.
+# "Brandon Goldbeck" <bpg@pdx.edu>
+# “Anthony Namba” <anamba@pdx.edu>
+# “Brandon Le” <lebran@pdx.edu>
+# “Ann Peake” <peakean@pdx.edu>
+# “Sohan Tamang” <sohan@pdx.edu>
+# “An Huynh” <an35@pdx.edu>
+# “Theron Anderson” <atheron@pdx.edu>
+# This software is licensed under the MIT License. See LICENSE file for the full text.
+import unittest
+from stl import Mesh
+from src.util import Util
+from pyrr import Vector3
+from src.rendering.scene import Scene
+from src.rendering.scene_object import SceneObject
+
+
+class WheelEvent:
+    def GetWheelRotation(self):
+        return 120
+
+    def Skip(self):
+        pass
+
+
+class ReleaseCounter(SceneObject):
+    def __init__(self, tag):
+        SceneObject.__init__(self, tag)
+        self.release_count = 0
+
+    def release(self):
+        self.release_count += 1
+
+
+class SceneTest(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = Scene()
+        self.scene.update(0.0)
+
+    def tearDown(self):
+        self.scene = None
+
+    def testNewSceneIsDirty(self):
+        self.assertTrue(Scene().update(0.0))
+
+    def testIdleSceneIsClean(self):
+        self.assertFalse(self.scene.update(0.0))
+        self.assertFalse(self.scene.update(0.0))
+
+    def testMouseDragMarksDirty(self):
+        model = SceneObject("model")
+        model.transform.euler_angles = Vector3([0.0, 0.0, 0.0])
+        self.scene.active_scene_object = model
+        self.scene.delta_mouse = (3.0, 0.0)
+        self.assertTrue(self.scene.update(0.0))
+        self.assertFalse(self.scene.update(0.0))
+
+    def testMouseWheelMarksDirty(self):
+        self.scene.on_mouse_wheel(WheelEvent())
+        self.assertTrue(self.scene.update(0.0))
+
+    def testScaleMarksDirty(self):
+        self.scene.set_model_scale(2.0)
+        self.assertTrue(self.scene.update(0.0))
+
+    def testMeshReplacementMarksDirty(self):
+        self.scene.replace_output_model_mesh(None)
+        self.assertTrue(self.scene.update(0.0))
+
+    def testRemoveSceneObjectReleases(self):
+        model = ReleaseCounter("input_model")
+        self.scene.scene_objects["input_model"] = model
+        self.scene.active_scene_object = model
+        self.scene.remove_scene_object("input_model")
+        self.assertEqual(model.release_count, 1)
+        self.assertIsNone(self.scene.get_active_model())
+        self.assertNotIn("input_model", self.scene.scene_objects)
+
+    def testBackgroundPreparation(self):
+        mesh = Mesh.from_file(Util.path_conversion("tests/test_models/3001.stl"))
+        self.scene.replace_input_model_mesh(mesh)
+        self.scene.set_input_model_active(True)
+        self.assertIsNone(self.scene.scene_objects["input_model"])
+
+        self.scene.pending_meshes["input_model"][1].result()
+        self.assertTrue(self.scene.update(0.0))
+        model = self.scene.scene_objects["input_model"]
+        self.assertIs(model.get_mesh_data(), mesh)
+        self.assertTrue(model.enabled)
+        self.assertIs(self.scene.get_active_model(), model)
+        self.assertEqual(self.scene.pending_meshes, {})
+
+        # The same mesh again is kept as it is
+        self.scene.replace_input_model_mesh(mesh)
+        self.assertEqual(self.scene.pending_meshes, {})
+        self.assertIs(self.scene.scene_objects["input_model"], model)
+
+    def testForegroundPreparation(self):
+        mesh = Mesh.from_file(Util.path_conversion("tests/test_models/cube.stl"))
+        self.scene.prepare_in_background = False
+        self.scene.replace_output_model_mesh(mesh)
+        self.assertIs(self.scene.scene_objects["output_model"].get_mesh_data(), mesh)
+        self.assertFalse(self.scene.scene_objects["output_model"].enabled)